@@ -1,4 +1,6 @@
 import argparse
+import numpy as np
+import os
 import pandas as pd
 import time
 import warnings
@@ -9,9 +11,33 @@ from realtpl import nasa
 from realtpl.fluid_properties \
     import fluid_properties_from_coolprop_and_data_base
 from realtpl.ref_data_from_coolprop import ref_data_from_coolprop
-from realtpl.calc_all import calc_eos_data
+from realtpl.ref_data_from_coolprop import ref_data_arrays
+from realtpl.ref_data_from_coolprop import set_table_directory
+from realtpl.ref_data_from_coolprop import audit_reference_backend
+from realtpl.reduced_tables import set_reduced_table_directory
+from realtpl.calc_visc_cond_chung import set_surrogate_range
+from realtpl.calc_all import calc_eos_data, calc_eos_grid
+from realtpl.calc_all import calc_eos_grid_stacked
+from realtpl.results import GridResults
+from realtpl.result_cache import ResultCache
+from realtpl.checkpoint import Checkpoint, checkpoint_settings
+from realtpl.parallel import calc_parallel, SharedResult
+from realtpl.memmap_table import write_memmap_table, open_memmap_table
+from realtpl.saturation import calc_saturation_curve
+from realtpl.pseudo_boiling import calc_pseudo_boiling_curve
+from realtpl.uncertainty import propagate_uncertainty
+from realtpl.point_cloud import evaluate_point_cloud, open_point_array
+from realtpl.point_cloud import evaluate_point_cloud_isochoric
+from realtpl.isochoric import calc_isochoric_grid, isochoric_dataframe
+from realtpl.cfd_export import write_cfd_tables
+from realtpl.planner import plan_run
+from realtpl.properties import property_columns
 from realtpl.visualization import vis_data, vis_deviation
-from realtpl.write_data_to_files import write_csv
+from realtpl.write_data_to_files import write_data, write_saturation_curve
+from realtpl.write_data_to_files import write_uncertainty
+from realtpl.write_data_to_files import write_pseudo_boiling_curve
+from realtpl.write_data_to_files import write_isochoric_data
+from realtpl.write_data_to_files import write_reference_audit
 
 # do not provide anything for * imports
 __all__ = []
@@ -25,6 +51,16 @@ _parser.add_argument(
     help='Path to configuration file.',
     default='config.yaml'
 )
+_parser.add_argument(
+    '--dry-run',
+    help='Print the predicted runtime and memory of the run and exit.',
+    action='store_true'
+)
+_parser.add_argument(
+    '--resume',
+    help='Continue a checkpointed run from where it stopped.',
+    action='store_true'
+)
 
 
 def main():
@@ -35,59 +71,195 @@ def main():
     # read and check config file
     cfg = config.load_config(args)
     # write config data to file
-    config.write_config(cfg)
+    if not args['dry_run']:
+        config.write_config(cfg)
 
     if len(cfg['eos_list']) != 0:
         # nasa data for cp calculation
         data_nasa = nasa.NasaCoefficients.from_name_and_coeff(
             cfg['fluid_name'], cfg['n_nasa_coeff'])
-        _check_temp_range(data_nasa, cfg)
+        if not cfg['point_cloud_temp_file']:
+            _check_temp_range(data_nasa, cfg)
     else:
         data_nasa = None
 
     # get fluid properties
     fp = fluid_properties_from_coolprop_and_data_base(cfg['fluid_name'],
                                                       data_nasa)
-    fluid_properties.save_fp_to_file(fp, cfg['output_dir'])
+    if not args['dry_run']:
+        fluid_properties.save_fp_to_file(fp, cfg['output_dir'])
+
+    # tables of tabular CoolProp backends are generated once and reused
+    if cfg['reference_table_dir']:
+        set_table_directory(cfg['reference_table_dir'])
+    if cfg['reduced_table_dir']:
+        set_reduced_table_directory(cfg['reduced_table_dir'])
+
+    # optionally: surrogates of the temperature terms on the temperature
+    # range of the run
+    if cfg['use_surrogates']:
+        set_surrogate_range(_temperature_range(cfg))
 
-    # df is main data frame
-    df = pd.DataFrame(
-        columns=['kind', 'press_Pa', 'temp_K', 'rho_kg/m3', 'cp_J/(kgK)',
-                 'sound_m/s', 'visc_Pas', 'cond_W/(mK)'])
+    # isochoric mode: evaluate the (temperature, density) grid or points only
+    if cfg['isochoric']:
+        if args['dry_run']:
+            print('No run plan for the isochoric mode.')
+            return
+        _calc_isochoric(cfg, fp)
+        print('...successfully finished')
+        return
+
+    # runtime and memory plan, resolves the automatic settings
+    if args['dry_run'] or 'auto' in [cfg['n_workers'],
+                                     cfg['point_cloud_chunk_size']]:
+        plan = plan_run(cfg, fp)
+        print(plan.summary())
+        if args['dry_run']:
+            return
+        cfg['n_workers'] = plan.n_workers
+        if plan.point_cloud_chunk_size:
+            cfg['point_cloud_chunk_size'] = plan.point_cloud_chunk_size
+
+    # point cloud mode: evaluate the paired points only
+    if cfg['point_cloud_temp_file']:
+        kinds = (['ref_data'] if cfg['include_ref_data'] else []
+                 ) + cfg['eos_list']
+        for kind in kinds:
+            path = evaluate_point_cloud(kind, fp, cfg['point_cloud_temp_file'],
+                                        cfg['point_cloud_press_file'],
+                                        cfg['output_dir'],
+                                        cfg['point_cloud_dtype'],
+                                        cfg['point_cloud_chunk_size'],
+                                        cfg['reference_backend'],
+                                        cfg['properties'])
+            print(f'Point cloud results of {kind} written to {path}')
+        print('...successfully finished')
+        return
+
+    # results of all kinds on the (press, temp) grid, results of worker
+    # processes stay in their shared memory blocks until they are written
+    results = GridResults(cfg['temp_array'], cfg['pressure_array'])
+    shared_results = []
+
+    # optionally: reuse results of previous runs
+    if cfg['use_cache']:
+        cache = ResultCache(os.path.join(cfg['output_dir'], fp.name, 'cache'),
+                            cfg['cache_block_size'])
+    else:
+        cache = None
+
+    # optionally: store completed pressure blocks to resume a stopped run
+    if cfg['checkpoint']:
+        checkpoint = Checkpoint(os.path.join(cfg['output_dir'], fp.name,
+                                             'checkpoint'),
+                                checkpoint_settings(cfg, fp), args['resume'])
+    else:
+        checkpoint = None
 
     time_after_setup = time.process_time()
 
     # ref data
     if cfg['include_ref_data']:
-        df_ref = ref_data_from_coolprop(cfg['fluid_name'], cfg['temp_array'],
-                                        cfg['pressure_array'])
-        df = pd.concat([df, df_ref])
+        _calc(cfg, cache, 'ref_data', fp, results, checkpoint,
+              shared_results)
+
+        # optionally: accuracy of a tabular backend compared to HEOS
+        if (cfg['reference_backend'] != 'HEOS'
+                and cfg['reference_audit_samples'] > 0):
+            audit = audit_reference_backend(
+                fp.name, cfg['temp_array'], cfg['pressure_array'],
+                cfg['reference_backend'], cfg['reference_audit_samples'],
+                properties=cfg['properties'])
+            write_reference_audit(audit, fp, cfg['output_dir'])
+            for col in property_columns(cfg['properties']):
+                if col in audit:
+                    print(f'{cfg["reference_backend"]} {col}: max. relative '
+                          f'deviation from HEOS '
+                          f'{audit[col]["max_rel_dev"]:.3g}')
 
     time_after_ref = time.process_time()
 
-    # eos data
-    for eos in cfg['eos_list']:
-        df_add = calc_eos_data(eos, fp, cfg['temp_array'],
-                               cfg['pressure_array'])
-        df = pd.concat([df, df_add])
+    # eos data, optionally streamed into real gas tables for CFD codes (the
+    # other outputs are filled from the same pass) or all eos in one pass
+    if cfg['cfd_export']:
+        keep_results = (cfg['save_data_to_csv'] or cfg['save_plots']
+                        or cfg['show_plots'] or cfg['show_deviation']
+                        or cfg['save_deviation'])
+        for eos in cfg['eos_list']:
+            paths = write_cfd_tables(eos, fp, cfg['temp_array'],
+                                     cfg['pressure_array'], cfg['output_dir'],
+                                     cfg['cfd_export'], cfg['root_solver'],
+                                     results if keep_results else None,
+                                     cfg['properties'])
+            print(f'CFD tables of {eos} written to {", ".join(paths)}')
+    elif cfg['stack_eos'] and len(cfg['eos_list']) > 1:
+        results.update(calc_eos_grid_stacked(
+            cfg['eos_list'], fp, cfg['temp_array'], cfg['pressure_array'],
+            properties=cfg['properties'], n_threads=cfg['n_threads'],
+            block_size=cfg['block_size']))
+    else:
+        for eos in cfg['eos_list']:
+            _calc(cfg, cache, eos, fp, results, checkpoint, shared_results)
+
+    if cache is not None:
+        print(f'{cache.n_hits} of {cache.n_hits + cache.n_misses} data '
+              f'blocks reused from cache {cache.cache_dir}')
+    if checkpoint is not None:
+        n_blocks = checkpoint.n_reused + checkpoint.n_computed
+        print(f'{checkpoint.n_reused} of {n_blocks} pressure blocks resumed '
+              f'from checkpoint {checkpoint.path}')
+
+    # vapor pressure curves (two-phase boundary) of the eos
+    if cfg['save_saturation_curve'] and len(cfg['eos_list']) != 0:
+        df_sat = pd.concat([calc_saturation_curve(eos, fp, cfg['temp_array'])
+                            for eos in cfg['eos_list']])
+        write_saturation_curve(df_sat, fp, cfg['output_dir'])
+
+    # pseudo-boiling lines (maximum of cp) of the eos
+    if cfg['save_pseudo_boiling_curve'] and len(cfg['eos_list']) != 0:
+        df_pb = pd.concat([calc_pseudo_boiling_curve(eos, fp,
+                                                     cfg['pressure_array'])
+                           for eos in cfg['eos_list']])
+        write_pseudo_boiling_curve(df_pb, fp, cfg['output_dir'])
+
+    # optionally: uncertainty of the eos data due to uncertain fluid data
+    if cfg['uncertainty_rel_std'] and len(cfg['eos_list']) != 0:
+        df_unc = pd.concat([
+            propagate_uncertainty(eos, fp, cfg['temp_array'],
+                                  cfg['pressure_array'],
+                                  cfg['uncertainty_rel_std'],
+                                  cfg['uncertainty_n_samples'],
+                                  properties=cfg['properties'])
+            for eos in cfg['eos_list']])
+        write_uncertainty(df_unc, fp, cfg['output_dir'])
 
     time_after_eos = time.process_time()
 
     # plot and optionally save fig
     if cfg['save_plots'] or cfg['show_plots']:
-        vis_data(df, fp, cfg['save_plots'], cfg['show_plots'],
-                 cfg['output_dir'])
+        vis_data(results.to_dataframe(), fp, cfg['save_plots'],
+                 cfg['show_plots'], cfg['output_dir'])
 
     # optionally: show and/or save deviation
     if cfg['show_deviation'] or cfg['save_deviation']:
-        vis_deviation(df, cfg['output_dir'], cfg['fluid_name'],
+        vis_deviation(results, cfg['output_dir'], cfg['fluid_name'],
                       cfg['show_deviation'], cfg['save_deviation'])
 
     time_after_figs = time.process_time()
 
-    # save data to csv
+    # save data to csv or a binary format
     if cfg['save_data_to_csv']:
-        write_csv(df, fp, cfg['output_dir'])
+        write_data(results, fp, cfg['output_dir'], cfg['output_format'],
+                   cfg['output_compression'], grid=cfg['grid'])
+
+    # the checkpoint is not needed anymore once all results are written
+    if checkpoint is not None:
+        checkpoint.remove()
+
+    # release the shared memory blocks (no views of them may remain)
+    del results
+    for shared_result in shared_results:
+        shared_result.close()
 
     time_after_save = time.process_time()
 
@@ -110,6 +282,151 @@ def main():
     print('...successfully finished')
 
 
+def _calc_isochoric(cfg, fp):
+    kinds = (['ref_data'] if cfg['include_ref_data'] else []) + cfg['eos_list']
+    if cfg['point_cloud_temp_file']:
+        for kind in kinds:
+            path = evaluate_point_cloud_isochoric(
+                kind, fp, cfg['point_cloud_temp_file'],
+                cfg['point_cloud_density_file'], cfg['output_dir'],
+                cfg['point_cloud_dtype'], cfg['point_cloud_chunk_size'],
+                cfg['reference_backend'], cfg['properties'])
+            print(f'Isochoric point cloud results of {kind} written to '
+                  f'{path}')
+        return
+
+    df = pd.concat([
+        isochoric_dataframe(kind, cfg['temp_array'], cfg['density_array'],
+                            calc_isochoric_grid(kind, fp, cfg['temp_array'],
+                                                cfg['density_array'],
+                                                cfg['properties'],
+                                                cfg['reference_backend']),
+                            cfg['properties'])
+        for kind in kinds])
+    if cfg['save_data_to_csv']:
+        write_isochoric_data(df, fp, cfg['output_dir'], cfg['output_format'],
+                             cfg['output_compression'], grid=cfg['grid'])
+
+
+def _calc(cfg, cache, kind, fp, results, checkpoint, shared):
+    temp_array = cfg['temp_array']
+    pressure_array = cfg['pressure_array']
+    n_workers = cfg['n_workers']
+    root_solver = cfg['root_solver']
+    backend = cfg['reference_backend']
+    properties = cfg['properties']
+
+    # write data directly to memory-mapped tables, the results are read
+    # from the tables only where accessed
+    if cfg['save_memmap_tables']:
+        path = write_memmap_table(kind, fp, temp_array, pressure_array,
+                                  cfg['output_dir'], root_solver,
+                                  cfg['grid'], backend, properties)
+        results.add_memmap_table(open_memmap_table(path))
+        return
+
+    def calc(temp, press):
+        if n_workers > 1 and len(press) > 1:
+            return calc_parallel(kind, fp, temp, press, n_workers,
+                                 root_solver=root_solver,
+                                 reference_backend=backend,
+                                 table_dir=cfg['reference_table_dir'],
+                                 properties=properties)
+        if kind == 'ref_data':
+            return ref_data_from_coolprop(fp.name, temp, press, backend,
+                                          properties)
+        return calc_eos_data(kind, fp, temp, press, root_solver=root_solver,
+                             properties=properties,
+                             n_threads=cfg['n_threads'],
+                             block_size=cfg['block_size'])
+
+    if checkpoint is not None:
+        def calc_block(press):
+            return _calc_arrays(cfg, cache, kind, fp, calc, press)
+
+        results.add_arrays(kind, property_columns(properties),
+                           checkpoint.compute(kind, pressure_array,
+                                              calc_block))
+        return
+
+    if cache is None:
+        if n_workers > 1 and len(pressure_array) > 1:
+            # the workers write into a shared memory block that is added to
+            # results without copying, the caller closes it (see shared)
+            shared_result = SharedResult(temp_array, pressure_array,
+                                         properties)
+            shared.append(shared_result)
+            calc_parallel(kind, fp, temp_array, pressure_array, n_workers,
+                          shared_result, root_solver, backend,
+                          cfg['reference_table_dir'], properties)
+            results.add_arrays(kind, shared_result.columns[2:],
+                               shared_result.array[2:])
+        elif kind == 'ref_data':
+            results.add_arrays(kind, property_columns(properties),
+                               ref_data_arrays(fp.name, temp_array,
+                                               pressure_array,
+                                               backend=backend,
+                                               properties=properties))
+        else:
+            results.update(calc_eos_grid(kind, fp, temp_array,
+                                         pressure_array,
+                                         root_solver=root_solver,
+                                         properties=properties,
+                                         n_threads=cfg['n_threads'],
+                                         block_size=cfg['block_size']))
+        return
+
+    results.add_dataframe(_calc_cached(cfg, cache, kind, fp, calc,
+                                       pressure_array), kind)
+
+
+def _calc_cached(cfg, cache, kind, fp, calc, pressure_array):
+    if kind == 'ref_data':
+        options = ({'reference_backend': cfg['reference_backend']}
+                   if cfg['reference_backend'] != 'HEOS' else None)
+    else:
+        options = ({'root_solver': cfg['root_solver']}
+                   if cfg['root_solver'] != 'analytic' else None)
+    return cache.compute(kind, fp, cfg['temp_array'], pressure_array, calc,
+                         options, property_columns(cfg['properties']))
+
+
+def _calc_arrays(cfg, cache, kind, fp, calc, press):
+    # values of kind for the pressures press (a block of the pressure array)
+    # as array of shape (n_columns, len(press), len(temp_array))
+    temp_array = cfg['temp_array']
+    columns = property_columns(cfg['properties'])
+    if cache is not None:
+        df = _calc_cached(cfg, cache, kind, fp, calc, press)
+    elif cfg['n_workers'] > 1 and len(press) > 1:
+        df = calc(temp_array, press)
+    elif kind == 'ref_data':
+        return ref_data_arrays(fp.name, temp_array, press,
+                               backend=cfg['reference_backend'],
+                               properties=cfg['properties'])
+    else:
+        # the root is selected as for the entire pressure array
+        grid = calc_eos_grid(
+            kind, fp, temp_array, press,
+            use_saturation_curve=len(cfg['pressure_array']) > 1,
+            root_solver=cfg['root_solver'], properties=cfg['properties'],
+            n_threads=cfg['n_threads'], block_size=cfg['block_size'])
+        return np.array([grid[kind, col] for col in columns])
+    return df[columns].to_numpy(dtype=float).reshape(
+        len(press), len(temp_array), len(columns)).transpose(2, 0, 1)
+
+
+def _temperature_range(cfg):
+    if cfg['point_cloud_temp_file']:
+        temp = open_point_array(cfg['point_cloud_temp_file'],
+                                cfg['point_cloud_dtype'])
+    else:
+        temp = cfg['temp_array']
+    temp_range = (float(np.nanmin(temp)), float(np.nanmax(temp)))
+    # a single temperature is evaluated exactly
+    return temp_range if temp_range[1] > temp_range[0] else None
+
+
 def _check_temp_range(data_nasa, cfg):
     data_nasa_temp_range = data_nasa.get_temp_range()
     if data_nasa_temp_range[0] > cfg['temperature_start_K'] \
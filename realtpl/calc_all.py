@@ -1,17 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import pandas as pd
 
 from realtpl.fluid_properties import FluidProperties
 from realtpl.thermophysical_constants import R_UNIV
+from realtpl.eos_data import EosParameter, AlphaFunctions
 from realtpl.eos_data import eos_parameter_from_eos_name
 from realtpl.eos_data import alpha_functions_from_eos_name
-from realtpl.calc_compressibility import calc_compressibility
+from realtpl.eos_data import stack_eos_parameter, stack_alpha_functions
+from realtpl.calc_compressibility import ROOT_SOLVERS
 from realtpl.calc_cv_cp_sound import calc_cv_cp_sound
-from realtpl.calc_visc_cond_chung import calc_visc_cond_chung
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.saturation import saturation_pressure
+from realtpl.properties import resolve_properties, required_nodes
+from realtpl.properties import property_columns
+from realtpl.results import GridResults
+
+# temperatures per block of the blocked execution: the intermediates of the
+# kernel chain alive at a time (about ten arrays) stay in the L2 cache, while
+# smaller blocks are dominated by the fixed cost per kernel call
+BLOCK_SIZE = 8192
 
 
 def calc_eos_data(eos: str, fp: FluidProperties, temp_array: np.ndarray,
-                  pressure_array: np.ndarray):
+                  pressure_array: np.ndarray,
+                  use_saturation_curve: bool = None,
+                  root_solver: str = 'analytic', properties: list = None,
+                  n_threads: int = 1, block_size: int = None):
     """
     calc_eos_data - calculates all thermodynamic quantities base on the eos
 
@@ -22,6 +36,12 @@ def calc_eos_data(eos: str, fp: FluidProperties, temp_array: np.ndarray,
     this step, also the speed of sound is evaluated. The last step is the
     evaluation of the transport properties viscosity and heat conductivity.
 
+    For the selection of the liquid or vapor root in the two-phase region, the
+    vapor pressure curve of the eos is computed once for temp_array (and
+    cached), so that the root selection reduces to a comparison with the
+    vapor pressure for all pressure levels. By default, this is done if more
+    than one pressure level is evaluated.
+
     Parameters:
     -----------
     eos: str
@@ -32,6 +52,17 @@ def calc_eos_data(eos: str, fp: FluidProperties, temp_array: np.ndarray,
         temperature range in Kelvin
     pressure_array: numpy array
         pressure in Pascal where data is evaluated
+    use_saturation_curve: bool, optional
+        use the vapor pressure curve for the root selection
+    root_solver: str, optional
+        solver for the compressibility factor, see ROOT_SOLVERS
+    properties: list, optional
+        quantities to compute (see PROPERTIES), default: all
+    n_threads: int, optional
+        number of threads evaluating blocks of the grid, see calc_eos_blocks
+    block_size: int, optional
+        temperatures per block, default: full rows for one thread,
+        BLOCK_SIZE otherwise
 
     Returns:
     --------
@@ -58,35 +89,239 @@ def calc_eos_data(eos: str, fp: FluidProperties, temp_array: np.ndarray,
     https://doi.org/10.1016/j.ijmultiphaseflow.2017.11.001
     """
 
+    return calc_eos_grid(eos, fp, temp_array, pressure_array,
+                         use_saturation_curve, root_solver, properties,
+                         n_threads, block_size).to_dataframe()
+
+
+def calc_eos_grid(eos: str, fp: FluidProperties, temp_array: np.ndarray,
+                  pressure_array: np.ndarray,
+                  use_saturation_curve: bool = None,
+                  root_solver: str = 'analytic',
+                  properties: list = None, n_threads: int = 1,
+                  block_size: int = None) -> GridResults:
+    """
+    calc_eos_grid - calculates all thermodynamic quantities based on the eos
+    on the (pressure_array, temp_array) grid, see calc_eos_data
+
+    The kernel results of the blocks (see calc_eos_blocks) are written into
+    one (press, temp) array per quantity.
+
+    Returns:
+    --------
+    results: GridResults
+        results of eos
+    """
+    temp_array = np.asarray(temp_array, dtype=float)
+    pressure_array = np.asarray(pressure_array, dtype=float)
+
     current_eos_data = eos_parameter_from_eos_name(eos, fp)
     alpha_funcs = alpha_functions_from_eos_name(eos, fp)
 
-    df_temp = pd.DataFrame(columns=['kind', 'press_Pa', 'temp_K', 'rho_kg/m3',
-                                    'cp_J/(kgK)', 'sound_m/s', 'visc_Pas',
-                                    'cond_W/(mK)'])
-
-    for pressure in pressure_array:
-        z = calc_compressibility(current_eos_data, alpha_funcs.alpha,
-                                 temp_array, pressure)
-        vol = z * R_UNIV * temp_array/pressure
-        rho = fp.mass/vol
-
-        cv_cp_sound = calc_cv_cp_sound(fp, temp_array, current_eos_data,
-                                       alpha_funcs, vol)
-
-        visc_and_cond = calc_visc_cond_chung(fp, temp_array, rho,
-                                             cv_cp_sound[0])
-
-        df_temp_ = pd.DataFrame({
-                'kind': eos,
-                'press_Pa': pressure,
-                'temp_K': temp_array,
-                'rho_kg/m3': rho,
-                'cp_J/(kgK)': cv_cp_sound[1],
-                'sound_m/s': cv_cp_sound[2],
-                'visc_Pas': visc_and_cond[0],
-                'cond_W/(mK)': visc_and_cond[1]
-            })
-        df_temp = pd.concat([df_temp, df_temp_])
-
-    return df_temp
+    if use_saturation_curve is None:
+        use_saturation_curve = len(pressure_array) > 1
+    p_sat = (saturation_pressure(eos, fp, temp_array)
+             if use_saturation_curve else None)
+
+    # (quantity, press, temp)
+    columns = property_columns(properties)
+    values = np.empty((len(columns), len(pressure_array), len(temp_array)))
+    calc_eos_blocks(fp, current_eos_data, alpha_funcs, temp_array,
+                    pressure_array, values, p_sat, root_solver, properties,
+                    n_threads, block_size)
+
+    results = GridResults(temp_array, pressure_array)
+    results.add_arrays(eos, columns, values)
+    return results
+
+
+def calc_eos_data_stacked(eos_list: list, fp: FluidProperties,
+                          temp_array: np.ndarray, pressure_array: np.ndarray,
+                          use_saturation_curve: bool = None,
+                          properties: list = None, n_threads: int = 1,
+                          block_size: int = None):
+    """
+    calc_eos_data_stacked - calculates all thermodynamic quantities for
+    several eos in one pass, see calc_eos_data
+
+    The eos parameters and alpha functions of eos_list are stacked as
+    leading array axis (see stack_eos_parameter), so that the kernel chain is
+    evaluated once per pressure level for all eos instead of once per eos and
+    pressure level. The results equal those of calc_eos_data for each eos.
+
+    Returns:
+    --------
+    df: Pandas DataFrame
+        dataframe with all the relevant data, ordered by eos (as in
+        eos_list), pressure and temperature
+    """
+    return calc_eos_grid_stacked(eos_list, fp, temp_array, pressure_array,
+                                 use_saturation_curve, properties,
+                                 n_threads, block_size).to_dataframe()
+
+
+def calc_eos_grid_stacked(eos_list: list, fp: FluidProperties,
+                          temp_array: np.ndarray, pressure_array: np.ndarray,
+                          use_saturation_curve: bool = None,
+                          properties: list = None, n_threads: int = 1,
+                          block_size: int = None) -> GridResults:
+    """
+    calc_eos_grid_stacked - calculates all thermodynamic quantities for
+    several eos in one pass on the (pressure_array, temp_array) grid, see
+    calc_eos_data_stacked
+
+    Returns:
+    --------
+    results: GridResults
+        results of the eos of eos_list
+    """
+    temp_array = np.asarray(temp_array, dtype=float)
+    pressure_array = np.asarray(pressure_array, dtype=float)
+
+    ed = stack_eos_parameter([eos_parameter_from_eos_name(eos, fp)
+                              for eos in eos_list])
+    alpha_funcs = stack_alpha_functions([alpha_functions_from_eos_name(eos, fp)
+                                         for eos in eos_list])
+
+    if use_saturation_curve is None:
+        use_saturation_curve = len(pressure_array) > 1
+    p_sat = (np.stack([saturation_pressure(eos, fp, temp_array)
+                       for eos in eos_list])
+             if use_saturation_curve else None)
+
+    # (quantity, eos, press, temp)
+    columns = property_columns(properties)
+    values = np.empty((len(columns), len(eos_list), len(pressure_array),
+                       len(temp_array)))
+    calc_eos_blocks(fp, ed, alpha_funcs, temp_array, pressure_array, values,
+                    p_sat, properties=properties, n_threads=n_threads,
+                    block_size=block_size)
+
+    results = GridResults(temp_array, pressure_array)
+    for k, eos in enumerate(eos_list):
+        results.add_arrays(eos, columns, values[:, k])
+    return results
+
+
+def calc_eos_blocks(fp: FluidProperties, ed: EosParameter,
+                    alpha_funcs: AlphaFunctions, temp_array: np.ndarray,
+                    pressure_array: np.ndarray, values: np.ndarray,
+                    p_sat: np.ndarray = None, root_solver: str = 'analytic',
+                    properties: list = None, n_threads: int = 1,
+                    block_size: int = None):
+    """
+    Evaluates the kernel chain (see calc_eos_kernel) on the (pressure_array,
+    temp_array) grid block by block and writes the results into values of
+    shape (quantity, ..., press, temp)
+
+    The grid is split into blocks of block_size temperatures (default: full
+    rows for one thread, BLOCK_SIZE otherwise), so that the intermediates of
+    the whole chain (compressibility, caloric and transport properties) of a
+    block stay in the cache instead of streaming each step through memory.
+    Each task evaluates one temperature block for a group of pressure levels
+    with its own transport model (keeping the temperature terms of the block
+    for all its levels); the pressure levels are only split into groups if
+    there are fewer blocks than threads. With n_threads > 1, the tasks run in
+    a thread pool; numpy releases the GIL in the array operations, so the
+    blocks are evaluated in parallel without starting processes or copying
+    the results. The results of the analytic root solver do not depend on
+    the blocks.
+    """
+    n_temp, n_press = len(temp_array), len(pressure_array)
+    if block_size is None:
+        block_size = n_temp if n_threads == 1 else BLOCK_SIZE
+    temp_blocks = [slice(i, min(i + block_size, n_temp))
+                   for i in range(0, n_temp, block_size)]
+    n_groups = (min(n_press, -(-2*n_threads//max(len(temp_blocks), 1)))
+                if n_threads > 1 else 1)
+    press_groups = np.array_split(np.arange(n_press), max(n_groups, 1))
+
+    def task(block, levels):
+        transport = ChungTransportModel(fp)
+        temp = temp_array[block]
+        p_sat_block = None if p_sat is None else p_sat[..., block]
+        for j in levels:
+            values[..., j, block] = calc_eos_kernel(
+                fp, ed, alpha_funcs, temp, pressure_array[j], p_sat_block,
+                root_solver, transport, properties)
+
+    tasks = [(block, levels) for block in temp_blocks
+             for levels in press_groups]
+    if n_threads == 1:
+        for block, levels in tasks:
+            task(block, levels)
+    else:
+        with ThreadPoolExecutor(n_threads) as pool:
+            for future in [pool.submit(task, *args) for args in tasks]:
+                future.result()
+
+
+def calc_eos_points(eos: str, fp: FluidProperties, temp: np.ndarray,
+                    press: np.ndarray, properties: list = None):
+    """
+    calc_eos_points - calculates all thermodynamic quantities based on the eos
+    for paired temperature and pressure values (e.g. an unstructured point
+    cloud instead of a grid), see calc_eos_data
+
+    Returns:
+    --------
+    rho, cp, sound, visc, cond: np.ndarray
+        or only the quantities of properties
+    """
+    temp, press = np.broadcast_arrays(np.asarray(temp, dtype=float),
+                                      np.asarray(press, dtype=float))
+    return calc_eos_kernel(fp, eos_parameter_from_eos_name(eos, fp),
+                           alpha_functions_from_eos_name(eos, fp), temp, press,
+                           properties=properties)
+
+
+def calc_eos_kernel(fp: FluidProperties, ed: EosParameter,
+                    alpha_funcs: AlphaFunctions, temp: np.ndarray,
+                    press: np.ndarray, p_sat: np.ndarray = None,
+                    root_solver: str = 'analytic',
+                    transport: ChungTransportModel = None,
+                    properties: list = None):
+    """
+    Kernel chain of the thermodynamic model: compressibility, caloric
+    properties and transport properties for the temperatures temp at the
+    pressure(s) press (scalar or same shape as temp)
+
+    The compressibility factor is computed by the root_solver of
+    ROOT_SOLVERS, 'continuation' requires sorted temperatures and a scalar
+    pressure and falls back to 'analytic' otherwise. The transport model of
+    fp can be passed to reuse its coefficients and temperature terms across
+    calls.
+
+    Only the nodes of the dependency graph (see DEPENDENCIES) required for
+    properties are evaluated, e.g. the density needs the compressibility
+    factor only, the conductivity additionally the caloric properties and
+    the density.
+
+    Returns:
+    --------
+    rho, cp, sound, visc, cond: np.ndarray
+        or only the quantities of properties (in the order of PROPERTIES)
+    """
+    properties = resolve_properties(properties)
+    nodes = required_nodes(properties)
+
+    z = ROOT_SOLVERS[root_solver](ed, alpha_funcs.alpha, temp, press, p_sat)
+    vol = z * R_UNIV * temp/press
+    values = {'rho': fp.mass/vol}
+
+    if 'caloric' in nodes:
+        cv, values['cp'], values['sound'] = calc_cv_cp_sound(
+            fp, temp, ed, alpha_funcs, vol)
+
+    if 'visc' in nodes or 'cond' in nodes:
+        if transport is None:
+            transport = ChungTransportModel(fp)
+        if 'visc' in nodes and 'cond' in nodes:
+            values['visc'], values['cond'] = transport.evaluate(
+                temp, values['rho'], cv)
+        elif 'visc' in nodes:
+            values['visc'] = transport.viscosity(temp, values['rho'])
+        else:
+            values['cond'] = transport.conductivity(temp, values['rho'], cv)
+
+    return tuple(values[prop] for prop in properties)
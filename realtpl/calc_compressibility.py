@@ -3,9 +3,18 @@ import numpy as np
 from realtpl.eos_data import EosParameter
 from realtpl.thermophysical_constants import R_UNIV
 
+# relative margin of the discriminant below which three real roots are assumed
+# by calc_compressibility_continuation
+_DISCRIMINANT_MARGIN = 1e-10
+
+# minimum number of temperatures for calc_compressibility_continuation, the
+# overhead of the anchors dominates for shorter arrays
+_MIN_CONTINUATION_POINTS = 2048
+
 
 def calc_compressibility(ed: EosParameter, alpha: callable,
-                         temp: np.ndarray, press: float):
+                         temp: np.ndarray, press: float,
+                         p_sat: np.ndarray = None):
     """
         compressibility - solves cubic equation for compressibility factor
 
@@ -35,7 +44,16 @@ def calc_compressibility(ed: EosParameter, alpha: callable,
         a thermodynamical point of view, i.e. z_l >= bb, since it can not be
         smaller than the co-volume bb.  If a thermodynamically meaningful
         solutions for z_v and z_l exists, the correct root is determined by
-        evaluating, where the Gibbs energy is smaller, see [1,2].
+        evaluating, where the Gibbs energy is smaller, see [1,2]. If the
+        vapor pressure p_sat of the eos is provided (see saturation.py), this
+        reduces to the comparison of the pressure with p_sat and the Gibbs
+        energy is only evaluated where p_sat is not available.
+
+        The branches (one real root, three real roots, Gibbs energy) are
+        only evaluated for their points: the points of a branch are gathered
+        into compacted arrays and the results are scattered back, so that
+        the work of each branch scales with its number of points, not with
+        the size of the grid.
 
         Parameters
         -----------
@@ -47,6 +65,12 @@ def calc_compressibility(ed: EosParameter, alpha: callable,
             temperature in Kelvin
         press: np.ndarray
             pressure in Pascal
+        p_sat: np.ndarray, optional
+            vapor pressure of the eos in Pascal for temp (NaN if unknown)
+
+        All inputs are broadcast against each other, e.g. for stacked eos
+        parameters (see stack_eos_parameter) of shape (n_eos, 1) and temp of
+        shape (n_temp,), z has the shape (n_eos, n_temp).
 
         Returns
         ----------
@@ -92,65 +116,240 @@ def calc_compressibility(ed: EosParameter, alpha: callable,
     dd = rr**2 - qq**3
 
     # flags for the number of roots
-    one_real_root = (dd >= 0.)
     three_real_roots = (dd < 0)
 
-    # one real root, two imaginary roots exist
+    # only one real root, two imaginary roots exist
+    if np.count_nonzero(three_real_roots) == 0:
+        return _one_real_root(qq, rr, dd, c_2)
+
+    # otherwise: each branch is evaluated for its points only (compacted
+    # arrays), the results are scattered back
+    one_real_root = ~three_real_roots
+    z = np.empty(dd.shape)
+    if np.count_nonzero(one_real_root) != 0:
+        z[one_real_root] = _one_real_root(
+            *(_gather(x, one_real_root) for x in (qq, rr, dd, c_2)))
+    z[three_real_roots] = _three_real_roots(
+        *(_gather(x, three_real_roots)
+          for x in (qq, rr, c_2, aa, bb, ed.d_1, ed.d_2, press,
+                    np.nan if p_sat is None else p_sat)))
+    return z
+
+
+def _gather(x, mask: np.ndarray):
+    # values of x (broadcast to the shape of mask) where mask is set, scalars
+    # are kept
+    if np.ndim(x) == 0:
+        return x
+    return np.broadcast_to(x, mask.shape)[mask]
+
+
+def _one_real_root(qq, rr, dd, c_2):
     sqrt_dd = np.abs(dd)**0.5
     ee = -np.sign(rr)*(abs(rr) + sqrt_dd)**(1/3)
     ff = qq/ee
-    z_one_real = ee + ff - c_2/3
+    return ee + ff - c_2/3
 
-    # check if solution of three real roots is required
-    if np.count_nonzero(three_real_roots) == 0:
-        z_three_real = np.zeros_like(three_real_roots)
 
+def _three_real_roots(qq, rr, c_2, aa, bb, d_1, d_2, press, p_sat):
+    sqrt_qq = np.abs(qq)**0.5
+    phi = np.arccos(rr/(sqrt_qq*qq))
+
+    x1 = -2*sqrt_qq*np.cos(phi/3) - c_2/3
+    x2 = -2*sqrt_qq*np.cos((phi + 2*np.pi)/3) - c_2/3
+    x3 = -2*sqrt_qq*np.cos((phi - 2*np.pi)/3) - c_2/3
+
+    # min root: liquid, max: vapor, center: thermodynamically meaningless
+    z_l = np.minimum(np.minimum(x1, x2), x3)
+    z_v = np.maximum(np.maximum(x1, x2), x3)
+
+    # volume cannot be smaller than the co-volume
+    is_z_v = (z_l < bb)
+
+    # check if all solutions ar already found
+    if np.all(is_z_v):
+        return z_v
+
+    eval_gibbs = ~is_z_v
+
+    # liquid root above, vapor root below the vapor pressure
+    is_sat = eval_gibbs & np.isfinite(p_sat)
+    is_z_l = is_sat & (press >= p_sat)
+    is_z_v = is_z_v | (is_sat & (press < p_sat))
+    eval_gibbs = eval_gibbs & ~is_sat
+
+    # otherwise: determine correct root based on Gibbs
+    # see Ref [1] Eq. 2.58
+    if np.count_nonzero(eval_gibbs) != 0:
+        z_l_g, z_v_g, aa_g, bb_g, d_1_g, d_2_g = (
+            _gather(x, eval_gibbs) for x in (z_l, z_v, aa, bb, d_1, d_2))
+
+        # some clipping to avoid error messages
+        z_l_minus_bb = np.clip((z_l_g - bb_g), 1e-16, np.inf)
+        z_v_minus_bb = np.clip((z_v_g - bb_g), 1e-16, np.inf)
+        dd_l_1 = z_l_g + d_1_g*bb_g
+        dd_l_2 = z_l_g + d_2_g*bb_g
+        dd_v_1 = z_v_g + d_1_g*bb_g
+        dd_v_2 = z_v_g + d_2_g*bb_g
+
+        dg = (np.log(z_l_minus_bb/z_v_minus_bb)
+              + aa_g/(bb_g*(d_1_g - d_2_g))
+              * np.log(dd_l_1/dd_l_2*dd_v_2/dd_v_1)
+              - (z_l_g - z_v_g))
+
+        is_z_l[eval_gibbs] = (dg >= 0)
+        is_z_v[eval_gibbs] = (dg < 0)
+
+    return is_z_l*z_l + is_z_v*z_v
+
+
+def calc_compressibility_continuation(ed: EosParameter, alpha: callable,
+                                      temp: np.ndarray, press: float,
+                                      p_sat: np.ndarray = None,
+                                      stride: int = 16, n_iter: int = 3,
+                                      tol: float = 1e-12):
+    """
+        compressibility_continuation - solves the cubic equation for the
+        compressibility factor by continuation along the temperature axis
+
+        Alternative to calc_compressibility for sorted temperature arrays at
+        a single pressure level, e.g. the rows of dense tables. Neighbouring
+        temperatures have nearly the same compressibility factor, thus, the
+        analytic solution at every stride-th temperature (anchors),
+        interpolated linearly in the temperature, is a very good initial guess
+        for a few Newton iterations on
+                    f(Z) = Z^3 + c_2*Z^2 + c_1*Z + c_0 = 0,
+        which only require multiplications and additions instead of the
+        roots and trigonometric functions of the analytic solution. The
+        iterations are vectorized over all points.
+
+        The analytic solution (calc_compressibility) is used
+        - at the anchors and the last temperature,
+        - where the discriminant is close to zero (nearly double roots) and
+          where three real roots exist and the vapor pressure is unknown,
+        - where the iterations did not converge within n_iter steps.
+        Elsewhere, the cubic has a single real root, which is found by the
+        converged iterations. Where three real roots exist and the vapor
+        pressure is known, the iterations converge to one of the outer roots
+        (liquid or vapor), which is accepted if it is the one selected by
+        calc_compressibility. For unsorted or short (less than
+        _MIN_CONTINUATION_POINTS) temperature arrays, pressure arrays or
+        stacked eos parameters, the analytic solution is used for all points.
+
+        Parameters
+        -----------
+        ed: EosParameter
+        alpha: callable
+        temp: np.ndarray
+            sorted temperature in Kelvin
+        press: float
+            pressure in Pascal
+        p_sat: np.ndarray, optional
+            vapor pressure of the eos in Pascal for temp
+        stride: int
+            distance of the anchors
+        n_iter: int
+            number of Newton iterations
+        tol: float
+            relative tolerance of the last Newton step
+
+        Returns
+        ----------
+        z: np.ndarray
+            compressibility factor
+
+        Authors
+        ----------
+        Trummler, Glatzle
+    """
+    temp = np.asarray(temp, dtype=float)
+    if (temp.ndim != 1 or np.ndim(press) != 0 or np.ndim(ed.a) != 0
+            or len(temp) < max(2*stride, _MIN_CONTINUATION_POINTS)
+            or np.any(np.diff(temp) < 0)):
+        return calc_compressibility(ed, alpha, temp, press, p_sat)
+
+    aa = (ed.a*alpha(temp)*press)/(R_UNIV*temp)**2
+    bb = (ed.b*press)/(R_UNIV*temp)
+
+    c_2 = bb*(ed.d_1_p_d_2 - 1) - 1
+    c_1 = aa + bb*(ed.d_1_t_d_2*bb - ed.d_1_p_d_2*(bb + 1))
+    c_0 = -bb*(ed.d_1_t_d_2*(bb**2 + bb) + aa)
+
+    # discriminant for the classification only (products instead of powers),
+    # with a margin for its rounding errors
+    qq = (c_2*c_2 - 3*c_1)/9
+    rr = ((2*c_2*c_2 - 9*c_1)*c_2 + 27*c_0)/54
+    qq_3 = qq*qq*qq
+    dd = rr*rr - qq_3
+    margin = _DISCRIMINANT_MARGIN*np.abs(qq_3)
+    three_real_roots = (dd < -margin)
+    if p_sat is None:
+        is_analytic = (dd <= margin)
     else:
-        sqrt_qq = np.abs(qq)**0.5
-        phi = np.arccos((rr/(sqrt_qq*qq))*three_real_roots)
-
-        x1 = (-2*sqrt_qq*np.cos(phi/3) - c_2/3)*three_real_roots
-        x2 = (-2*sqrt_qq*np.cos(
-            (phi + 2*np.pi)/3) - c_2/3)*three_real_roots
-        x3 = (-2*sqrt_qq*np.cos(
-            (phi - 2*np.pi)/3) - c_2/3)*three_real_roots
-
-        z_solutions = np.matrix([x1, x2, x3])
-
-        # min root: liquid, max: vapor, center: thermodynamically meaningless
-        z_l = z_solutions.min(0)
-        z_v = z_solutions.max(0)
-        z_l = np.squeeze(np.asarray(z_l))
-        z_v = np.squeeze(np.asarray(z_v))
-
-        # volume cannot be smaller than the co-volume
-        is_z_v = (z_l < bb)*three_real_roots
-
-        # check if all solutions ar already found
-        if sum(is_z_v) == sum(three_real_roots):
-            z_three_real = z_v
-
-        # otherwise: determine correct root based on Gibbs
-        # see Ref [1] Eq. 2.58
-        else:
-            eval_gibbs = three_real_roots & ~is_z_v
-
-            # some clipping and mods to avoid error messages
-            z_l_minus_bb = np.clip((z_l - bb), 1e-16, np.inf)
-            z_v_minus_bb = np.clip((z_v - bb), 1e-16, np.inf)
-            dd_l_1 = (z_l + ed.d_1*bb)*eval_gibbs + 1e-16*~eval_gibbs
-            dd_l_2 = (z_l + ed.d_2*bb)*eval_gibbs + 1e-16*~eval_gibbs
-            dd_v_1 = (z_v + ed.d_1*bb)*eval_gibbs + 1e-16*~eval_gibbs
-            dd_v_2 = (z_v + ed.d_2*bb)*eval_gibbs + 1e-16*~eval_gibbs
-
-            dg = (np.log(z_l_minus_bb/z_v_minus_bb)
-                  + aa/(bb*(ed.d_1 - ed.d_2))
-                  * np.log(dd_l_1/dd_l_2*dd_v_2/dd_v_1)
-                  - (z_l - z_v))
-
-            is_z_l = (dg >= 0)*eval_gibbs
-            is_z_v = is_z_v + (dg < 0)*eval_gibbs
-
-            z_three_real = is_z_l*z_l + is_z_v*z_v
-
-    return one_real_root*z_one_real + three_real_roots*z_three_real
+        is_analytic = ((dd <= margin)
+                       & ~(three_real_roots & np.isfinite(p_sat)))
+    is_analytic[::stride] = True
+    is_analytic[-1] = True
+
+    z = np.empty_like(temp)
+    _calc_compressibility_subset(ed, alpha, temp, press, p_sat, is_analytic,
+                                 z)
+
+    # Newton iterations for the remaining points, starting from the linear
+    # interpolation of the analytic solutions
+    is_newton = ~is_analytic
+    temp_n, c_2_n, c_1_n, c_0_n = (
+        x[is_newton] for x in (temp, c_2, c_1, c_0))
+    z_n = np.interp(temp_n, temp[is_analytic], z[is_analytic])
+    for _ in range(n_iter):
+        f_1 = (3*z_n + 2*c_2_n)*z_n + c_1_n
+        dz = (((z_n + c_2_n)*z_n + c_1_n)*z_n + c_0_n)/f_1
+        z_n -= dz
+    z[is_newton] = z_n
+    is_valid = (np.abs(dz) <= tol*np.abs(z_n))
+
+    # three real roots: the outer roots (f_1 > 0) lie on either side of the
+    # inflection point -c_2/3, the root is selected by the vapor pressure
+    # as in calc_compressibility, i.e. the vapor root below p_sat and the
+    # liquid root above p_sat if it is not smaller than the co-volume
+    is_three = three_real_roots[is_newton]
+    if np.count_nonzero(is_three) != 0:
+        is_vapor = (press < p_sat[is_newton][is_three])
+        z_t = z_n[is_three]
+        is_valid[is_three] &= (
+            (f_1[is_three] > 0)
+            & np.where(is_vapor, 3*z_t > -c_2_n[is_three],
+                       (3*z_t < -c_2_n[is_three])
+                       & (z_t >= bb[is_newton][is_three])))
+
+    # fallback
+    is_fallback = is_newton.copy()
+    is_fallback[is_newton] = ~is_valid
+    if np.count_nonzero(is_fallback) != 0:
+        _calc_compressibility_subset(ed, alpha, temp, press, p_sat,
+                                     is_fallback, z)
+
+    return z
+
+
+def _calc_compressibility_subset(ed, alpha, temp, press, p_sat, mask, z):
+    z[mask] = calc_compressibility(ed, alpha, temp[mask], press,
+                                   None if p_sat is None else p_sat[mask])
+
+
+def calc_compressibility_table(ed: EosParameter, alpha: callable,
+                               temp: np.ndarray, press: np.ndarray,
+                               p_sat: np.ndarray = None) -> np.ndarray:
+    """
+    Compressibility factor interpolated from the universal reduced tables,
+    see realtpl.reduced_tables.calc_compressibility_reduced
+    """
+    # imported here, the reduced tables are built with calc_compressibility
+    from realtpl.reduced_tables import calc_compressibility_reduced
+    return calc_compressibility_reduced(ed, alpha, temp, press, p_sat)
+
+
+# root solvers for the compressibility factor
+ROOT_SOLVERS = {'analytic': calc_compressibility,
+                'continuation': calc_compressibility_continuation,
+                'reduced_table': calc_compressibility_table}
@@ -62,3 +62,72 @@ def calc_cp_ref_nasa(data_nasa, temp: np.array):
     else:
         raise ValueError(f"Unknown n_coeff: {data_nasa.n_coeff}.")
     return cp*R_UNIV
+
+
+def calc_h_s_ref_nasa(data_nasa, temp: np.array):
+    """
+    calculates ideal reference state from NASA polynomials for enthalpy
+    (including the enthalpy of formation) and entropy at 1e5 Pa
+
+    Parameters:
+    -----------
+    data_nasa: dict
+        data with the nasa coefficients
+    temp: np.array
+        temperature array in Kelvin
+
+    Returns:
+    --------
+    h_ref, s_ref: np.array
+       reference enthalpy (J/kmol) and entropy (J/(kmol K)) values for
+       temperature array
+
+    References:
+    ------------
+    .. [1] E. Goos, A. Burcat, and B. Ruscic. Third Millennium Ideal Gas
+          and Condensed Phase Thermochemical Database for Combustion, 2009.
+          URL http://burcat. technion.ac.il/dir/.
+    .. [2] B. J. McBride, M. J. Zehe, and S. Gordon. NASA Glenn Coefficients
+          for Calculating Thermodynamic Properties of Individual Species,
+          NASA/TP-2002-211556, 2002.
+    """
+
+    temp_2 = temp*temp
+    temp_3 = temp_2*temp
+    temp_4 = temp_3*temp
+    log_temp = np.log(temp)
+
+    if data_nasa.n_coeff == 7:
+        h = (data_nasa.get_coeff(0, temp)*temp
+             + data_nasa.get_coeff(1, temp)*temp_2/2
+             + data_nasa.get_coeff(2, temp)*temp_3/3
+             + data_nasa.get_coeff(3, temp)*temp_4/4
+             + data_nasa.get_coeff(4, temp)*temp_4*temp/5
+             + data_nasa.get_coeff(5, temp))
+        s = (data_nasa.get_coeff(0, temp)*log_temp
+             + data_nasa.get_coeff(1, temp)*temp
+             + data_nasa.get_coeff(2, temp)*temp_2/2
+             + data_nasa.get_coeff(3, temp)*temp_3/3
+             + data_nasa.get_coeff(4, temp)*temp_4/4
+             + data_nasa.get_coeff(6, temp))
+    elif data_nasa.n_coeff == 9:
+        temp_inv = 1/temp
+        h = (-data_nasa.get_coeff(0, temp)*temp_inv
+             + data_nasa.get_coeff(1, temp)*log_temp
+             + data_nasa.get_coeff(2, temp)*temp
+             + data_nasa.get_coeff(3, temp)*temp_2/2
+             + data_nasa.get_coeff(4, temp)*temp_3/3
+             + data_nasa.get_coeff(5, temp)*temp_4/4
+             + data_nasa.get_coeff(6, temp)*temp_4*temp/5
+             + data_nasa.get_coeff(7, temp))
+        s = (-data_nasa.get_coeff(0, temp)*temp_inv*temp_inv/2
+             - data_nasa.get_coeff(1, temp)*temp_inv
+             + data_nasa.get_coeff(2, temp)*log_temp
+             + data_nasa.get_coeff(3, temp)*temp
+             + data_nasa.get_coeff(4, temp)*temp_2/2
+             + data_nasa.get_coeff(5, temp)*temp_3/3
+             + data_nasa.get_coeff(6, temp)*temp_4/4
+             + data_nasa.get_coeff(8, temp))
+    else:
+        raise ValueError(f"Unknown n_coeff: {data_nasa.n_coeff}.")
+    return h*R_UNIV, s*R_UNIV
@@ -4,7 +4,7 @@ from realtpl.thermophysical_constants import R_UNIV
 from realtpl.fluid_properties import FluidProperties
 from realtpl.eos_data import EosParameter
 from realtpl.eos_data import AlphaFunctions
-from realtpl.calc_cp_ref_nasa import calc_cp_ref_nasa
+from realtpl.calc_cp_ref_nasa import calc_cp_ref_nasa, calc_h_s_ref_nasa
 
 
 def calc_cv_cp_sound(fp: FluidProperties, temp: np.array, ed: EosParameter,
@@ -70,3 +70,54 @@ def calc_cv_cp_sound(fp: FluidProperties, temp: np.array, ed: EosParameter,
     sound = vol*(-cp/cv*d_p_d_v_c_temp)**0.5
 
     return cv, cp, sound
+
+
+def calc_h_s(fp: FluidProperties, temp: np.array, press: np.array,
+             ed: EosParameter, alpha_funcs: AlphaFunctions, vol: np.array):
+    """
+    Calculation of the enthalpy and entropy with departure functions
+
+    The ideal gas reference state is that of the NASA polynomials (enthalpy
+    including the enthalpy of formation, entropy at 1e5 Pa), see
+    calc_h_s_ref_nasa.
+
+    Parameters:
+    -----------
+    fp: FluidProperties
+    temp: np.array
+    press: np.array
+    ed: EosParameter
+    alpha_funcs: AlphaFunctions
+    vol: np.array
+
+    Returns:
+    --------
+    h, s: np.array
+       enthalpy (J/kg) and entropy (J/(kgK)) values for temperature array
+    """
+
+    # a*alpha(temp) and derivative
+    a_alpha = ed.a*alpha_funcs.alpha(temp)
+    d_a_alpha = ed.a*alpha_funcs.d_alpha_d_temp(temp)
+
+    h_ref, s_ref = calc_h_s_ref_nasa(fp.data_nasa, temp)
+
+    right = (np.log((vol + ed.b*ed.d_1)/(vol + ed.b*ed.d_2))
+             / (ed.b*ed.d_1_m_d_2))
+    dh = press*vol - R_UNIV*temp + (temp*d_a_alpha - a_alpha)*right
+    ds = (R_UNIV*np.log(press*(vol - ed.b)/(R_UNIV*temp)) + d_a_alpha*right
+          - R_UNIV*np.log(press/1e5))
+
+    return (h_ref + dh)/fp.mass, (s_ref + ds)/fp.mass
+
+
+def calc_d_p_d_v(temp: np.array, ed: EosParameter,
+                 alpha_funcs: AlphaFunctions, vol: np.array):
+    """
+    Calculation of the derivative of the pressure with respect to the molar
+    volume at constant temperature (Pa kmol/m3)
+    """
+    a_alpha = ed.a*alpha_funcs.alpha(temp)
+    denom = (vol**2 + ed.d_1_p_d_2*ed.b*vol + ed.d_1_t_d_2*ed.b**2)
+    return -(R_UNIV*temp/(vol - ed.b)**2
+             - a_alpha*(2*vol + ed.d_1_p_d_2*ed.b)/denom**2)
@@ -1,6 +1,37 @@
 import numpy as np
+import threading
+import warnings
 from realtpl.fluid_properties import FluidProperties
 from realtpl.thermophysical_constants import J_PER_CAL, R_MOL
+from realtpl.surrogates import ChebyshevSurrogate
+
+# temperature range (min, max) of the surrogates of the collision integral
+# terms (see set_surrogate_range), None: evaluated exactly
+_SURROGATE_RANGE = None
+
+# surrogates already fitted (None: tolerance not reached), key: fluid data
+# and temperature range
+_SURROGATES = {}
+_SURROGATES_LOCK = threading.Lock()
+
+
+def set_surrogate_range(temp_range: tuple):
+    """
+    Enables piecewise Chebyshev surrogates (see ChebyshevSurrogate) of the
+    collision integral terms of the transport models of fluids with scalar
+    fluid data, fitted on temp_range (min, max) in Kelvin; None disables the
+    surrogates
+    """
+    global _SURROGATE_RANGE
+    _SURROGATE_RANGE = (None if temp_range is None
+                        else tuple(float(x) for x in temp_range))
+
+
+def surrogate_range() -> tuple:
+    """
+    Returns the temperature range of the surrogates, see set_surrogate_range
+    """
+    return _SURROGATE_RANGE
 
 
 def calc_visc_cond_chung(fp: FluidProperties,
@@ -35,102 +66,246 @@ def calc_visc_cond_chung(fp: FluidProperties,
     http://doi.org/10.1021/ie00076a024
     """
 
-    # Convert input data to correct units
-    v_c_cm3_p_mol = fp.v_c*1e3  # cm3/mol
-    rho_mol_p_cm3 = rho_kg_p_m3/fp.mass*1e-3  # mol/cm3
-    cv_cal_p_mol_p_kelvin = (cv_joule_p_kmol_p_kelvin
-                             / (1000*J_PER_CAL))  # cal/mol K
-
-    # Flag for extended calculation (hydrogen bounding, dipole)
-    extended_calc = False
-    if fp.dipole_moment != 0 or fp.association_parameter != 0:
-        extended_calc = True
-
-    # get reduced dipole moment
-    mu_r = 131.3*fp.dipole_moment/(v_c_cm3_p_mol*fp.temp_c)**0.5
-
-    # Constants for A and B
-    a0 = np.array([6.32402, 0.12102e-2, 5.28346, 6.62263, 19.74540,
-                   -1.89992, 24.27450, 0.79716, -0.23816, 0.68629e-1])
-    a1 = np.array([50.41190, -0.11536e-2, 254.20900, 38.09570, 7.63034,
-                   -12.53670, 3.44945, 1.11764, 0.67695e-1, 0.34793])
-    a2 = np.array([-51.68010, -0.62571e-2, -168.481, -8.46414, -14.35440,
-                   4.98529, -11.29130, 0.12348e-1, -0.81630, 0.59256])
-    a3 = np.array([1189.020, 0.37283e-1, 3898.27, 31.4178, 31.5267,
-                   -18.15070, 69.3466, -4.11661, 4.02528, -0.72663])
-    b0 = np.array([2.41657, -0.50924, 6.61069, 14.54250, 0.79274, -5.86340,
-                   81.17100])
-    b1 = np.array([0.74824, -1.50936, 5.62073, -8.91387, 0.82019, 12.80050,
-                   114.15800])
-    b2 = np.array([-0.91858, -49.9912, 64.7599, -5.63794, -0.69369, 9.58926,
-                   -60.841])
-    b3 = np.array([121.721, 69.9834, 27.0389, 74.3435, 6.31734, -65.52920,
-                   466.775])
-
-    # Calculation of A and B
-    a_vec = a0 + a1*fp.omega
-    if extended_calc:
-        a_vec += a2*mu_r**4 + a3*fp.association_parameter
-
-    b_vec = b0 + b1*fp.omega
-    if extended_calc:
-        b_vec += b2*mu_r**4 + b3*fp.association_parameter
-
-    # Collision Integral(ci, original paper Omega*)
-    aa = 1.16145
-    bb = 0.14874
-    cc = 0.52487
-    dd = 0.77320
-    ee = 2.16178
-    ff = 2.43787
-    gg = -6.435e-4
-    hh = 7.27371
-    ss = 18.0323
-    ww = -0.76830
-
-    temp_star = 1.2593*temp/fp.temp_c
-    ci = ((aa/temp_star**bb) +
-          cc/np.exp(dd*temp_star) +
-          ee/np.exp(ff*temp_star) +
-          gg*temp_star**bb*np.sin(ss*temp_star**ww - hh))
-    fc = 1 - 0.2756*fp.omega + 0.059035*mu_r**4 + fp.association_parameter
-
-    # Calculation visc_ref
-    visc_ref = 4.0785e-5*(fp.mass*temp)**0.5/(
-            v_c_cm3_p_mol**(2/3)*ci)*fc
-
-    # Calculation visc
-    y = rho_mol_p_cm3 * v_c_cm3_p_mol / 6
-    g1 = (1 - 0.5*y)/(1 - y)**3
-    g2 = ((a_vec[0]*(1 - np.exp(-a_vec[3]*y))/y
-           + a_vec[1]*g1*np.exp(a_vec[4]*y) + a_vec[2]*g1)
-          / (a_vec[0]*a_vec[3] + a_vec[1] + a_vec[2]))
-    visc_k = visc_ref*(1/g2 + a_vec[5]*y)
-    visc_p = ((36.344e-6*(fp.mass*fp.temp_c)**0.5/v_c_cm3_p_mol**(2/3))
-              * a_vec[6]*y**2*g2
-              * np.exp(a_vec[7] + a_vec[8]/temp_star + a_vec[9]/temp_star**2))
-    visc = visc_k + visc_p  # P
-
-    # Calculation cond_ref
-    alpha = (cv_cal_p_mol_p_kelvin/R_MOL) - (3/2)
-    beta = 0.7862 - 0.7109*fp.omega + 1.3168*fp.omega**2
-    temp_r = temp/fp.temp_c
-    zeta = 2 + 10.5*temp_r**2
-    psi = (1 + alpha*((0.215 + 0.28288*alpha - 1.061*beta + 0.26665*zeta)
-                      / (0.6366 + beta*zeta + 1.061*alpha*beta)))
-    cond_ref = 7.452*(visc_ref/fp.mass)*psi
-
-    # Calculation cond
-    h2 = ((b_vec[0]*(1 - np.exp(-b_vec[3]*y))/y
-           + b_vec[1]*g1*np.exp(b_vec[4]*y) + b_vec[2]*g1)
-          / (b_vec[0]*b_vec[3] + b_vec[1] + b_vec[2]))
-    cond_k = cond_ref*(1/h2 + b_vec[5]*y)
-    cond_p = ((3.039e-4*(fp.temp_c/fp.mass)**0.5/v_c_cm3_p_mol**(2/3))
-              * b_vec[6]*y**2*h2*temp_r**0.5)
-    cond = cond_k + cond_p  # cal/cm s K
-
-    # Conversion to correct unit for main program
-    visc_pascal_s = visc/10
-    cond_watt_p_meter_p_kelvin = cond*J_PER_CAL*100
-
-    return visc_pascal_s, cond_watt_p_meter_p_kelvin
+    return ChungTransportModel(fp).evaluate(temp, rho_kg_p_m3,
+                                            cv_joule_p_kmol_p_kelvin)
+
+
+class ChungTransportModel:
+    """
+    Transport model of Chung et al. 1988 (see calc_visc_cond_chung) for one
+    fluid
+
+    All coefficients depending only on the fluid (A and B vectors, reduced
+    dipole moment, correction factor fc, beta and the prefactors) are
+    computed once on construction. The terms depending only on the
+    temperature (collision integral, reference viscosity, ...) are kept for
+    the last temperature array, so that evaluations for several pressure
+    levels or eos on the same temperature array only do the density and cv
+    dependent work. The model has to be rebuilt if the fluid properties are
+    changed.
+
+    The fluid data may be arrays, e.g. with a trailing axis of size one to
+    evaluate several fluid variants (samples) at once.
+    """
+
+    def __init__(self, fp: FluidProperties):
+        self.fp = fp
+
+        # Convert input data to correct units
+        self.v_c_cm3_p_mol = fp.v_c*1e3  # cm3/mol
+
+        # Flag for extended calculation (hydrogen bounding, dipole)
+        extended_calc = False
+        if np.any(fp.dipole_moment != 0) or np.any(
+                fp.association_parameter != 0):
+            extended_calc = True
+
+        # get reduced dipole moment
+        mu_r = 131.3*fp.dipole_moment/(self.v_c_cm3_p_mol*fp.temp_c)**0.5
+
+        # Calculation of A and B, coefficient i is [..., i]
+        omega = np.asarray(fp.omega)[..., np.newaxis]
+        mu_r_4 = np.asarray(mu_r**4)[..., np.newaxis]
+        kappa = np.asarray(fp.association_parameter)[..., np.newaxis]
+        a_vec = _A0 + _A1*omega
+        if extended_calc:
+            a_vec = a_vec + (_A2*mu_r_4 + _A3*kappa)
+
+        b_vec = _B0 + _B1*omega
+        if extended_calc:
+            b_vec = b_vec + (_B2*mu_r_4 + _B3*kappa)
+        self.a_vec = a_vec
+        self.b_vec = b_vec
+
+        self.fc = (1 - 0.2756*fp.omega + 0.059035*mu_r**4
+                   + fp.association_parameter)
+        self.beta = 0.7862 - 0.7109*fp.omega + 1.3168*fp.omega**2
+
+        # prefactors and denominators
+        self._visc_p_factor = ((36.344e-6*(fp.mass*fp.temp_c)**0.5
+                                / self.v_c_cm3_p_mol**(2/3))
+                               * a_vec[..., 6])
+        self._cond_p_factor = ((3.039e-4*(fp.temp_c/fp.mass)**0.5
+                                / self.v_c_cm3_p_mol**(2/3))
+                               * b_vec[..., 6])
+        self._g2_denominator = (a_vec[..., 0]*a_vec[..., 3] + a_vec[..., 1]
+                                + a_vec[..., 2])
+        self._h2_denominator = (b_vec[..., 0]*b_vec[..., 3] + b_vec[..., 1]
+                                + b_vec[..., 2])
+
+        self._temp = None
+        self._temp_terms = None
+
+        self._surrogate = None
+        fluid_data = (fp.mass, fp.temp_c, fp.v_c, fp.omega, fp.dipole_moment,
+                      fp.association_parameter)
+        if (_SURROGATE_RANGE is not None
+                and all(np.ndim(x) == 0 for x in fluid_data)):
+            key = (fp.name,) + tuple(float(x) for x in fluid_data) + (
+                _SURROGATE_RANGE,)
+            with _SURROGATES_LOCK:
+                if key not in _SURROGATES:
+                    try:
+                        _SURROGATES[key] = ChebyshevSurrogate(
+                            self._collision_terms, _SURROGATE_RANGE)
+                    except ValueError as e:
+                        warnings.warn(f'No surrogate of the transport model '
+                                      f'of {fp.name} on {_SURROGATE_RANGE} '
+                                      f'K ({e}), evaluated exactly.')
+                        _SURROGATES[key] = None
+                self._surrogate = _SURROGATES[key]
+
+    def temperature_terms(self, temp: np.array) -> dict:
+        """
+        Terms depending only on the temperature, kept for the last
+        temperature array
+        """
+        if (self._temp is not None and self._temp.shape == np.shape(temp)
+                and np.array_equal(self._temp, temp)):
+            return self._temp_terms
+
+        fp = self.fp
+        if self._surrogate is not None:
+            visc_ref, visc_p_exp = self._surrogate(temp)
+        else:
+            visc_ref, visc_p_exp = self._collision_terms(temp)
+
+        temp_r = temp/fp.temp_c
+        self._temp_terms = {
+            'visc_ref': visc_ref,
+            'visc_p_exp': visc_p_exp,
+            'cond_ref_factor': 7.452*(visc_ref/fp.mass),
+            'zeta': 2 + 10.5*temp_r**2,
+            'temp_r_sqrt': temp_r**0.5,
+        }
+        self._temp = np.array(temp, dtype=float)
+        return self._temp_terms
+
+    def _collision_terms(self, temp: np.array) -> tuple:
+        # reference viscosity and exponential of the dense viscosity term,
+        # the transcendental part of the temperature terms
+        fp = self.fp
+        a_vec = self.a_vec
+
+        # Collision Integral(ci, original paper Omega*)
+        temp_star = 1.2593*temp/fp.temp_c
+        ci = ((_AA/temp_star**_BB) +
+              _CC/np.exp(_DD*temp_star) +
+              _EE/np.exp(_FF*temp_star) +
+              _GG*temp_star**_BB*np.sin(_SS*temp_star**_WW - _HH))
+
+        # Calculation visc_ref
+        visc_ref = 4.0785e-5*(fp.mass*temp)**0.5/(
+                self.v_c_cm3_p_mol**(2/3)*ci)*self.fc
+
+        return visc_ref, np.exp(a_vec[..., 7] + a_vec[..., 8]/temp_star
+                                + a_vec[..., 9]/temp_star**2)
+
+    def evaluate(self, temp: np.array, rho_kg_p_m3: np.array,
+                 cv_joule_p_kmol_p_kelvin: np.array):
+        """
+        Returns:
+        --------
+        visc, cond: np.array
+           visc and cond values for temperature array
+        """
+        y, g1 = self._density_terms(rho_kg_p_m3)
+        return (self._viscosity(temp, y, g1),
+                self._conductivity(temp, y, g1, cv_joule_p_kmol_p_kelvin))
+
+    def viscosity(self, temp: np.array, rho_kg_p_m3: np.array) -> np.array:
+        """
+        Viscosity only (does not require cv), see evaluate
+        """
+        return self._viscosity(temp, *self._density_terms(rho_kg_p_m3))
+
+    def conductivity(self, temp: np.array, rho_kg_p_m3: np.array,
+                     cv_joule_p_kmol_p_kelvin: np.array) -> np.array:
+        """
+        Heat conductivity only, see evaluate
+        """
+        return self._conductivity(temp, *self._density_terms(rho_kg_p_m3),
+                                  cv_joule_p_kmol_p_kelvin)
+
+    def _density_terms(self, rho_kg_p_m3: np.array) -> tuple:
+        # Convert input data to correct units
+        rho_mol_p_cm3 = rho_kg_p_m3/self.fp.mass*1e-3  # mol/cm3
+
+        y = rho_mol_p_cm3 * self.v_c_cm3_p_mol / 6
+        g1 = (1 - 0.5*y)/(1 - y)**3
+        return y, g1
+
+    def _viscosity(self, temp: np.array, y: np.array,
+                   g1: np.array) -> np.array:
+        a_vec = self.a_vec
+        terms = self.temperature_terms(temp)
+
+        # Calculation visc
+        g2 = ((a_vec[..., 0]*(1 - np.exp(-a_vec[..., 3]*y))/y
+               + a_vec[..., 1]*g1*np.exp(a_vec[..., 4]*y) + a_vec[..., 2]*g1)
+              / self._g2_denominator)
+        visc_k = terms['visc_ref']*(1/g2 + a_vec[..., 5]*y)
+        visc_p = self._visc_p_factor*y**2*g2*terms['visc_p_exp']
+        visc = visc_k + visc_p  # P
+
+        # Conversion to correct unit for main program
+        return visc/10
+
+    def _conductivity(self, temp: np.array, y: np.array, g1: np.array,
+                      cv_joule_p_kmol_p_kelvin: np.array) -> np.array:
+        b_vec = self.b_vec
+        terms = self.temperature_terms(temp)
+
+        # Convert input data to correct units
+        cv_cal_p_mol_p_kelvin = (cv_joule_p_kmol_p_kelvin
+                                 / (1000*J_PER_CAL))  # cal/mol K
+
+        # Calculation cond_ref
+        alpha = (cv_cal_p_mol_p_kelvin/R_MOL) - (3/2)
+        beta = self.beta
+        zeta = terms['zeta']
+        psi = (1 + alpha*((0.215 + 0.28288*alpha - 1.061*beta + 0.26665*zeta)
+                          / (0.6366 + beta*zeta + 1.061*alpha*beta)))
+        cond_ref = terms['cond_ref_factor']*psi
+
+        # Calculation cond
+        h2 = ((b_vec[..., 0]*(1 - np.exp(-b_vec[..., 3]*y))/y
+               + b_vec[..., 1]*g1*np.exp(b_vec[..., 4]*y) + b_vec[..., 2]*g1)
+              / self._h2_denominator)
+        cond_k = cond_ref*(1/h2 + b_vec[..., 5]*y)
+        cond_p = self._cond_p_factor*y**2*h2*terms['temp_r_sqrt']
+        cond = cond_k + cond_p  # cal/cm s K
+
+        # Conversion to correct unit for main program
+        return cond*J_PER_CAL*100
+
+
+# Constants for A and B
+_A0 = np.array([6.32402, 0.12102e-2, 5.28346, 6.62263, 19.74540, -1.89992,
+                24.27450, 0.79716, -0.23816, 0.68629e-1])
+_A1 = np.array([50.41190, -0.11536e-2, 254.20900, 38.09570, 7.63034,
+                -12.53670, 3.44945, 1.11764, 0.67695e-1, 0.34793])
+_A2 = np.array([-51.68010, -0.62571e-2, -168.481, -8.46414, -14.35440,
+                4.98529, -11.29130, 0.12348e-1, -0.81630, 0.59256])
+_A3 = np.array([1189.020, 0.37283e-1, 3898.27, 31.4178, 31.5267, -18.15070,
+                69.3466, -4.11661, 4.02528, -0.72663])
+_B0 = np.array([2.41657, -0.50924, 6.61069, 14.54250, 0.79274, -5.86340,
+                81.17100])
+_B1 = np.array([0.74824, -1.50936, 5.62073, -8.91387, 0.82019, 12.80050,
+                114.15800])
+_B2 = np.array([-0.91858, -49.9912, 64.7599, -5.63794, -0.69369, 9.58926,
+                -60.841])
+_B3 = np.array([121.721, 69.9834, 27.0389, 74.3435, 6.31734, -65.52920,
+                466.775])
+
+# Constants of the collision integral
+_AA = 1.16145
+_BB = 0.14874
+_CC = 0.52487
+_DD = 0.77320
+_EE = 2.16178
+_FF = 2.43787
+_GG = -6.435e-4
+_HH = 7.27371
+_SS = 18.0323
+_WW = -0.76830
@@ -0,0 +1,356 @@
+import numpy as np
+import os
+import tempfile
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.thermophysical_constants import R_UNIV
+from realtpl.eos_data import EosParameter, AlphaFunctions
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_compressibility import ROOT_SOLVERS
+from realtpl.calc_cv_cp_sound import calc_cv_cp_sound, calc_h_s, calc_d_p_d_v
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.saturation import saturation_pressure, saturation_temperature
+from realtpl.saturation import _cubic_roots
+from realtpl.properties import resolve_properties, PROPERTIES
+
+CFD_FORMATS = ['rgp', 'openfoam']
+
+# quantities of the CFD tables (in the order of the tables 1-9 of the RGP
+# format) and their units
+CFD_QUANTITIES = {'h': 'J/kg',
+                  'sound': 'm/s',
+                  'vol': 'm3/kg',
+                  'cv': 'J/(kgK)',
+                  'cp': 'J/(kgK)',
+                  'dpdv': 'Pakg/m3',
+                  's': 'J/(kgK)',
+                  'visc': 'Pas',
+                  'cond': 'W/(mK)'}
+
+# phase markers of the table points
+PHASE_LIQUID = 0
+PHASE_VAPOR = 1
+PHASE_SUPERCRITICAL = 2
+
+
+def write_cfd_tables(eos: str, fp: FluidProperties, temp_array: np.ndarray,
+                     pressure_array: np.ndarray, output_dir: str,
+                     formats: list, root_solver: str = 'analytic',
+                     results=None, properties: list = None) -> list:
+    """
+    Evaluates the eos on the (pressure_array, temp_array) grid and streams
+    the pressure levels directly into real gas tables of CFD codes
+
+    The kernel chain is evaluated once per pressure level for all formats
+    (see CFD_FORMATS): compressibility, the quantities of CFD_QUANTITIES
+    (including enthalpy, entropy and dp/dv at constant temperature, see
+    calc_h_s) and a phase marker (PHASE_LIQUID, PHASE_VAPOR or
+    PHASE_SUPERCRITICAL) from the vapor pressure curve of the eos. The
+    saturation temperature of each pressure level and the saturated liquid
+    and vapor states are appended when the tables are closed. The tables are
+    written to <output_dir>/<fluid>/cfd/. If results (GridResults) is
+    given, the quantities of properties (default: all) are taken from the
+    same pass and added to results, so that the eos is evaluated only once
+    for the tables and the other outputs.
+
+    Parameters:
+    -----------
+    eos: str
+        eos-name
+    fp:  FluidProperties
+    temp_array: numpy array
+        temperatures in Kelvin
+    pressure_array: numpy array
+        pressures in Pascal
+    output_dir: str
+    formats: list
+        formats of CFD_FORMATS
+    root_solver: str, optional
+        solver for the compressibility factor, see ROOT_SOLVERS
+    results: GridResults, optional
+    properties: list, optional
+        quantities added to results, see PROPERTIES
+
+    Returns:
+    --------
+    paths: list
+        written table file (rgp) or directory (openfoam) of each format
+    """
+    temp_array = np.asarray(temp_array, dtype=float)
+    pressure_array = np.asarray(pressure_array, dtype=float)
+    path = os.path.join(output_dir, fp.name, 'cfd')
+    os.makedirs(path, exist_ok=True)
+
+    ed = eos_parameter_from_eos_name(eos, fp)
+    alpha_funcs = alpha_functions_from_eos_name(eos, fp)
+    transport = ChungTransportModel(fp)
+    p_sat = saturation_pressure(eos, fp, temp_array)
+
+    writers = [_CFD_WRITERS[fmt](eos, fp, temp_array, pressure_array, path)
+               for fmt in formats]
+    if results is not None:
+        writers.append(_ResultsWriter(eos, temp_array, pressure_array,
+                                      results, properties))
+    for j, pressure in enumerate(pressure_array):
+        z = ROOT_SOLVERS[root_solver](ed, alpha_funcs.alpha, temp_array,
+                                      pressure, p_sat)
+        vol = z * R_UNIV * temp_array/pressure
+        values = calc_cfd_quantities(fp, ed, alpha_funcs, temp_array,
+                                     pressure, vol, transport)
+        phase = _phase(fp, temp_array, pressure, p_sat)
+        for writer in writers:
+            writer.write_level(j, values, phase)
+
+    saturation = _saturation_states(
+        fp, ed, alpha_funcs, pressure_array,
+        saturation_temperature(eos, fp, pressure_array), transport)
+    paths = [writer.close(saturation) for writer in writers]
+    return paths[:len(formats)]
+
+
+def calc_cfd_quantities(fp: FluidProperties, ed: EosParameter,
+                        alpha_funcs: AlphaFunctions, temp: np.ndarray,
+                        press: np.ndarray, vol: np.ndarray,
+                        transport: ChungTransportModel = None) -> dict:
+    """
+    Quantities of CFD_QUANTITIES (mass-specific) and the density rho at the
+    temperatures temp, pressure(s) press and molar volumes vol (m3/kmol)
+    """
+    if transport is None:
+        transport = ChungTransportModel(fp)
+    cv, cp, sound = calc_cv_cp_sound(fp, temp, ed, alpha_funcs, vol)
+    h, s = calc_h_s(fp, temp, press, ed, alpha_funcs, vol)
+    rho = fp.mass/vol
+    visc, cond = transport.evaluate(temp, rho, cv)
+    return {'rho': rho,
+            'h': h,
+            'sound': sound,
+            'vol': vol/fp.mass,
+            'cv': cv/fp.mass,
+            'cp': cp,
+            'dpdv': calc_d_p_d_v(temp, ed, alpha_funcs, vol)*fp.mass,
+            's': s,
+            'visc': visc,
+            'cond': cond}
+
+
+def _phase(fp, temp, pressure, p_sat):
+    # liquid above and vapor below the vapor pressure curve, above the
+    # critical temperature gas or supercritical
+    phase = np.where(pressure > p_sat, PHASE_LIQUID, PHASE_VAPOR)
+    phase[~np.isfinite(p_sat) & (pressure > fp.p_c)] = PHASE_SUPERCRITICAL
+    return phase
+
+
+def _saturation_states(fp, ed, alpha_funcs, press, temp_sat, transport):
+    # saturated liquid and vapor at the saturation temperatures of the
+    # (subcritical) pressure levels, NaN for the other levels
+    is_sat = np.isfinite(temp_sat)
+    temp = temp_sat[is_sat]
+    p = press[is_sat]
+    aa = ed.a*alpha_funcs.alpha(temp)*p/(R_UNIV*temp)**2
+    bb = ed.b*p/(R_UNIV*temp)
+    z_l, z_v, _, _ = _cubic_roots(aa, bb, ed.d_1, ed.d_2)
+
+    saturation = {'temp': temp_sat}
+    for state, z in [('liquid', z_l), ('vapor', z_v)]:
+        values = calc_cfd_quantities(fp, ed, alpha_funcs, temp, p,
+                                     z * R_UNIV * temp/p, transport)
+        saturation[state] = {}
+        for quantity, value in values.items():
+            saturation[state][quantity] = np.full(len(press), np.nan)
+            saturation[state][quantity][is_sat] = value
+    return saturation
+
+
+class _RgpWriter:
+    """
+    Real gas property table in the layout of the RGP format (ANSYS CFX):
+    parameter section, a superheat table per quantity of CFD_QUANTITIES
+    (temperature axis, pressure axis, values with the temperature varying
+    fastest, then the saturation temperature and the saturated vapor value
+    of each pressure level) and the saturation table (pressures, saturation
+    temperatures, the saturated liquid and the saturated vapor values of the
+    quantities)
+
+    The superheat tables are ordered by quantity, so the pressure levels are
+    buffered in a temporary binary file until the table is closed. For
+    supercritical pressure levels, the lowest table temperature and its
+    value are used as saturation state.
+    """
+
+    def __init__(self, eos, fp, temp, press, path):
+        self.eos = eos
+        self.fp = fp
+        self.temp = temp
+        self.press = press
+        self.file = os.path.join(path, f'{eos}.rgp')
+        self._scratch = tempfile.TemporaryDirectory(dir=path)
+        self._values = np.lib.format.open_memmap(
+            os.path.join(self._scratch.name, 'values.npy'), mode='w+',
+            dtype=float, shape=(len(CFD_QUANTITIES), len(press), len(temp)))
+
+    def write_level(self, j, values, phase):
+        for k, quantity in enumerate(CFD_QUANTITIES):
+            self._values[k, j] = values[quantity]
+
+    def close(self, saturation):
+        n_temp, n_press = len(self.temp), len(self.press)
+        is_sat = np.isfinite(saturation['temp'])
+        temp_sat = np.where(is_sat, saturation['temp'], self.temp[0])
+        p_sat = self.press[is_sat]
+        name = self.fp.name
+
+        with open(self.file, 'w') as f:
+            f.write(f'$$$$HEADER\n$$${name}\n1\n$$PARAM\n26\n')
+            params = [
+                ('DESCRIPTION', f'{name}, {self.eos} eos (realtpl)'),
+                ('NAME', name),
+                ('INDEX', name),
+                ('DATABASE', 'realtpl'),
+                ('MODEL', 3),
+                ('UNITS', 1),
+                ('PMIN_SUPERHEAT', self.press[0]),
+                ('PMAX_SUPERHEAT', self.press[-1]),
+                ('TMIN_SUPERHEAT', self.temp[0]),
+                ('TMAX_SUPERHEAT', self.temp[-1]),
+                ('TMIN_SATURATION', _min(temp_sat[is_sat], self.temp[0])),
+                ('TMAX_SATURATION', _max(temp_sat[is_sat], self.temp[0])),
+                ('SUPERCOOLING', 0.),
+                ('P_CRITICAL', self.fp.p_c),
+                ('P_TRIPLE', _min(p_sat, self.press[0])),
+                ('T_CRITICAL', self.fp.temp_c),
+                ('T_TRIPLE', _min(temp_sat[is_sat], self.temp[0]))]
+            for key, value in params:
+                f.write(f'{key}\n{_format(value)}\n')
+            for k in range(len(CFD_QUANTITIES)):
+                f.write(f'TABLE_{k + 1}\n{n_temp} {n_press}\n')
+            f.write(f'SAT_TABLE\n{len(p_sat)} 4 {len(CFD_QUANTITIES)}\n')
+
+            f.write(f'$$SURFACE_TENSION\n0\n$$${name}\n1\n$$DATA\n'
+                    f'$$SUPER_TABLE\n{len(CFD_QUANTITIES)}\n')
+            for k, quantity in enumerate(CFD_QUANTITIES):
+                f.write(f'$TABLE_{k + 1}\n3\n{n_temp} {n_press}\n')
+                _write_values(f, [self.temp])
+                _write_values(f, [self.press])
+                _write_values(f, self._values[k])
+                value_sat = np.where(is_sat,
+                                     saturation['vapor'][quantity],
+                                     self._values[k, :, 0])
+                _write_values(f, [temp_sat, value_sat])
+
+            f.write(f'$$SAT_TABLE\n{len(p_sat)} 4 {len(CFD_QUANTITIES)}\n')
+            _write_values(f, [p_sat, temp_sat[is_sat]]
+                          + [saturation[state][quantity][is_sat]
+                             for state in ['liquid', 'vapor']
+                             for quantity in CFD_QUANTITIES])
+
+        del self._values
+        self._scratch.cleanup()
+        return self.file
+
+
+class _OpenFoamWriter:
+    """
+    Tabulated properties in the format of the OpenFOAM interpolation2DTable
+    (one file per quantity with a list of (pressure ((temperature value)
+    ...)) entries), written pressure level by pressure level to
+    <path>/openfoam/<eos>/
+
+    The files are the quantities of CFD_QUANTITIES, the density rho and the
+    phase marker phase (see PHASE_LIQUID, ...). The saturation temperature
+    over the subcritical pressure levels is written to the file T_sat in the
+    format of the interpolationTable.
+    """
+
+    def __init__(self, eos, fp, temp, press, path):
+        self.temp = temp
+        self.press = press
+        self.path = os.path.join(path, 'openfoam', eos)
+        os.makedirs(self.path, exist_ok=True)
+        units = dict(CFD_QUANTITIES, rho='kg/m3', phase='-')
+        self._files = {}
+        for quantity, unit in units.items():
+            f = open(os.path.join(self.path, quantity), 'w')
+            f.write(f'// {fp.name}, {eos} eos (realtpl)\n'
+                    f'// {quantity} [{unit}] over p [Pa] and T [K]\n(\n')
+            self._files[quantity] = f
+
+    def write_level(self, j, values, phase):
+        values = dict(values, phase=phase)
+        for quantity, f in self._files.items():
+            f.write(f'    ({_format(self.press[j])}\n    (\n')
+            np.savetxt(f, np.column_stack([self.temp, values[quantity]]),
+                       fmt=('        (%.9e %d)' if quantity == 'phase'
+                            else '        (%.9e %.9e)'))
+            f.write('    ))\n')
+
+    def close(self, saturation):
+        for f in self._files.values():
+            f.write(')\n')
+            f.close()
+
+        is_sat = np.isfinite(saturation['temp'])
+        with open(os.path.join(self.path, 'T_sat'), 'w') as f:
+            f.write('// saturation temperature [K] over p [Pa]\n(\n')
+            np.savetxt(f, np.column_stack([self.press[is_sat],
+                                           saturation['temp'][is_sat]]),
+                       fmt='    (%.9e %.9e)')
+            f.write(')\n')
+        return self.path
+
+
+class _ResultsWriter:
+    """
+    Collects the quantities of properties of the pressure levels and adds
+    them to the GridResults results when closed
+    """
+
+    def __init__(self, eos, temp, press, results, properties):
+        self.eos = eos
+        self.results = results
+        self.properties = resolve_properties(properties)
+        self._values = np.empty((len(self.properties), len(press),
+                                 len(temp)))
+
+    def write_level(self, j, values, phase):
+        for k, prop in enumerate(self.properties):
+            self._values[k, j] = values[prop]
+
+    def close(self, saturation):
+        self.results.add_arrays(self.eos, [PROPERTIES[prop]
+                                           for prop in self.properties],
+                                self._values)
+        return None
+
+
+def _write_values(f, arrays, n_per_line=5):
+    # values of the arrays (or rows of a table) one after another,
+    # n_per_line values per line
+    carry = np.empty(0)
+    for array in arrays:
+        values = np.concatenate([carry, np.ravel(array)])
+        n_full = len(values) - len(values) % n_per_line
+        if n_full:
+            np.savetxt(f, values[:n_full].reshape(-1, n_per_line),
+                       fmt='%.9e')
+        carry = values[n_full:]
+    if len(carry):
+        np.savetxt(f, carry.reshape(1, -1), fmt='%.9e')
+
+
+def _format(value):
+    return f'{value:.9e}' if isinstance(value, float) else str(value)
+
+
+def _min(values, default):
+    return float(np.min(values)) if len(values) else float(default)
+
+
+def _max(values, default):
+    return float(np.max(values)) if len(values) else float(default)
+
+
+_CFD_WRITERS = {'rgp': _RgpWriter,
+                'openfoam': _OpenFoamWriter}
@@ -0,0 +1,139 @@
+import hashlib
+import numpy as np
+import os
+import shutil
+import yaml
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.properties import property_columns
+from realtpl.result_cache import fluid_hash, code_version, _save_atomic
+
+MANIFEST_FILE = 'manifest.yaml'
+
+
+class Checkpoint:
+    """
+    Checkpoint of a run on the (press, temp) grid
+
+    The results of each kind (ref_data, SRK, PR, ...) are computed in blocks
+    of block_size consecutive pressure levels. Each completed block is stored
+    as npz file in path and recorded in the manifest (manifest.yaml), which
+    also holds the settings of the run (see checkpoint_settings). Thus, a run
+    stopped by a crash or a wall-time limit loses at most the blocks in
+    progress: with resume, the manifest is validated against the settings and
+    only the blocks not recorded are computed. Without resume, a previous
+    checkpoint in path is removed.
+    """
+
+    def __init__(self, path: str, settings: dict, resume: bool = False):
+        self.path = path
+        self.settings = settings
+        self.block_size = int(settings['block_size'])
+        self.n_reused = 0
+        self.n_computed = 0
+
+        manifest_file = os.path.join(path, MANIFEST_FILE)
+        if resume:
+            if not os.path.exists(manifest_file):
+                raise RuntimeError(f'No checkpoint to resume from in {path}.')
+            with open(manifest_file) as f:
+                manifest = yaml.safe_load(f)
+            differing = [key for key in settings
+                         if manifest['settings'].get(key) != settings[key]]
+            if differing:
+                raise RuntimeError(f'wrong input: the checkpoint in {path} '
+                                   f'was written with a different '
+                                   f'{", ".join(differing)}.\n'
+                                   f'Run without --resume to start over.')
+            self.completed = {kind: set(blocks) for kind, blocks
+                              in manifest['completed'].items()}
+        else:
+            self.remove()
+            os.makedirs(path)
+            self.completed = {}
+            self._write_manifest()
+
+    def compute(self, kind: str, pressure_array: np.ndarray,
+                calc: callable) -> np.ndarray:
+        """
+        Returns the values of kind for all pressures of pressure_array
+
+        Parameters:
+        -----------
+        kind: str
+        pressure_array: numpy array
+        calc: callable
+            calc(press) returns the values of kind for the pressures press as
+            array of shape (n_columns, len(press), n_temp)
+
+        Returns:
+        --------
+        values: numpy array
+            shape (n_columns, len(pressure_array), n_temp)
+        """
+        values = None
+        completed = self.completed.setdefault(kind, set())
+        for index, start in enumerate(range(0, len(pressure_array),
+                                            self.block_size)):
+            press = pressure_array[start:start + self.block_size]
+            file = os.path.join(self.path, f'{kind}_{index}.npz')
+            if index in completed:
+                with np.load(file) as data:
+                    block = data['values']
+                self.n_reused += 1
+            else:
+                block = calc(press)
+                _save_atomic(file, block)
+                completed.add(index)
+                self._write_manifest()
+                self.n_computed += 1
+
+            if values is None:
+                values = np.empty((block.shape[0], len(pressure_array),
+                                   block.shape[2]))
+            values[:, start:start + len(press)] = block
+        return values
+
+    def remove(self):
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+
+    def _write_manifest(self):
+        # write to a temporary file first, so that the manifest only lists
+        # blocks which are completely written
+        manifest = {
+            'settings': self.settings,
+            'completed': {kind: sorted(blocks)
+                          for kind, blocks in self.completed.items()},
+        }
+        file = os.path.join(self.path, MANIFEST_FILE)
+        tmp_file = file + f'.{os.getpid()}.tmp'
+        with open(tmp_file, 'w') as f:
+            yaml.safe_dump(manifest, f, sort_keys=False)
+        os.replace(tmp_file, file)
+
+
+def checkpoint_settings(cfg: dict, fp: FluidProperties) -> dict:
+    """
+    Settings of the run a checkpoint is only valid for: the fluid data, the
+    grid, the kinds, the properties, the solvers and the code version
+    (source of realtpl and CoolProp version)
+    """
+    return {
+        'fluid': fp.name,
+        'fluid_data': fluid_hash(fp),
+        'temperatures': _array_hash(cfg['temp_array']),
+        'pressures': _array_hash(cfg['pressure_array']),
+        'kinds': (['ref_data'] if cfg['include_ref_data'] else []
+                  ) + list(cfg['eos_list']),
+        'properties': property_columns(cfg['properties']),
+        'root_solver': cfg['root_solver'],
+        'reference_backend': cfg['reference_backend'],
+        'block_size': int(cfg['checkpoint_block_size']),
+        'code_version': code_version(),
+    }
+
+
+def _array_hash(array: np.ndarray) -> str:
+    return hashlib.sha256(np.asarray(array, dtype=float).tobytes()
+                          ).hexdigest()
@@ -1,15 +1,69 @@
-import numpy as np
 import os
 import yaml
 import warnings
 
+from CoolProp.CoolProp import PropsSI
+
+from realtpl.write_data_to_files import OUTPUT_FORMATS
+from realtpl.calc_compressibility import ROOT_SOLVERS
+from realtpl.uncertainty import UNCERTAIN_INPUTS
+from realtpl.ref_data_from_coolprop import REFERENCE_BACKENDS
+from realtpl.properties import PROPERTIES
+from realtpl.cfd_export import CFD_FORMATS
+from realtpl.grid import TEMPERATURE_SPACINGS, PRESSURE_SPACINGS
+from realtpl.grid import DENSITY_SPACINGS
+from realtpl.grid import temperature_axis, pressure_axis, axis_from_file
+from realtpl.grid import density_axis, PSEUDO_BOILING
+
 _CFG_DEFAULT = {'eos_list': ['SRK', 'PR', 'RKPR'],
                 'include_ref_data': True,
+                'properties': None,
+                'reference_backend': 'HEOS',
+                'reference_table_dir': None,
+                'reference_audit_samples': 0,
                 'temperature_step_K': 1,
+                'temperature_spacing': 'linear',
+                'temperature_n_points': None,
+                'temperature_cluster_K': None,
+                'temperature_cluster_strength': 5.,
+                'temperature_file': None,
                 'pressure_step_Pa': 1e5,
+                'pressure_spacing': 'linear',
+                'pressure_n_points': None,
+                'pressure_file': None,
+                'density_start_kgm3': None,
+                'density_end_kgm3': None,
+                'density_step_kgm3': 1.,
+                'density_spacing': 'linear',
+                'density_n_points': None,
                 'n_nasa_coeff': 7,
                 'output_dir': 'results',
                 'save_data_to_csv': True,
+                'output_format': 'csv',
+                'output_compression': None,
+                'save_saturation_curve': False,
+                'save_pseudo_boiling_curve': False,
+                'use_cache': False,
+                'cache_block_size': 1000,
+                'checkpoint': False,
+                'checkpoint_block_size': 10,
+                'n_workers': 1,
+                'memory_limit_GB': None,
+                'n_threads': 1,
+                'block_size': None,
+                'save_memmap_tables': False,
+                'cfd_export': [],
+                'root_solver': 'analytic',
+                'reduced_table_dir': None,
+                'stack_eos': False,
+                'use_surrogates': False,
+                'uncertainty_rel_std': None,
+                'uncertainty_n_samples': 1000,
+                'point_cloud_temp_file': None,
+                'point_cloud_press_file': None,
+                'point_cloud_density_file': None,
+                'point_cloud_dtype': 'float64',
+                'point_cloud_chunk_size': 1000000,
                 'show_plots': True,
                 'save_plots': False,
                 'show_deviation': False,
@@ -24,6 +78,84 @@ def load_config(args):
         cfg_user = yaml.safe_load(f)
     cfg.update(cfg_user)
 
+    if cfg['reference_backend'] not in REFERENCE_BACKENDS:
+        raise RuntimeError(f'wrong input: unknown reference_backend '
+                           f'{cfg["reference_backend"]}, choose from '
+                           f'{", ".join(REFERENCE_BACKENDS)}.\n'
+                           f'Revise the config file {file}.')
+    if cfg['properties'] is not None and (
+            not isinstance(cfg['properties'], list) or not cfg['properties']
+            or not set(cfg['properties']) <= set(PROPERTIES)):
+        raise RuntimeError(f'wrong input: properties has to be a list of '
+                           f'{", ".join(PROPERTIES)}.\n'
+                           f'Revise the config file {file}.')
+    if (not isinstance(cfg['reference_audit_samples'], int)
+            or cfg['reference_audit_samples'] < 0):
+        raise RuntimeError(f'wrong input: reference_audit_samples has to be '
+                           f'a non-negative integer.\n'
+                           f'Revise the config file {file}.')
+
+    # isochoric mode: densities instead of pressures as second input
+    cfg['isochoric'] = bool(cfg['density_start_kgm3']
+                            or cfg['point_cloud_density_file'])
+    if cfg['isochoric']:
+        # no plots unless requested, they are not available in this mode
+        cfg['show_plots'] = cfg_user.get('show_plots', False)
+        unsupported = [key for key, value in [
+            ('n_workers > 1 or auto', cfg['n_workers'] != 1),
+            ('n_threads > 1', cfg['n_threads'] != 1),
+            ('point_cloud_chunk_size auto',
+             cfg['point_cloud_chunk_size'] == 'auto'),
+            ('use_cache', cfg['use_cache']),
+            ('save_memmap_tables', cfg['save_memmap_tables']),
+            ('checkpoint', cfg['checkpoint']),
+            ('stack_eos', cfg['stack_eos']),
+            ('cfd_export', cfg['cfd_export']),
+            ('uncertainty_rel_std', cfg['uncertainty_rel_std'] is not None),
+            ('show_plots', cfg['show_plots']),
+            ('save_plots', cfg['save_plots']),
+            ('show_deviation', cfg['show_deviation']),
+            ('save_deviation', cfg['save_deviation']),
+            ('save_saturation_curve', cfg['save_saturation_curve']),
+            ('save_pseudo_boiling_curve', cfg['save_pseudo_boiling_curve'])]
+            if value]
+        if unsupported:
+            raise RuntimeError(f'wrong input: the isochoric mode does not '
+                               f'work with {", ".join(unsupported)}.\n'
+                               f'Revise the config file {file}.')
+
+    # point cloud mode: paired temperatures and pressures (or densities) from
+    # files, no grid
+    if (cfg['point_cloud_temp_file'] or cfg['point_cloud_press_file']
+            or cfg['point_cloud_density_file']):
+        if not cfg.get('fluid_name'):
+            raise RuntimeError(f'fluid_name is mandatory in config file. \n'
+                               f'Revise the config file {file}.')
+        if not (cfg['point_cloud_temp_file']
+                and bool(cfg['point_cloud_press_file'])
+                != bool(cfg['point_cloud_density_file'])):
+            raise RuntimeError(f'wrong input: point_cloud_temp_file and '
+                               f'either point_cloud_press_file or '
+                               f'point_cloud_density_file are required for '
+                               f'the point cloud mode.\n'
+                               f'Revise the config file {file}.')
+        if cfg['point_cloud_chunk_size'] != 'auto':
+            cfg['point_cloud_chunk_size'] = int(
+                cfg['point_cloud_chunk_size'])
+        return cfg
+
+    # explicit axes from files define the ranges
+    if cfg['temperature_file']:
+        cfg['temperature_spacing'] = 'file'
+        temp = axis_from_file(cfg['temperature_file'])
+        cfg['temperature_start_K'] = temp[0]
+        cfg['temperature_end_K'] = temp[-1]
+    if cfg['pressure_file']:
+        cfg['pressure_spacing'] = 'file'
+        press = axis_from_file(cfg['pressure_file'])
+        cfg['pressure_start_Pa'] = press[0]
+        cfg['pressure_end_Pa'] = press[-1]
+
     # check config for mandatory input
     for key in ['fluid_name',
                 'temperature_start_K',
@@ -32,6 +164,10 @@ def load_config(args):
             raise RuntimeError(f'{key} is mandatory in config file. \n'
                                f'Revise the config file {file}.')
 
+    # isochoric mode: temperature and density axes, no pressure levels
+    if cfg['isochoric']:
+        return _load_isochoric_config(cfg, file)
+
     if not cfg.get('pressure_Pa') and not cfg.get('pressure_start_Pa'):
         raise RuntimeError(f'Either pressure_Pa or pressure_start_Pa has to be'
                            f' provided in the config file.\n'
@@ -55,10 +191,7 @@ def load_config(args):
         cfg[key] = float(cfg[key])
 
     # check consistency of config input
-    if cfg['temperature_start_K'] > cfg['temperature_end_K']:
-        raise RuntimeError(f'wrong input: temperature_start_K >'
-                           ' temperature_end_K.\n'
-                           f'Revise the config file {file}.')
+    _check_axes(cfg, file, 'pressure', PRESSURE_SPACINGS)
 
     if cfg['pressure_start_Pa'] > cfg['pressure_end_Pa']:
         raise RuntimeError(f'wrong input: pressure_start_Pa >'
@@ -68,12 +201,13 @@ def load_config(args):
     if (cfg['pressure_end_Pa'] > cfg['pressure_start_Pa'] and
             (cfg['show_plots'] or cfg['save_plots'] or
              cfg['show_deviation'] or cfg['save_deviation'] or
-             not cfg['save_data_to_csv'])):
+             not (cfg['save_data_to_csv'] or cfg['save_memmap_tables']
+                  or cfg['cfd_export']))):
         raise RuntimeError(f'wrong input: pressure array (e.g. pressure_end_Pa'
                            f' > pressure_Pa or pressure_end_Pa > '
                            f'pressure_start_Pa) does not work with show/save '
                            f'plots and deviation, but requires save data to '
-                           f'csv. \n'
+                           f'csv, save memmap tables or cfd export. \n'
                            f'Revise the config file {file}. ')
 
     if ((cfg['show_deviation'] or cfg['save_deviation']) and
@@ -81,16 +215,117 @@ def load_config(args):
         raise RuntimeError(f'Deviation can only be evaluated with '
                            f'include_ref_data. Revise the config file {file}.')
 
-    cfg['temp_array'] = np.arange(
-        cfg['temperature_start_K'],
-        cfg['temperature_end_K'] + cfg['temperature_step_K'],
-        cfg['temperature_step_K']
-    )
-    cfg['pressure_array'] = np.arange(
-        cfg['pressure_start_Pa'],
-        cfg['pressure_end_Pa'] + cfg['pressure_step_Pa'],
-        cfg['pressure_step_Pa']
-    )
+    if (not isinstance(cfg['cfd_export'], list)
+            or not set(cfg['cfd_export']) <= set(CFD_FORMATS)):
+        raise RuntimeError(f'wrong input: cfd_export has to be a list of '
+                           f'{", ".join(CFD_FORMATS)}.\n'
+                           f'Revise the config file {file}.')
+    if cfg['cfd_export'] and (cfg['use_cache'] or cfg['checkpoint']
+                              or cfg['save_memmap_tables']
+                              or cfg['stack_eos']):
+        raise RuntimeError(f'wrong input: cfd_export does not work with '
+                           f'use_cache, checkpoint, save_memmap_tables or '
+                           f'stack_eos.\nRevise the config file {file}.')
+
+    if cfg['root_solver'] not in ROOT_SOLVERS:
+        raise RuntimeError(f'wrong input: unknown root_solver '
+                           f'{cfg["root_solver"]}, choose from '
+                           f'{", ".join(ROOT_SOLVERS)}.\n'
+                           f'Revise the config file {file}.')
+
+    if cfg['n_workers'] != 'auto' and (not isinstance(cfg['n_workers'], int)
+                                       or cfg['n_workers'] < 1):
+        raise RuntimeError(f'wrong input: n_workers has to be a positive '
+                           f'integer or auto.\n'
+                           f'Revise the config file {file}.')
+
+    if not isinstance(cfg['n_threads'], int) or cfg['n_threads'] < 1:
+        raise RuntimeError(f'wrong input: n_threads has to be a positive '
+                           f'integer.\n'
+                           f'Revise the config file {file}.')
+
+    if cfg['block_size'] is not None and (
+            not isinstance(cfg['block_size'], int) or cfg['block_size'] < 1):
+        raise RuntimeError(f'wrong input: block_size has to be a positive '
+                           f'integer.\n'
+                           f'Revise the config file {file}.')
+
+    if cfg['n_threads'] > 1 and cfg['n_workers'] not in [1, 'auto']:
+        raise RuntimeError(f'wrong input: n_threads > 1 does not work with '
+                           f'n_workers > 1.\n'
+                           f'Revise the config file {file}.')
+
+    if cfg['stack_eos'] and (cfg['n_workers'] not in [1, 'auto']
+                             or cfg['use_cache']
+                             or cfg['save_memmap_tables']
+                             or cfg['checkpoint']):
+        raise RuntimeError(f'wrong input: stack_eos does not work with '
+                           f'n_workers > 1, use_cache, save_memmap_tables or '
+                           f'checkpoint.\nRevise the config file {file}.')
+
+    if cfg['save_memmap_tables'] and (cfg['n_workers'] not in [1, 'auto']
+                                      or cfg['n_threads'] > 1
+                                      or cfg['use_cache']):
+        raise RuntimeError(f'wrong input: save_memmap_tables does not work '
+                           f'with n_workers > 1, n_threads > 1 or '
+                           f'use_cache.\nRevise the config file {file}.')
+
+    if cfg['checkpoint']:
+        if (not isinstance(cfg['checkpoint_block_size'], int)
+                or cfg['checkpoint_block_size'] < 1):
+            raise RuntimeError(f'wrong input: checkpoint_block_size has to '
+                               f'be a positive integer.\n'
+                               f'Revise the config file {file}.')
+        if cfg['save_memmap_tables']:
+            raise RuntimeError(f'wrong input: checkpoint does not work with '
+                               f'save_memmap_tables.\n'
+                               f'Revise the config file {file}.')
+    elif args.get('resume'):
+        raise RuntimeError(f'wrong input: --resume requires checkpoint.\n'
+                           f'Revise the config file {file}.')
+
+    if cfg['uncertainty_rel_std'] is not None:
+        if (not isinstance(cfg['uncertainty_rel_std'], dict) or
+                not set(cfg['uncertainty_rel_std']) <= set(UNCERTAIN_INPUTS)):
+            raise RuntimeError(f'wrong input: uncertainty_rel_std has to map '
+                               f'{", ".join(UNCERTAIN_INPUTS)} to relative '
+                               f'standard deviations.\n'
+                               f'Revise the config file {file}.')
+        cfg['uncertainty_rel_std'] = {
+            key: float(value)
+            for key, value in cfg['uncertainty_rel_std'].items()}
+
+    if (cfg['pressure_spacing'] == 'geometric'
+            and cfg['pressure_start_Pa'] <= 0):
+        raise RuntimeError(f'wrong input: geometric pressure_spacing '
+                           f'requires pressure_start_Pa > 0.\n'
+                           f'Revise the config file {file}.')
+    if isinstance(cfg['temperature_cluster_K'], str) and (
+            cfg['temperature_cluster_K'] != PSEUDO_BOILING):
+        raise RuntimeError(f'wrong input: temperature_cluster_K has to be a '
+                           f'temperature or {PSEUDO_BOILING}.\n'
+                           f'Revise the config file {file}.')
+    if (cfg['temperature_spacing'] == 'clustered'
+            and cfg['temperature_cluster_K'] == PSEUDO_BOILING):
+        p_c = PropsSI('pcrit', cfg['fluid_name'])
+        if cfg['pressure_end_Pa'] <= p_c:
+            raise RuntimeError(f'wrong input: temperature_cluster_K: '
+                               f'{PSEUDO_BOILING} requires pressures above '
+                               f'the critical pressure of '
+                               f'{cfg["fluid_name"]} ({p_c:g} Pa).\n'
+                               f'Revise the config file {file}.')
+
+    # axes and their metadata, written to grid.yaml
+    try:
+        cfg['temp_array'], grid_temp = temperature_axis(cfg)
+    except ValueError as e:
+        # no pseudo-boiling temperature (beyond the end of the line)
+        if cfg['temperature_cluster_K'] != PSEUDO_BOILING:
+            raise
+        raise RuntimeError(f'wrong input: {e}\n'
+                           f'Revise the config file {file}.') from e
+    cfg['pressure_array'], grid_press = pressure_axis(cfg)
+    cfg['grid'] = {'temp': grid_temp, 'press': grid_press}
 
     if len(cfg['temp_array'])*len(cfg['pressure_array']) > 1e9:
         warnings.warn('More than 1e9 pressure/temperature data points!\n'
@@ -99,6 +334,75 @@ def load_config(args):
     return cfg
 
 
+def _load_isochoric_config(cfg: dict, file: str) -> dict:
+    # axes of the isochoric mode (see load_config)
+    for key in ['temperature_start_K',
+                'temperature_end_K',
+                'temperature_step_K',
+                'density_start_kgm3',
+                'density_step_kgm3']:
+        cfg[key] = float(cfg[key])
+    if cfg['density_end_kgm3'] is None:
+        cfg['density_end_kgm3'] = cfg['density_start_kgm3']
+    cfg['density_end_kgm3'] = float(cfg['density_end_kgm3'])
+
+    _check_axes(cfg, file, 'density', DENSITY_SPACINGS)
+    if not 0 < cfg['density_start_kgm3'] <= cfg['density_end_kgm3']:
+        raise RuntimeError(f'wrong input: density_start_kgm3 has to be '
+                           f'positive and not larger than '
+                           f'density_end_kgm3.\n'
+                           f'Revise the config file {file}.')
+    if isinstance(cfg['temperature_cluster_K'], str):
+        raise RuntimeError(f'wrong input: temperature_cluster_K has to be a '
+                           f'temperature in the isochoric mode.\n'
+                           f'Revise the config file {file}.')
+
+    cfg['temp_array'], grid_temp = temperature_axis(cfg)
+    cfg['density_array'], grid_rho = density_axis(cfg)
+    cfg['grid'] = {'temp': grid_temp, 'rho': grid_rho}
+    return cfg
+
+
+def _check_axes(cfg: dict, file: str, axis: str, spacings: list):
+    # checks of the temperature axis, the spacing of the second axis
+    # (pressure or density) and the output format shared by the grid and the
+    # isochoric mode
+    if cfg['temperature_start_K'] > cfg['temperature_end_K']:
+        raise RuntimeError(f'wrong input: temperature_start_K >'
+                           ' temperature_end_K.\n'
+                           f'Revise the config file {file}.')
+    if cfg['temperature_spacing'] not in TEMPERATURE_SPACINGS:
+        raise RuntimeError(f'wrong input: unknown temperature_spacing '
+                           f'{cfg["temperature_spacing"]}, choose from '
+                           f'{", ".join(TEMPERATURE_SPACINGS)}.\n'
+                           f'Revise the config file {file}.')
+    if cfg[f'{axis}_spacing'] not in spacings:
+        raise RuntimeError(f'wrong input: unknown {axis}_spacing '
+                           f'{cfg[f"{axis}_spacing"]}, choose from '
+                           f'{", ".join(spacings)}.\n'
+                           f'Revise the config file {file}.')
+    for spacing, key in [('temperature_spacing', 'temperature_n_points'),
+                         (f'{axis}_spacing', f'{axis}_n_points')]:
+        if cfg[spacing] in ['clustered', 'geometric'] and (
+                not isinstance(cfg[key], int) or cfg[key] < 2):
+            raise RuntimeError(f'wrong input: {cfg[spacing]} {spacing} '
+                               f'requires {key} (integer >= 2).\n'
+                               f'Revise the config file {file}.')
+    if cfg['temperature_spacing'] == 'clustered' and (
+            isinstance(cfg['temperature_cluster_strength'], bool)
+            or not isinstance(cfg['temperature_cluster_strength'],
+                              (int, float))
+            or not cfg['temperature_cluster_strength'] > 0):
+        raise RuntimeError(f'wrong input: temperature_cluster_strength has '
+                           f'to be a positive number.\n'
+                           f'Revise the config file {file}.')
+    if cfg['output_format'] not in OUTPUT_FORMATS:
+        raise RuntimeError(f'wrong input: unknown output_format '
+                           f'{cfg["output_format"]}, choose from '
+                           f'{", ".join(OUTPUT_FORMATS)}.\n'
+                           f'Revise the config file {file}.')
+
+
 def write_config(args):
     outdir = os.path.join(args['output_dir'], args['fluid_name'])
     os.makedirs(outdir, exist_ok=True)
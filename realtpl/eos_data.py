@@ -35,8 +35,26 @@ class EosParameter:
         object.__setattr__(self, 'd_1_t_d_2', self.d_1*self.d_2)
 
 
-def eos_parameter_from_eos_name(name: str,
-                                props: FluidProperties) -> EosParameter:
+# constants of the RKPR eos and alpha function, can be overridden with the
+# coeff argument of eos_parameter_from_eos_name and
+# alpha_functions_from_eos_name (e.g. by fluid-specific values, see fitting)
+RKPR_COEFFICIENTS = {'c_z': 1.168,
+                     'd1': 0.428363,
+                     'd2': 18.496215,
+                     'd3': 0.338426,
+                     'd4': 0.660000,
+                     'd5': 789.723105,
+                     'd6': 2.512392,
+                     'a1': 66.125,
+                     'a0': -23.359,
+                     'b1': -40.594,
+                     'b0': 16.855,
+                     'c1': 5.27345,
+                     'c0': -0.25826}
+
+
+def eos_parameter_from_eos_name(name: str, props: FluidProperties,
+                                coeff: dict = None) -> EosParameter:
     if name == 'SRK':
         d_1 = 1
         a_coeff = 0.42747
@@ -48,25 +66,19 @@ def eos_parameter_from_eos_name(name: str,
         b_coeff = 0.07780
 
     elif name == 'RKPR':
-        c_z = 1.168
-        d1 = 0.428363
-        d2 = 18.496215
-        d3 = 0.338426
-        d4 = 0.660000
-        d5 = 789.723105
-        d6 = 2.512392
+        coeff = {**RKPR_COEFFICIENTS, **(coeff or {})}
+        c_z = coeff['c_z']
+        d1 = coeff['d1']
+        d2 = coeff['d2']
+        d3 = coeff['d3']
+        d4 = coeff['d4']
+        d5 = coeff['d5']
+        d6 = coeff['d6']
 
         d_1 = (d1 + d2*(d3 - c_z*props.Z_c)**d4
                + d5*(d3 - c_z*props.Z_c)**d6)
 
-        d_rkpr = (1 + d_1**2)/(1 + d_1)
-
-        y_rkpr = 1 + (2*(1 + d_1))**(1/3) + (4/(1 + d_1))**(1/3)
-
-        a_coeff = ((3*y_rkpr**2 + 3*y_rkpr*d_rkpr
-                    + d_rkpr**2 + d_rkpr - 1)/(3*y_rkpr + d_rkpr - 1)**2)
-
-        b_coeff = 1/(3*y_rkpr + d_rkpr - 1)
+        a_coeff, b_coeff = critical_coefficients(d_1)
 
     else:
         raise ValueError(f'Unknown EOS: {name}')
@@ -79,6 +91,38 @@ def eos_parameter_from_eos_name(name: str,
     )
 
 
+def critical_coefficients(d_1):
+    """
+    Coefficients of a = a_coeff*R^2*T_c^2/p_c and b = b_coeff*R*T_c/p_c of
+    the generalized cubic eos with parameter d_1 from the critical point
+    conditions (e.g. 0.42748 and 0.08664 for SRK, d_1 = 1)
+    """
+    d_rkpr = (1 + d_1**2)/(1 + d_1)
+
+    y_rkpr = 1 + (2*(1 + d_1))**(1/3) + (4/(1 + d_1))**(1/3)
+
+    a_coeff = ((3*y_rkpr**2 + 3*y_rkpr*d_rkpr
+                + d_rkpr**2 + d_rkpr - 1)/(3*y_rkpr + d_rkpr - 1)**2)
+
+    b_coeff = 1/(3*y_rkpr + d_rkpr - 1)
+    return a_coeff, b_coeff
+
+
+def stack_eos_parameter(eds: list) -> EosParameter:
+    """
+    Stacks the parameters of several eos (e.g. SRK, PR, RKPR) as leading
+    axis: d_1, a and b (and the derived parameters) are arrays of shape
+    (len(eds), 1), so that the kernels broadcast them against temperature
+    arrays and evaluate all eos in one pass
+    """
+    return EosParameter(
+        '+'.join(ed.name for ed in eds),
+        np.array([[ed.d_1] for ed in eds], dtype=float),
+        np.array([[ed.a] for ed in eds], dtype=float),
+        np.array([[ed.b] for ed in eds], dtype=float)
+    )
+
+
 class AlphaFunctions:
 
     def __init__(
@@ -91,8 +135,8 @@ class AlphaFunctions:
         self.d2_alpha_d2_temp = d2_alpha_d2_temp
 
 
-def alpha_functions_from_eos_name(name: str,
-                                  props: FluidProperties) -> AlphaFunctions:
+def alpha_functions_from_eos_name(name: str, props: FluidProperties,
+                                  coeff: dict = None) -> AlphaFunctions:
     omega = props.omega
     temp_c = props.temp_c
     z_c = props.Z_c
@@ -104,14 +148,15 @@ def alpha_functions_from_eos_name(name: str,
         c_alpha = 0.37464 + 1.54226*omega - 0.26992*omega**2
 
     elif name == 'RKPR':
-        c_z = 1.168
+        coeff = {**RKPR_COEFFICIENTS, **(coeff or {})}
+        c_z = coeff['c_z']
 
-        a1 = 66.125
-        a0 = -23.359
-        b1 = -40.594
-        b0 = 16.855
-        c1 = 5.27345
-        c0 = -0.25826
+        a1 = coeff['a1']
+        a0 = coeff['a0']
+        b1 = coeff['b1']
+        b0 = coeff['b0']
+        c1 = coeff['c1']
+        c0 = coeff['c0']
 
         c_alpha = ((c_z*z_c*a1 + a0)*omega**2
                    + (c_z*z_c*b1 + b0)*omega
@@ -153,3 +198,20 @@ def alpha_functions_from_eos_name(name: str,
         d_alpha_d_temp,
         d2_alpha_d2_temp
     )
+
+
+def stack_alpha_functions(alpha_funcs: list) -> AlphaFunctions:
+    """
+    Stacks the alpha functions of several eos, the stacked functions return
+    arrays of shape (len(alpha_funcs),) + temp.shape, see stack_eos_parameter
+    """
+    def stack(funcs):
+        def stacked(temp: np.ndarray):
+            return np.stack([func(temp) for func in funcs])
+        return stacked
+
+    return AlphaFunctions(
+        stack([af.alpha for af in alpha_funcs]),
+        stack([af.d_alpha_d_temp for af in alpha_funcs]),
+        stack([af.d2_alpha_d2_temp for af in alpha_funcs])
+    )
@@ -0,0 +1,181 @@
+from dataclasses import dataclass, field
+import numpy as np
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import RKPR_COEFFICIENTS
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_all import calc_eos_kernel
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.ref_data_from_coolprop import ref_data_arrays, REF_COLUMNS
+from realtpl.properties import PROPERTIES
+
+
+@dataclass
+class FitResult:
+    """
+    Result of RkprFit.run
+
+    coeff: fitted RKPR coefficients (all coefficients, see RKPR_COEFFICIENTS)
+    objective: objective of coeff
+    objective_default: objective of the default coefficients
+    n_evaluations: number of evaluated parameter sets
+    history: best objective after each iteration
+    """
+    coeff: dict
+    objective: float
+    objective_default: float
+    n_evaluations: int
+    history: list = field(default_factory=list)
+
+
+class RkprFit:
+    """
+    Fit of the RKPR coefficients (see RKPR_COEFFICIENTS) against the
+    CoolProp reference data in a (press, temp) region
+
+    The objective of a set of coefficients is the weighted mean squared
+    relative deviation
+        sum_q w_q*mean((value_q/value_ref_q - 1)**2)
+    over all points of the region for the quantities q of weights. Only
+    these quantities are computed (see calc_eos_kernel), both for the
+    reference data, which is evaluated once on construction and kept for all
+    iterations, and for the candidates.
+
+    Many candidate sets are evaluated at once: the coefficients are passed
+    as arrays of shape (n_candidates, 1) to eos_parameter_from_eos_name and
+    alpha_functions_from_eos_name, so that the kernels evaluate all
+    candidates and points in one vectorized pass (in batches of at most
+    max_batch_size values). Candidates leading to invalid values (NaN, e.g.
+    for d3 < c_z*Z_c) get an infinite objective.
+    """
+
+    def __init__(self, fp: FluidProperties, temp_array: np.ndarray,
+                 pressure_array: np.ndarray, weights: dict = None,
+                 params: list = None, max_batch_size: int = 1000000):
+        self.fp = fp
+        self.weights = weights or {'rho_kg/m3': 1.}
+        self.params = list(params or RKPR_COEFFICIENTS)
+        self.max_batch_size = max_batch_size
+        for col in self.weights:
+            if col not in REF_COLUMNS:
+                raise ValueError(f'Unknown quantity {col}, choose from '
+                                 f'{", ".join(REF_COLUMNS)}.')
+        for param in self.params:
+            if param not in RKPR_COEFFICIENTS:
+                raise ValueError(f'Unknown RKPR coefficient {param}.')
+
+        # fitted quantities in the order of PROPERTIES
+        self.properties = [prop for prop, col in PROPERTIES.items()
+                           if col in self.weights]
+
+        # paired points of the region and reference data
+        temp_array = np.asarray(temp_array, dtype=float)
+        pressure_array = np.asarray(pressure_array, dtype=float)
+        ref = ref_data_arrays(fp.name, temp_array, pressure_array,
+                              properties=self.properties)
+        ref = ref.reshape(len(self.properties), -1)
+        press, temp = (x.ravel() for x in np.meshgrid(pressure_array,
+                                                      temp_array,
+                                                      indexing='ij'))
+        is_valid = np.all(np.isfinite(ref), axis=0)
+        self.temp = temp[is_valid]
+        self.press = press[is_valid]
+        self.ref = ref[:, is_valid]
+
+        self.transport = ChungTransportModel(fp)
+
+    def objective(self, coeff: dict) -> np.ndarray:
+        """
+        Objective of the candidates coeff (dict of the fitted coefficients
+        as arrays of shape (n_candidates,))
+        """
+        n_candidates = len(next(iter(coeff.values())))
+        batch = max(1, self.max_batch_size//len(self.temp))
+        obj = np.empty(n_candidates)
+        for start in range(0, n_candidates, batch):
+            obj[start:start + batch] = self._objective(
+                {key: np.asarray(value, dtype=float)[start:start + batch,
+                                                     np.newaxis]
+                 for key, value in coeff.items()})
+        return obj
+
+    def run(self, n_population: int = 200, n_iter: int = 50,
+            elite_fraction: float = 0.1, sigma: float = 0.02,
+            tol: float = 1e-6, seed: int = 0) -> FitResult:
+        """
+        Minimizes the objective by a cross-entropy search: in each iteration
+        n_population candidates are sampled from a normal distribution around
+        the current mean (initially the default coefficients, relative
+        standard deviation sigma) and evaluated in one batch; mean and
+        standard deviation are updated from the best elite_fraction of the
+        candidates. Stops after n_iter iterations or if the relative
+        standard deviation drops below tol.
+        """
+        rng = np.random.default_rng(seed)
+        mean = np.array([RKPR_COEFFICIENTS[p] for p in self.params])
+        std = sigma*np.abs(mean)
+        n_elite = max(2, int(elite_fraction*n_population))
+
+        best_x = mean.copy()
+        best_obj = self.objective(self._as_dict(mean[np.newaxis]))[0]
+        objective_default = best_obj
+        n_evaluations = 1
+        history = []
+        for _ in range(n_iter):
+            x = mean + std*rng.standard_normal((n_population, len(mean)))
+            x[0] = best_x
+            obj = self.objective(self._as_dict(x))
+            n_evaluations += n_population
+
+            order = np.argsort(obj)
+            if obj[order[0]] < best_obj:
+                best_obj = obj[order[0]]
+                best_x = x[order[0]].copy()
+            history.append(float(best_obj))
+
+            elite = x[order[:n_elite]]
+            if not np.all(np.isfinite(obj[order[:n_elite]])):
+                std = 0.5*std
+                continue
+            mean = elite.mean(axis=0)
+            std = 0.7*elite.std(axis=0) + 0.3*std
+            if np.all(std <= tol*np.abs(mean)):
+                break
+
+        coeff = dict(RKPR_COEFFICIENTS)
+        coeff.update({p: float(value) for p, value in zip(self.params,
+                                                          best_x)})
+        return FitResult(coeff, float(best_obj), float(objective_default),
+                         n_evaluations, history)
+
+    def _as_dict(self, x: np.ndarray) -> dict:
+        return {p: x[:, i] for i, p in enumerate(self.params)}
+
+    def _objective(self, coeff: dict) -> np.ndarray:
+        # invalid candidates give NaN parameters and an infinite objective
+        with np.errstate(all='ignore'):
+            ed = eos_parameter_from_eos_name('RKPR', self.fp, coeff)
+            alpha_funcs = alpha_functions_from_eos_name('RKPR', self.fp,
+                                                        coeff)
+            values = calc_eos_kernel(self.fp, ed, alpha_funcs, self.temp,
+                                     self.press, transport=self.transport,
+                                     properties=self.properties)
+            obj = 0.
+            for i, prop in enumerate(self.properties):
+                obj = obj + self.weights[PROPERTIES[prop]]*np.mean(
+                    (values[i]/self.ref[i] - 1)**2, axis=-1)
+        return np.where(np.isfinite(obj), obj, np.inf)
+
+
+def fit_rkpr_coefficients(fp: FluidProperties, temp_array: np.ndarray,
+                          pressure_array: np.ndarray, weights: dict = None,
+                          params: list = None, **kwargs) -> FitResult:
+    """
+    Fits the RKPR coefficients params (default: all) to the CoolProp
+    reference data in the (press, temp) region, see RkprFit. The fitted
+    coefficients are used by passing FitResult.coeff as coeff to
+    eos_parameter_from_eos_name and alpha_functions_from_eos_name.
+    """
+    return RkprFit(fp, temp_array, pressure_array, weights,
+                   params).run(**kwargs)
@@ -0,0 +1,207 @@
+import numpy as np
+import os
+import yaml
+
+from CoolProp.CoolProp import PropsSI
+
+# spacings of the temperature and pressure axes
+TEMPERATURE_SPACINGS = ['linear', 'clustered', 'file']
+PRESSURE_SPACINGS = ['linear', 'geometric', 'file']
+DENSITY_SPACINGS = ['linear', 'geometric']
+
+# center of the clustered temperature axis at the pseudo-boiling temperature
+PSEUDO_BOILING = 'pseudo_boiling'
+
+GRID_FILE = 'grid.yaml'
+
+
+def linear_axis(start: float, end: float, step: float) -> np.ndarray:
+    """
+    Equidistant axis from start to end (inclusive) with step
+    """
+    return np.arange(start, end + step, step)
+
+
+def geometric_axis(start: float, end: float, n_points: int) -> np.ndarray:
+    """
+    Axis from start to end with n_points and a constant ratio of neighboring
+    values (equidistant in log space), e.g. for wide pressure ranges
+    """
+    return np.geomspace(start, end, n_points)
+
+
+def clustered_axis(start: float, end: float, n_points: int, center: float,
+                   strength: float) -> np.ndarray:
+    """
+    Axis from start to end with n_points clustered around center
+
+    Uses the sinh mapping for clustering at an interior point [1]: for a
+    uniform s in [0, 1],
+        x = start + (end - start)*c*(1 + sinh(beta*(s - B))/sinh(beta*B)),
+    with c = (center - start)/(end - start) and B chosen such that x(1) =
+    end. The larger the strength beta, the stronger the clustering; for beta
+    towards 0 the axis becomes equidistant.
+
+    References:
+    -----------
+    ..[1] Anderson, Tannehill, Pletcher (1984), Computational Fluid Mechanics
+    and Heat Transfer, Hemisphere, Section 5.6
+    """
+    if end == start:
+        return np.array([start], dtype=float)
+    c = min(max((center - start)/(end - start), 1e-6), 1 - 1e-6)
+    beta = strength
+    bb = 0.5/beta*np.log((1 + (np.exp(beta) - 1)*c)
+                         / (1 + (np.exp(-beta) - 1)*c))
+    s = np.linspace(0, 1, n_points)
+    x = start + (end - start)*c*(1 + np.sinh(beta*(s - bb))
+                                 / np.sinh(beta*bb))
+    # exact end points
+    x[0] = start
+    x[-1] = end
+    return x
+
+
+def axis_from_file(file: str) -> np.ndarray:
+    """
+    Reads an explicit axis from a npy file or a text file (one value per
+    line, # comments); the values have to be strictly increasing
+    """
+    if file.endswith('.npy'):
+        axis = np.load(file)
+    else:
+        axis = np.loadtxt(file, ndmin=1)
+    axis = np.asarray(axis, dtype=float).ravel()
+    if len(axis) == 0 or np.any(np.diff(axis) <= 0):
+        raise ValueError(f'The axis in {file} has to consist of strictly '
+                         f'increasing values.')
+    return axis
+
+
+def temperature_axis(cfg: dict) -> tuple:
+    """
+    Temperature axis and its metadata according to the config (see
+    config.load_config)
+    """
+    spacing = cfg['temperature_spacing']
+    start = cfg['temperature_start_K']
+    end = cfg['temperature_end_K']
+    meta = {'spacing': spacing, 'unit': 'K'}
+    if spacing == 'linear':
+        axis = linear_axis(start, end, cfg['temperature_step_K'])
+        meta['step'] = cfg['temperature_step_K']
+    elif spacing == 'clustered':
+        center = cfg['temperature_cluster_K']
+        if center is None:
+            center = PropsSI('Tcrit', cfg['fluid_name'])
+        elif center == PSEUDO_BOILING:
+            center, center_pressure = _pseudo_boiling_center(cfg)
+        axis = clustered_axis(start, end, cfg['temperature_n_points'],
+                              center, cfg['temperature_cluster_strength'])
+        meta['center'] = float(center)
+        if cfg['temperature_cluster_K'] == PSEUDO_BOILING:
+            meta['center_pressure'] = center_pressure
+        meta['strength'] = cfg['temperature_cluster_strength']
+    elif spacing == 'file':
+        axis = axis_from_file(cfg['temperature_file'])
+        meta['source_file'] = cfg['temperature_file']
+    else:
+        raise ValueError(f'Unknown temperature spacing: {spacing}')
+    return axis, _add_range(meta, axis)
+
+
+def pressure_axis(cfg: dict) -> tuple:
+    """
+    Pressure axis and its metadata according to the config (see
+    config.load_config)
+    """
+    spacing = cfg['pressure_spacing']
+    start = cfg['pressure_start_Pa']
+    end = cfg['pressure_end_Pa']
+    meta = {'spacing': spacing, 'unit': 'Pa'}
+    if spacing == 'linear':
+        axis = linear_axis(start, end, cfg['pressure_step_Pa'])
+        meta['step'] = cfg['pressure_step_Pa']
+    elif spacing == 'geometric':
+        axis = geometric_axis(start, end, cfg['pressure_n_points'])
+        meta['ratio'] = (float(axis[1]/axis[0]) if len(axis) > 1 else 1.)
+    elif spacing == 'file':
+        axis = axis_from_file(cfg['pressure_file'])
+        meta['source_file'] = cfg['pressure_file']
+    else:
+        raise ValueError(f'Unknown pressure spacing: {spacing}')
+    return axis, _add_range(meta, axis)
+
+
+def density_axis(cfg: dict) -> tuple:
+    """
+    Density axis of the isochoric mode and its metadata according to the
+    config (see config.load_config)
+    """
+    spacing = cfg['density_spacing']
+    start = cfg['density_start_kgm3']
+    end = cfg['density_end_kgm3']
+    meta = {'spacing': spacing, 'unit': 'kg/m3'}
+    if spacing == 'linear':
+        axis = linear_axis(start, end, cfg['density_step_kgm3'])
+        meta['step'] = cfg['density_step_kgm3']
+    elif spacing == 'geometric':
+        axis = geometric_axis(start, end, cfg['density_n_points'])
+        meta['ratio'] = (float(axis[1]/axis[0]) if len(axis) > 1 else 1.)
+    else:
+        raise ValueError(f'Unknown density spacing: {spacing}')
+    return axis, _add_range(meta, axis)
+
+
+def index_range(axis: np.ndarray, value_range: tuple) -> slice:
+    """
+    Slice of the sorted axis within the (inclusive) value_range, all for None
+    """
+    if value_range is None:
+        return slice(None)
+    return slice(np.searchsorted(axis, value_range[0], side='left'),
+                 np.searchsorted(axis, value_range[1], side='right'))
+
+
+def write_grid(grid: dict, path: str):
+    """
+    Writes the axis metadata grid ({'temp': {...}, 'press': {...}}, or
+    'rho' instead of 'press' for the isochoric mode) to <path>/grid.yaml
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, GRID_FILE), 'w') as f:
+        yaml.safe_dump(grid, f, sort_keys=False)
+
+
+def _pseudo_boiling_center(cfg: dict) -> tuple:
+    # pseudo-boiling temperature of the first eos (PR without eos) at the
+    # middle of the supercritical part of the pressure range (imported here,
+    # the eos modules depend on grid)
+    from realtpl import nasa
+    from realtpl.fluid_properties \
+        import fluid_properties_from_coolprop_and_data_base
+    from realtpl.pseudo_boiling import pseudo_boiling_temperature
+
+    fp = fluid_properties_from_coolprop_and_data_base(
+        cfg['fluid_name'], nasa.NasaCoefficients.from_name_and_coeff(
+            cfg['fluid_name'], cfg['n_nasa_coeff']))
+    eos = cfg['eos_list'][0] if cfg['eos_list'] else 'PR'
+    press = 0.5*(max(cfg['pressure_start_Pa'], fp.p_c)
+                 + cfg['pressure_end_Pa'])
+    temp_pb = float(pseudo_boiling_temperature(eos, fp, press)[0])
+    if not np.isfinite(temp_pb):
+        raise ValueError(f'No pseudo-boiling temperature of {eos} at '
+                         f'{press:g} Pa to cluster the temperature axis '
+                         f'(below the critical pressure or beyond the end '
+                         f'of the pseudo-boiling line).')
+    return temp_pb, float(press)
+
+
+def _add_range(meta: dict, axis: np.ndarray) -> dict:
+    meta.update({'size': len(axis),
+                 'min': float(axis.min()),
+                 'max': float(axis.max())})
+    if meta['spacing'] != 'linear':
+        # non-uniform axes are stored explicitly
+        meta['values'] = axis.tolist()
+    return meta
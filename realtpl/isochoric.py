@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.thermophysical_constants import R_UNIV
+from realtpl.eos_data import EosParameter, AlphaFunctions
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_cv_cp_sound import calc_cv_cp_sound
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.ref_data_from_coolprop import ref_data_isochoric
+from realtpl.properties import PROPERTIES, resolve_properties
+from realtpl.properties import required_nodes
+
+# output column of the pressure, which replaces the density (an input) in the
+# isochoric mode
+PRESS_COLUMN = 'press_Pa'
+
+
+def isochoric_columns(properties: list = None) -> list:
+    """
+    Output columns of the isochoric mode: the pressure and the quantities of
+    properties (default: all) except the density
+    """
+    return [PRESS_COLUMN] + [PROPERTIES[prop]
+                             for prop in resolve_properties(properties)
+                             if prop != 'rho']
+
+
+def calc_isochoric_kernel(fp: FluidProperties, ed: EosParameter,
+                          alpha_funcs: AlphaFunctions, temp: np.ndarray,
+                          rho: np.ndarray,
+                          transport: ChungTransportModel = None,
+                          properties: list = None):
+    """
+    Kernel chain of the thermodynamic model for given temperatures and
+    densities: the cubic eos gives the pressure explicitly, so that no root
+    has to be solved or selected, the caloric and transport properties follow
+    from the molar volume as in calc_eos_kernel
+
+    States inside the spinodal (dp/dv >= 0, mechanically unstable) and beyond
+    the covolume (v <= b) are NaN; metastable states between the spinodal and
+    the saturated densities are evaluated as homogeneous states.
+
+    Parameters:
+    -----------
+    fp: FluidProperties
+    ed: EosParameter
+    alpha_funcs: AlphaFunctions
+    temp: np.ndarray
+        temperature in Kelvin
+    rho: np.ndarray
+        density in kg/m3 (scalar or same shape as temp)
+    transport: ChungTransportModel, optional
+        transport model of fp to reuse its temperature terms across calls
+    properties: list, optional
+        quantities to compute (see PROPERTIES), default: all
+
+    Returns:
+    --------
+    press, cp, sound, visc, cond: np.ndarray
+        or the pressure and the quantities of properties except rho
+    """
+    properties = resolve_properties(properties)
+    nodes = required_nodes(properties)
+
+    rho = np.broadcast_to(rho, np.broadcast(temp, rho).shape)
+    vol = fp.mass/rho
+
+    # pressure of the generalized cubic eos and its derivative
+    a_alpha = ed.a*alpha_funcs.alpha(temp)
+    denom = vol**2 + ed.d_1_p_d_2*ed.b*vol + ed.d_1_t_d_2*ed.b**2
+    values = {'press': R_UNIV*temp/(vol - ed.b) - a_alpha/denom}
+    d_p_d_v = -(R_UNIV*temp/(vol - ed.b)**2
+                - a_alpha*(2*vol + ed.d_1_p_d_2*ed.b)/denom**2)
+    is_stable = (vol > ed.b) & (d_p_d_v < 0)
+
+    if 'caloric' in nodes:
+        cv, values['cp'], values['sound'] = calc_cv_cp_sound(
+            fp, temp, ed, alpha_funcs, vol)
+
+    if 'visc' in nodes or 'cond' in nodes:
+        if transport is None:
+            transport = ChungTransportModel(fp)
+        if 'visc' in nodes and 'cond' in nodes:
+            values['visc'], values['cond'] = transport.evaluate(temp, rho, cv)
+        elif 'visc' in nodes:
+            values['visc'] = transport.viscosity(temp, rho)
+        else:
+            values['cond'] = transport.conductivity(temp, rho, cv)
+
+    return tuple(np.where(is_stable, values[prop], np.nan)
+                 for prop in ['press'] + properties if prop != 'rho')
+
+
+def calc_isochoric_points(kind: str, fp: FluidProperties, temp: np.ndarray,
+                          rho: np.ndarray, properties: list = None,
+                          reference_backend: str = 'HEOS') -> np.ndarray:
+    """
+    Evaluates kind (ref_data or eos name) for paired temperatures and
+    densities into an array of shape (len(isochoric_columns(properties)),
+    len(temp))
+    """
+    temp, rho = np.broadcast_arrays(np.asarray(temp, dtype=float),
+                                    np.asarray(rho, dtype=float))
+    if kind == 'ref_data':
+        return ref_data_isochoric(fp.name, temp, rho,
+                                  backend=reference_backend,
+                                  properties=properties)
+    with np.errstate(all='ignore'):
+        return np.array(calc_isochoric_kernel(
+            fp, eos_parameter_from_eos_name(kind, fp),
+            alpha_functions_from_eos_name(kind, fp), temp, rho,
+            properties=properties))
+
+
+def calc_isochoric_grid(kind: str, fp: FluidProperties,
+                        temp_array: np.ndarray, density_array: np.ndarray,
+                        properties: list = None,
+                        reference_backend: str = 'HEOS') -> np.ndarray:
+    """
+    Evaluates kind (ref_data or eos name) on the (density_array, temp_array)
+    grid into an array of shape (len(isochoric_columns(properties)),
+    len(density_array), len(temp_array))
+    """
+    shape = (len(density_array), len(temp_array))
+    if kind == 'ref_data':
+        return ref_data_isochoric(
+            fp.name, np.tile(temp_array, len(density_array)),
+            np.repeat(density_array, len(temp_array)),
+            backend=reference_backend, properties=properties
+        ).reshape(-1, *shape)
+
+    ed = eos_parameter_from_eos_name(kind, fp)
+    alpha_funcs = alpha_functions_from_eos_name(kind, fp)
+    transport = ChungTransportModel(fp)
+    values = np.empty((len(isochoric_columns(properties)), *shape))
+    with np.errstate(all='ignore'):
+        for j, rho in enumerate(density_array):
+            values[:, j] = calc_isochoric_kernel(fp, ed, alpha_funcs,
+                                                 temp_array, rho, transport,
+                                                 properties)
+    return values
+
+
+def isochoric_dataframe(kind: str, temp_array: np.ndarray,
+                        density_array: np.ndarray, values: np.ndarray,
+                        properties: list = None) -> pd.DataFrame:
+    """
+    Data frame of the grid values of calc_isochoric_grid with the columns
+    kind, rho_kg/m3, temp_K and isochoric_columns(properties)
+    """
+    df = pd.DataFrame({
+        'kind': kind,
+        PROPERTIES['rho']: np.repeat(density_array, len(temp_array)),
+        'temp_K': np.tile(temp_array, len(density_array))
+    })
+    for col, value in zip(isochoric_columns(properties), values):
+        df[col] = value.ravel()
+    return df
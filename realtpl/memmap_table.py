@@ -0,0 +1,202 @@
+import numpy as np
+import os
+import pandas as pd
+import yaml
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_all import calc_eos_kernel
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.ref_data_from_coolprop import ref_data_arrays
+from realtpl.properties import property_columns, quantity_name
+from realtpl.properties import quantity_unit
+from realtpl.saturation import saturation_pressure
+from realtpl.grid import index_range
+
+HEADER_FILE = 'header.yaml'
+
+# opened tables, see open_memmap_table
+_TABLES = {}
+
+
+def write_memmap_table(kind: str, fp: FluidProperties,
+                       temp_array: np.ndarray, pressure_array: np.ndarray,
+                       output_dir: str, root_solver: str = 'analytic',
+                       grid: dict = None,
+                       reference_backend: str = 'HEOS',
+                       properties: list = None) -> str:
+    """
+    Evaluates kind (ref_data or eos name) and writes each quantity directly
+    into a disk-backed (press, temp) array
+
+    The table is written to <output_dir>/<fluid>/tables/<kind>/ and consists
+    of one npy file per quantity (e.g. rho.npy), the axes press.npy and
+    temp.npy and the header header.yaml describing axes, units, quantities and
+    fluid data. The arrays are written row by row (pressure level), so that
+    tables larger than the available memory can be generated. The header is
+    written last and marks the table as complete. The spacing of the axes
+    (see grid.py) is added to the header if grid is provided. The reference
+    data is evaluated with the CoolProp backend reference_backend. Only the
+    quantities of properties (default: all) are computed and written.
+
+    Returns:
+    --------
+    path: str
+        directory of the table
+    """
+    temp_array = np.asarray(temp_array, dtype=float)
+    pressure_array = np.asarray(pressure_array, dtype=float)
+    path = os.path.join(output_dir, fp.name, 'tables', kind)
+    os.makedirs(path, exist_ok=True)
+    if os.path.exists(os.path.join(path, HEADER_FILE)):
+        os.remove(os.path.join(path, HEADER_FILE))
+
+    np.save(os.path.join(path, 'press.npy'), pressure_array)
+    np.save(os.path.join(path, 'temp.npy'), temp_array)
+
+    shape = (len(pressure_array), len(temp_array))
+    columns = property_columns(properties)
+    arrays = [np.lib.format.open_memmap(
+                  os.path.join(path, quantity_name(col) + '.npy'),
+                  mode='w+',
+                  dtype=float, shape=shape)
+              for col in columns]
+
+    if kind == 'ref_data':
+        for j, pressure in enumerate(pressure_array):
+            values = ref_data_arrays(fp.name, temp_array, [pressure],
+                                     backend=reference_backend,
+                                     properties=properties)
+            for array, value in zip(arrays, values):
+                array[j] = value[0]
+    else:
+        ed = eos_parameter_from_eos_name(kind, fp)
+        alpha_funcs = alpha_functions_from_eos_name(kind, fp)
+        transport = ChungTransportModel(fp)
+        p_sat = (saturation_pressure(kind, fp, temp_array)
+                 if len(pressure_array) > 1 else None)
+        for j, pressure in enumerate(pressure_array):
+            values = calc_eos_kernel(fp, ed, alpha_funcs, temp_array,
+                                     pressure, p_sat, root_solver,
+                                     transport, properties)
+            for array, value in zip(arrays, values):
+                array[j] = value
+
+    for array in arrays:
+        array.flush()
+    del arrays
+
+    header = {
+        'kind': kind,
+        'shape': list(shape),
+        'dtype': 'float64',
+        'layout': 'C-order (press, temp)',
+        'axes': {
+            'press': {'file': 'press.npy', 'unit': 'Pa',
+                      'min': float(pressure_array.min()),
+                      'max': float(pressure_array.max()),
+                      'size': len(pressure_array)},
+            'temp': {'file': 'temp.npy', 'unit': 'K',
+                     'min': float(temp_array.min()),
+                     'max': float(temp_array.max()),
+                     'size': len(temp_array)},
+        },
+        'quantities': {quantity_name(col): {
+                           'file': quantity_name(col) + '.npy',
+                           'unit': quantity_unit(col),
+                           'column': col}
+                       for col in columns},
+        'fluid': {'name': fp.name,
+                  'mass_kg/kmol': float(fp.mass),
+                  'omega': float(fp.omega),
+                  'p_c_Pa': float(fp.p_c),
+                  'temp_c_K': float(fp.temp_c),
+                  'rho_c_kmol/m3': float(fp.rho_c),
+                  'Z_c': float(fp.Z_c)},
+    }
+    if kind == 'ref_data':
+        header['backend'] = reference_backend
+    if grid is not None:
+        for axis in ['press', 'temp']:
+            header['axes'][axis].update(
+                {key: value for key, value in grid[axis].items()
+                 if key not in header['axes'][axis] and key != 'values'})
+
+    with open(os.path.join(path, HEADER_FILE), 'w') as f:
+        yaml.safe_dump(header, f, sort_keys=False)
+
+    return path
+
+
+class MemmapTable:
+    """
+    Lazy read access to a table written by write_memmap_table
+
+    The quantities are opened as read-only memory maps on first access, so
+    that only the accessed regions are paged in.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        header_file = os.path.join(path, HEADER_FILE)
+        if not os.path.exists(header_file):
+            raise FileNotFoundError(f'No complete table found in {path}.')
+        with open(header_file, 'r') as f:
+            self.header = yaml.safe_load(f)
+        self.kind = self.header['kind']
+        self.press = np.load(os.path.join(path, 'press.npy'))
+        self.temp = np.load(os.path.join(path, 'temp.npy'))
+        self._arrays = {}
+
+    @property
+    def quantities(self) -> list:
+        return list(self.header['quantities'])
+
+    def __getitem__(self, quantity: str) -> np.ndarray:
+        if quantity not in self._arrays:
+            if quantity not in self.header['quantities']:
+                raise KeyError(f'Unknown quantity {quantity}, available: '
+                               f'{", ".join(self.quantities)}')
+            self._arrays[quantity] = np.load(
+                os.path.join(self.path,
+                             self.header['quantities'][quantity]['file']),
+                mmap_mode='r')
+        return self._arrays[quantity]
+
+    def region(self, quantity: str, press_range: tuple = None,
+               temp_range: tuple = None) -> tuple:
+        """
+        Returns the axes and data of quantity within the (inclusive) pressure
+        and temperature ranges; only this region is read from disk
+        """
+        j = index_range(self.press, press_range)
+        i = index_range(self.temp, temp_range)
+        return self.press[j], self.temp[i], self[quantity][j, i]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Reads the entire table into a long-format data frame
+        """
+        df = pd.DataFrame({
+            'kind': self.kind,
+            'press_Pa': np.repeat(self.press, len(self.temp)),
+            'temp_K': np.tile(self.temp, len(self.press))
+        })
+        for quantity, data in self.header['quantities'].items():
+            df[data['column']] = np.asarray(self[quantity]).ravel()
+        return df
+
+
+def open_memmap_table(path: str) -> MemmapTable:
+    """
+    Opens the table in path; tables already opened (and not rewritten since)
+    are returned without reading the header again
+    """
+    header_file = os.path.join(path, HEADER_FILE)
+    key = (os.path.abspath(path),
+           os.stat(header_file).st_mtime_ns if os.path.exists(header_file)
+           else None)
+    if key not in _TABLES:
+        _TABLES[key] = MemmapTable(path)
+    return _TABLES[key]
@@ -0,0 +1,152 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_all import calc_eos_kernel
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.calc_visc_cond_chung import set_surrogate_range, surrogate_range
+from realtpl.ref_data_from_coolprop import ref_data_arrays, REF_COLUMNS
+from realtpl.ref_data_from_coolprop import set_table_directory
+from realtpl.reduced_tables import set_reduced_table_directory
+from realtpl.reduced_tables import reduced_table_directory
+from realtpl.saturation import saturation_pressure
+from realtpl.properties import property_columns
+
+# columns of the shared result array
+SHARED_COLUMNS = ['press_Pa', 'temp_K'] + REF_COLUMNS
+
+
+class SharedResult:
+    """
+    Result array of shape (len(columns), n_press, n_temp) in shared memory,
+    the columns are pressure, temperature and the columns of properties
+    (default: SHARED_COLUMNS)
+
+    Worker processes attach to the shared memory block by its name and write
+    their pressure slices in place, so that no results have to be pickled
+    back to the parent process. The parent wraps the buffer as numpy array
+    (array) or long-format data frame (to_dataframe) without copying. These
+    views are only valid until the SharedResult is closed, use it as context
+    manager and copy data that is needed afterwards.
+    """
+
+    def __init__(self, temp_array: np.ndarray, pressure_array: np.ndarray,
+                 properties: list = None):
+        self.columns = ['press_Pa', 'temp_K'] + property_columns(properties)
+        self.shape = (len(self.columns), len(pressure_array),
+                      len(temp_array))
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=max(int(np.prod(self.shape))*8, 1))
+        self.array = np.ndarray(self.shape, dtype=float, buffer=self.shm.buf)
+        self.array[0] = np.asarray(pressure_array)[:, np.newaxis]
+        self.array[1] = np.asarray(temp_array)[np.newaxis, :]
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def to_dataframe(self, kind: str) -> pd.DataFrame:
+        # the transposed (n_points, n_columns) view becomes a single block
+        df = pd.DataFrame(self.array.reshape(self.shape[0], -1).T,
+                          columns=self.columns, copy=False)
+        df.insert(0, 'kind', kind)
+        return df
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def calc_parallel(kind: str, fp: FluidProperties, temp_array: np.ndarray,
+                  pressure_array: np.ndarray, n_workers: int,
+                  result: SharedResult = None, root_solver: str = 'analytic',
+                  reference_backend: str = 'HEOS', table_dir: str = None,
+                  properties: list = None):
+    """
+    Evaluates kind (ref_data or eos name) with n_workers processes
+
+    The pressure array is split into blocks, each worker evaluates its blocks
+    and writes them directly into the shared result array. If result is
+    provided, the data is written into it and None is returned (no copy, the
+    caller keeps result open as long as the data is used). Otherwise, a
+    temporary SharedResult is used and a data frame (one copy of the shared
+    buffer) is returned. The reference data is evaluated with the CoolProp
+    backend reference_backend, its tables are read from table_dir. Only the
+    quantities of properties are computed (default: all, the shared result
+    has to be created with the same properties). The workers use the
+    surrogates of the transport model (see set_surrogate_range) and the
+    reduced tables (see set_reduced_table_directory) of the parent process.
+    """
+    if result is None:
+        with SharedResult(temp_array, pressure_array, properties) as result:
+            calc_parallel(kind, fp, temp_array, pressure_array, n_workers,
+                          result, root_solver, reference_backend, table_dir,
+                          properties)
+            return result.to_dataframe(kind).copy()
+
+    if kind == 'ref_data':
+        p_sat = None
+    else:
+        # vapor pressure curve once in the parent, shared by all workers
+        p_sat = (saturation_pressure(kind, fp, temp_array)
+                 if len(pressure_array) > 1 else None)
+
+    n_blocks = min(len(pressure_array), 4*n_workers)
+    blocks = np.array_split(np.arange(len(pressure_array)), n_blocks)
+
+    with ProcessPoolExecutor(n_workers) as executor:
+        futures = [
+            executor.submit(_worker, result.name, result.shape, kind, fp,
+                            temp_array, pressure_array[block], block[0],
+                            p_sat, root_solver, reference_backend, table_dir,
+                            properties, surrogate_range(),
+                            reduced_table_directory())
+            for block in blocks if len(block)
+        ]
+        for future in futures:
+            future.result()
+
+
+def _worker(shm_name: str, shape: tuple, kind: str, fp: FluidProperties,
+            temp_array: np.ndarray, pressure_array: np.ndarray, j_start: int,
+            p_sat: np.ndarray, root_solver: str, reference_backend: str,
+            table_dir: str, properties: list, temp_range: tuple,
+            reduced_table_dir: str):
+    # worker processes share the resource tracker of the parent process, which
+    # owns and unlinks the block
+    shm = shared_memory.SharedMemory(shm_name)
+    try:
+        array = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        out = array[2:, j_start:j_start + len(pressure_array)]
+
+        if kind == 'ref_data':
+            if table_dir:
+                set_table_directory(table_dir)
+            ref_data_arrays(fp.name, temp_array, pressure_array, out,
+                            reference_backend, properties)
+        else:
+            # the same transport model and reduced tables as in the parent
+            # process
+            set_surrogate_range(temp_range)
+            set_reduced_table_directory(reduced_table_dir)
+            ed = eos_parameter_from_eos_name(kind, fp)
+            alpha_funcs = alpha_functions_from_eos_name(kind, fp)
+            transport = ChungTransportModel(fp)
+            for j, pressure in enumerate(pressure_array):
+                out[:, j] = calc_eos_kernel(fp, ed, alpha_funcs, temp_array,
+                                            pressure, p_sat, root_solver,
+                                            transport, properties)
+        del array, out
+    finally:
+        shm.close()
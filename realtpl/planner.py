@@ -0,0 +1,369 @@
+from dataclasses import dataclass, field
+import io
+import os
+import time
+
+import numpy as np
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.eos_data import stack_eos_parameter, stack_alpha_functions
+from realtpl.calc_all import calc_eos_kernel
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.ref_data_from_coolprop import ref_data_points
+from realtpl.properties import property_columns
+from realtpl.saturation import saturation_pressure
+from realtpl.results import GridResults
+from realtpl.point_cloud import open_point_array
+from realtpl.write_data_to_files import _WRITERS
+
+# number of temperatures (eos) and points (CoolProp) of the micro-benchmark
+_N_BENCH_EOS = 4096
+_N_BENCH_REF = 200
+
+# start-up time of one worker process (import of realtpl and CoolProp) in s
+_WORKER_STARTUP_S = 0.5
+
+# temporary arrays of the kernel chain per point and eos (8 bytes each)
+_KERNEL_TEMP_ARRAYS = 60
+
+# chunk sizes tried for point clouds and the share of the available memory
+# the chunks may use
+_CHUNK_SIZES = [2**12, 2**14, 2**16, 2**18, 2**20]
+_CHUNK_MEMORY_SHARE = 0.25
+
+
+@dataclass
+class RunPlan:
+    """
+    Predicted runtime (s) and peak memory (bytes) of a run and the chosen
+    n_workers and point cloud chunk size, see plan_run
+
+    time: predicted time of each step (ref_data, each eos, saturation,
+        uncertainty, write)
+    cost: benchmarked time per point (s) of the kinds and the writer
+    """
+    n_points: int
+    kinds: list
+    n_workers: int
+    point_cloud_chunk_size: int
+    time: dict = field(default_factory=dict)
+    cost: dict = field(default_factory=dict)
+    memory_peak: float = 0.
+    memory_available: float = None
+    notes: list = field(default_factory=list)
+
+    @property
+    def time_total(self) -> float:
+        return sum(self.time.values())
+
+    @property
+    def fits_memory(self) -> bool:
+        return (self.memory_available is None
+                or self.memory_peak <= self.memory_available)
+
+    def summary(self) -> str:
+        lines = [f'Plan: {self.n_points} points, kinds: '
+                 f'{", ".join(self.kinds)}']
+        for step, value in self.time.items():
+            cost = (f' ({self.cost[step]*1e9:.0f} ns/point)'
+                    if step in self.cost else '')
+            lines.append(f'  {step}: {_format_time(value)}{cost}')
+        lines.append(f'  total: {_format_time(self.time_total)}')
+        available = ('unknown' if self.memory_available is None
+                     else f'{self.memory_available/1e9:.2f} GB')
+        lines.append(f'  peak memory: {self.memory_peak/1e9:.2f} GB '
+                     f'(available: {available})')
+        lines.append(f'  n_workers: {self.n_workers}')
+        if self.point_cloud_chunk_size:
+            lines.append(f'  point_cloud_chunk_size: '
+                         f'{self.point_cloud_chunk_size}')
+        lines.extend(f'  note: {note}' for note in self.notes)
+        return '\n'.join(lines)
+
+
+def available_memory() -> float:
+    """
+    Available memory in bytes (MemAvailable on Linux, else free physical
+    pages), None if unknown
+    """
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return float(line.split()[1])*1024
+    except OSError:
+        pass
+    try:
+        return float(os.sysconf('SC_PAGE_SIZE')
+                     * os.sysconf('SC_AVPHYS_PAGES'))
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def benchmark_eos(eos_list: list, fp: FluidProperties, temp_range: tuple,
+                  pressure: float, root_solver: str = 'analytic',
+                  properties: list = None, stacked: bool = False,
+                  n_temp: int = _N_BENCH_EOS,
+                  saturation: bool = True) -> dict:
+    """
+    Time per point (s) of the kernel chain of each eos (or of all eos in one
+    stacked pass, key 'stacked') and optionally of its vapor pressure curve
+    (key 'saturation <eos>'), measured on n_temp temperatures of temp_range
+    at pressure (best of three)
+    """
+    temp = np.linspace(temp_range[0], temp_range[1], n_temp)
+    transport = ChungTransportModel(fp)
+    cost = {}
+    groups = ({'stacked': eos_list} if stacked and len(eos_list) > 1
+              else {eos: [eos] for eos in eos_list})
+    for key, eos_group in groups.items():
+        eds = [eos_parameter_from_eos_name(eos, fp) for eos in eos_group]
+        alphas = [alpha_functions_from_eos_name(eos, fp)
+                  for eos in eos_group]
+        if len(eos_group) > 1:
+            ed, alpha_funcs = (stack_eos_parameter(eds),
+                               stack_alpha_functions(alphas))
+        else:
+            ed, alpha_funcs = eds[0], alphas[0]
+        with np.errstate(all='ignore'):
+            cost[key] = _best_time(lambda: calc_eos_kernel(
+                fp, ed, alpha_funcs, temp, pressure, None, root_solver,
+                transport, properties))/n_temp
+    if saturation:
+        for eos in eos_list:
+            cost[f'saturation {eos}'] = _best_time(
+                lambda: saturation_pressure(eos, fp, temp),
+                n_repeat=1)/n_temp
+    return cost
+
+
+def benchmark_reference(name: str, temp_range: tuple, press_range: tuple,
+                        backend: str = 'HEOS', properties: list = None,
+                        n_points: int = _N_BENCH_REF) -> tuple:
+    """
+    Time per point (s) of the CoolProp reference data on random points of
+    the ranges and the set-up time of the backend (e.g. loading or
+    generating the tables of tabular backends)
+    """
+    rng = np.random.default_rng(0)
+    temp = rng.uniform(*temp_range, n_points)
+    press = rng.uniform(*press_range, n_points)
+    time_start = time.perf_counter()
+    ref_data_points(name, temp[:1], press[:1], backend=backend,
+                    properties=properties)
+    time_setup = time.perf_counter() - time_start
+    cost = _best_time(lambda: ref_data_points(name, temp, press,
+                                              backend=backend,
+                                              properties=properties),
+                      n_repeat=1)/n_points
+    return cost, time_setup
+
+
+def benchmark_writer(fmt: str, properties: list = None,
+                     n_points: int = 20000) -> float:
+    """
+    Time per row (s) to format and write the data of one kind in fmt
+    """
+    columns = property_columns(properties)
+    results = GridResults(np.linspace(300, 600, n_points), [1e6])
+    results.add('bench', {col: np.random.default_rng(0).uniform(
+        1e-5, 1e3, (1, n_points)) for col in columns})
+    df = results.to_dataframe()
+    path = os.devnull if fmt == 'csv' else io.BytesIO()
+
+    def write():
+        _WRITERS[fmt](df, path, None, n_points)
+    return _best_time(write, n_repeat=1)/n_points
+
+
+def plan_run(cfg: dict, fp: FluidProperties, n_points: int = None) -> RunPlan:
+    """
+    Predicts runtime and peak memory of the run configured by cfg (see
+    config.load_config) and resolves the automatic settings n_workers and
+    point_cloud_chunk_size ('auto')
+
+    The runtime is predicted from the time per point of each step, measured
+    by micro-benchmarks on this machine (kernel chain of the configured eos,
+    root solver and properties, vapor pressure curves, CoolProp reference
+    data of the configured backend and the writer of the output format),
+    times the number of points. The peak memory is estimated from the
+    arrays held during the run: the results of all kinds, the data frames
+    built for writing and the temporaries of the kernels.
+
+    n_workers 'auto' minimizes t/n + n*t_startup (compute time t, start-up
+    time of a worker t_startup) within the number of pressure levels, the
+    CPUs and the available memory (one process with n_threads > 1).
+    point_cloud_chunk_size 'auto' takes the
+    chunk size with the highest benchmarked throughput whose kernel
+    temporaries fit into a quarter of the available memory.
+
+    Parameters:
+    -----------
+    cfg: dict
+    fp: FluidProperties
+    n_points: int, optional
+        number of points, default: grid size (or the size of the point
+        cloud)
+
+    Returns:
+    --------
+    plan: RunPlan
+    """
+    is_point_cloud = bool(cfg.get('point_cloud_temp_file'))
+    eos_list = cfg['eos_list']
+    properties = cfg['properties']
+    n_quantities = len(property_columns(properties))
+    kinds = (['ref_data'] if cfg['include_ref_data'] else []) + eos_list
+    memory = available_memory()
+    if cfg.get('memory_limit_GB'):
+        memory = cfg['memory_limit_GB']*1e9
+
+    if is_point_cloud:
+        temp_cloud = open_point_array(cfg['point_cloud_temp_file'],
+                                      cfg['point_cloud_dtype'])
+        n_press, n_temp = 1, temp_cloud.size
+        temp_range = (float(np.min(temp_cloud[:_N_BENCH_EOS])),
+                      float(np.max(temp_cloud[:_N_BENCH_EOS])))
+        press_range = (1e5, 1e7)
+        pressure = 1e6
+    else:
+        n_press, n_temp = len(cfg['pressure_array']), len(cfg['temp_array'])
+        temp_range = (cfg['temp_array'][0], cfg['temp_array'][-1])
+        press_range = (cfg['pressure_array'][0], cfg['pressure_array'][-1])
+        pressure = float(np.median(cfg['pressure_array']))
+    if n_points is None:
+        n_points = n_press*n_temp
+
+    plan = RunPlan(n_points=n_points, kinds=kinds, n_workers=1,
+                   point_cloud_chunk_size=0, memory_available=memory)
+
+    # micro-benchmarks
+    stacked = cfg['stack_eos'] and not is_point_cloud
+    if eos_list:
+        plan.cost.update(benchmark_eos(eos_list, fp, temp_range, pressure,
+                                       cfg['root_solver'], properties,
+                                       stacked))
+    if cfg['include_ref_data']:
+        plan.cost['ref_data'], time_setup = benchmark_reference(
+            fp.name, temp_range, press_range, cfg['reference_backend'],
+            properties)
+        plan.notes.append(f'set-up of the {cfg["reference_backend"]} '
+                          f'backend: {_format_time(time_setup)}')
+    if cfg['save_data_to_csv'] and not is_point_cloud:
+        plan.cost['write'] = benchmark_writer(cfg['output_format'],
+                                              properties)
+
+    # runtime
+    for kind in kinds:
+        if kind in plan.cost:
+            plan.time[kind] = plan.cost[kind]*n_points
+    if stacked and 'stacked' in plan.cost:
+        plan.time['stacked'] = plan.cost['stacked']*n_points
+    if n_press > 1 and eos_list:
+        plan.time['saturation'] = sum(plan.cost[f'saturation {eos}']*n_temp
+                                      for eos in eos_list)
+    if cfg.get('uncertainty_rel_std'):
+        plan.time['uncertainty'] = sum(
+            plan.cost.get(eos, plan.cost.get('stacked', 0.))
+            for eos in eos_list)*n_points*cfg['uncertainty_n_samples']
+    if 'write' in plan.cost:
+        plan.time['write'] = plan.cost['write']*n_points*len(kinds)
+
+    # peak memory: results of all kinds and the data frames for writing
+    # (float columns, the astype copy and the kind column), or only the
+    # kernel temporaries of one pressure level / chunk
+    bytes_kernel = (_KERNEL_TEMP_ARRAYS*8*n_temp
+                    * (len(eos_list) if stacked else 1))
+    if is_point_cloud or (cfg['save_memmap_tables']
+                          and not cfg['save_data_to_csv']):
+        plan.memory_peak = bytes_kernel
+    else:
+        bytes_results = n_points*len(kinds)*n_quantities*8
+        bytes_frames = (n_points*len(kinds)*((n_quantities + 2)*16 + 8)
+                        if cfg['save_data_to_csv'] else 0)
+        plan.memory_peak = bytes_results + max(bytes_frames, bytes_kernel)
+
+    # worker processes for the pressure levels, their shared result arrays
+    # are added to the results (only the pressure and temperature columns
+    # per kind are extra), with the cache or checkpoints the shared array is
+    # copied into a data frame
+    time_parallel = sum(plan.time.get(kind, 0.) for kind in kinds)
+    if cfg.get('use_cache') or cfg.get('checkpoint'):
+        bytes_shared = n_points*(n_quantities + 2)*8*2
+    else:
+        bytes_shared = n_points*len(kinds)*2*8
+    n_workers = cfg['n_workers']
+    if n_workers == 'auto':
+        n_workers = 1
+        if (n_press > 1 and not stacked and not cfg['save_memmap_tables']
+                and not is_point_cloud and cfg.get('n_threads', 1) == 1):
+            n_max = min(os.cpu_count() or 1, n_press)
+            if memory is not None and (plan.memory_peak + bytes_shared
+                                       > memory):
+                n_max = 1
+                plan.notes.append('no worker processes: the shared results '
+                                  'do not fit into the available memory')
+            n_workers = int(np.clip(round(
+                (time_parallel/_WORKER_STARTUP_S)**0.5), 1, n_max))
+    plan.n_workers = n_workers
+    if n_workers > 1:
+        for kind in kinds:
+            if kind in plan.time:
+                plan.time[kind] /= n_workers
+        plan.time['worker start-up'] = n_workers*_WORKER_STARTUP_S
+        plan.memory_peak += bytes_shared
+
+    # chunks of point clouds
+    if is_point_cloud:
+        chunk_size = cfg['point_cloud_chunk_size']
+        if chunk_size == 'auto':
+            chunk_size = _tune_chunk_size(eos_list, fp, temp_range, pressure,
+                                          properties, memory)
+        plan.point_cloud_chunk_size = int(chunk_size)
+        plan.memory_peak = _KERNEL_TEMP_ARRAYS*8*plan.point_cloud_chunk_size
+
+    if not plan.fits_memory:
+        plan.notes.append('the predicted peak memory exceeds the available '
+                          'memory, consider save_memmap_tables without '
+                          'save_data_to_csv or a smaller grid')
+    return plan
+
+
+def _tune_chunk_size(eos_list: list, fp: FluidProperties, temp_range: tuple,
+                     pressure: float, properties: list,
+                     memory: float) -> int:
+    chunk_max = _CHUNK_SIZES[-1]
+    if memory is not None:
+        chunk_max = max(_CHUNK_SIZES[0], int(
+            _CHUNK_MEMORY_SHARE*memory/(_KERNEL_TEMP_ARRAYS*8)))
+    if not eos_list:
+        return min(_CHUNK_SIZES[-1], chunk_max)
+    best, best_cost = _CHUNK_SIZES[0], np.inf
+    for chunk_size in _CHUNK_SIZES:
+        if chunk_size > chunk_max:
+            break
+        cost = benchmark_eos(eos_list[:1], fp, temp_range, pressure,
+                             properties=properties, n_temp=chunk_size,
+                             saturation=False)[eos_list[0]]
+        if cost < best_cost:
+            best, best_cost = chunk_size, cost
+    return best
+
+
+def _best_time(func: callable, n_repeat: int = 3) -> float:
+    times = []
+    for _ in range(n_repeat):
+        time_start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - time_start)
+    return min(times)
+
+
+def _format_time(seconds: float) -> str:
+    if seconds < 120:
+        return f'{seconds:.2f} s'
+    if seconds < 7200:
+        return f'{seconds/60:.1f} min'
+    return f'{seconds/3600:.1f} h'
@@ -0,0 +1,182 @@
+import numpy as np
+import os
+import yaml
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_all import calc_eos_kernel
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.ref_data_from_coolprop import ref_data_points
+from realtpl.ref_data_from_coolprop import ref_data_isochoric
+from realtpl.isochoric import calc_isochoric_kernel, isochoric_columns
+from realtpl.properties import property_columns, quantity_name
+from realtpl.properties import quantity_unit
+from realtpl.memmap_table import HEADER_FILE
+
+# number of points evaluated at once
+_CHUNK_SIZE = 1000000
+
+# names of the inputs paired with the temperature in messages
+_INPUT_NAMES = {'press': 'pressures', 'rho': 'densities'}
+
+
+def open_point_array(file: str, dtype: str = 'float64') -> np.ndarray:
+    """
+    Opens a one-dimensional array of a point cloud as read-only memory map,
+    either a npy file or a raw binary file of dtype (e.g. float32 or float64,
+    native byte order)
+    """
+    if file.endswith('.npy'):
+        array = np.load(file, mmap_mode='r')
+    else:
+        array = np.memmap(file, dtype=dtype, mode='r')
+    if array.ndim != 1:
+        array = array.reshape(-1)
+    return array
+
+
+def evaluate_point_cloud(kind: str, fp: FluidProperties, temp_file: str,
+                         press_file: str, output_dir: str,
+                         dtype: str = 'float64',
+                         chunk_size: int = _CHUNK_SIZE,
+                         reference_backend: str = 'HEOS',
+                         properties: list = None) -> str:
+    """
+    Evaluates kind (ref_data or eos name) at the paired temperatures and
+    pressures of an unstructured point cloud, e.g. the cells of a CFD
+    snapshot
+
+    Temperatures (K) and pressures (Pa) are read from memory-mapped files
+    (see open_point_array) and evaluated in chunks of chunk_size points. The
+    results are written to <output_dir>/<fluid>/point_cloud/<kind>/ as one
+    npy file per quantity with the same length and order as the input
+    (written through memory maps) and a header.yaml, which is written last.
+    Thus, the memory use does not depend on the number of points.
+
+    The eos root is selected by the Gibbs energy (no vapor pressure curve,
+    as for calc_eos_points), CoolProp failures give NaN. The reference data
+    is evaluated with the CoolProp backend reference_backend. Only the
+    quantities of properties (default: all) are computed and written.
+
+    Returns:
+    --------
+    path: str
+        directory of the results
+    """
+    if kind != 'ref_data':
+        ed = eos_parameter_from_eos_name(kind, fp)
+        alpha_funcs = alpha_functions_from_eos_name(kind, fp)
+        transport = ChungTransportModel(fp)
+
+    def evaluate(temp_chunk, press_chunk):
+        if kind == 'ref_data':
+            return ref_data_points(fp.name, temp_chunk, press_chunk,
+                                   backend=reference_backend,
+                                   properties=properties)
+        with np.errstate(all='ignore'):
+            return calc_eos_kernel(fp, ed, alpha_funcs, temp_chunk,
+                                   press_chunk, transport=transport,
+                                   properties=properties)
+
+    return _evaluate_chunks(kind, fp, os.path.join(output_dir, fp.name,
+                                                   'point_cloud', kind),
+                            temp_file, ('press', press_file, 'Pa'), dtype,
+                            chunk_size, property_columns(properties),
+                            evaluate)
+
+
+def evaluate_point_cloud_isochoric(kind: str, fp: FluidProperties,
+                                   temp_file: str, density_file: str,
+                                   output_dir: str, dtype: str = 'float64',
+                                   chunk_size: int = _CHUNK_SIZE,
+                                   reference_backend: str = 'HEOS',
+                                   properties: list = None) -> str:
+    """
+    Evaluates kind (ref_data or eos name) at the paired temperatures and
+    densities (kg/m3) of a point cloud as evaluate_point_cloud, but with the
+    pressure given explicitly by the eos (see calc_isochoric_kernel) instead
+    of the density; the results are written to
+    <output_dir>/<fluid>/point_cloud_isochoric/<kind>/
+
+    Returns:
+    --------
+    path: str
+        directory of the results
+    """
+    if kind != 'ref_data':
+        ed = eos_parameter_from_eos_name(kind, fp)
+        alpha_funcs = alpha_functions_from_eos_name(kind, fp)
+        transport = ChungTransportModel(fp)
+
+    def evaluate(temp_chunk, rho_chunk):
+        if kind == 'ref_data':
+            return ref_data_isochoric(fp.name, temp_chunk, rho_chunk,
+                                      backend=reference_backend,
+                                      properties=properties)
+        with np.errstate(all='ignore'):
+            return calc_isochoric_kernel(fp, ed, alpha_funcs, temp_chunk,
+                                         rho_chunk, transport, properties)
+
+    return _evaluate_chunks(kind, fp, os.path.join(output_dir, fp.name,
+                                                   'point_cloud_isochoric',
+                                                   kind),
+                            temp_file, ('rho', density_file, 'kg/m3'), dtype,
+                            chunk_size, isochoric_columns(properties),
+                            evaluate)
+
+
+def _evaluate_chunks(kind: str, fp: FluidProperties, path: str,
+                     temp_file: str, second_input: tuple, dtype: str,
+                     chunk_size: int, columns: list,
+                     evaluate: callable) -> str:
+    # evaluates the paired inputs chunk by chunk into npy files of columns,
+    # second_input: (name, file, unit) of the input paired with temp
+    name, second_file, unit = second_input
+    temp = open_point_array(temp_file, dtype)
+    second = open_point_array(second_file, dtype)
+    if len(temp) != len(second):
+        raise ValueError(f'Different number of temperatures ({len(temp)}) '
+                         f'and {_INPUT_NAMES[name]} ({len(second)}).')
+
+    os.makedirs(path, exist_ok=True)
+    if os.path.exists(os.path.join(path, HEADER_FILE)):
+        os.remove(os.path.join(path, HEADER_FILE))
+
+    arrays = [np.lib.format.open_memmap(
+                  os.path.join(path, quantity_name(col) + '.npy'),
+                  mode='w+',
+                  dtype=float, shape=(len(temp),))
+              for col in columns]
+
+    for start in range(0, len(temp), chunk_size):
+        temp_chunk = np.asarray(temp[start:start + chunk_size], dtype=float)
+        second_chunk = np.asarray(second[start:start + chunk_size],
+                                  dtype=float)
+        values = evaluate(temp_chunk, second_chunk)
+        for array, value in zip(arrays, values):
+            array[start:start + chunk_size] = value
+
+    for array in arrays:
+        array.flush()
+    del arrays
+
+    header = {
+        'kind': kind,
+        'n_points': len(temp),
+        'dtype': 'float64',
+        'inputs': {'temp': {'file': os.path.abspath(temp_file),
+                            'unit': 'K'},
+                   name: {'file': os.path.abspath(second_file),
+                          'unit': unit}},
+        'quantities': {quantity_name(col): {
+                           'file': quantity_name(col) + '.npy',
+                           'unit': quantity_unit(col),
+                           'column': col}
+                       for col in columns},
+        'fluid': {'name': fp.name},
+    }
+    with open(os.path.join(path, HEADER_FILE), 'w') as f:
+        yaml.safe_dump(header, f, sort_keys=False)
+
+    return path
@@ -0,0 +1,70 @@
+# quantities of the thermodynamic model and the reference data and their
+# output columns
+PROPERTIES = {'rho': 'rho_kg/m3',
+              'cp': 'cp_J/(kgK)',
+              'sound': 'sound_m/s',
+              'visc': 'visc_Pas',
+              'cond': 'cond_W/(mK)'}
+
+# dependency graph of the kernel chain: intermediate results and quantities
+# each node requires (caloric: cv, cp and speed of sound of calc_cv_cp_sound)
+DEPENDENCIES = {'z': [],
+                'vol': ['z'],
+                'rho': ['vol'],
+                'caloric': ['vol'],
+                'cp': ['caloric'],
+                'sound': ['caloric'],
+                'visc': ['rho'],
+                'cond': ['rho', 'caloric']}
+
+
+def resolve_properties(properties: list = None) -> list:
+    """
+    Checks the requested properties (keys of PROPERTIES) and returns them in
+    the order of PROPERTIES; all properties for None
+    """
+    if properties is None:
+        return list(PROPERTIES)
+    for prop in properties:
+        if prop not in PROPERTIES:
+            raise ValueError(f'Unknown property {prop}, choose from '
+                             f'{", ".join(PROPERTIES)}.')
+    if len(properties) == 0:
+        raise ValueError('At least one property is required.')
+    return [prop for prop in PROPERTIES if prop in properties]
+
+
+def required_nodes(properties: list = None) -> set:
+    """
+    Nodes of the dependency graph (see DEPENDENCIES) that have to be
+    evaluated for properties
+    """
+    nodes = set()
+    stack = list(resolve_properties(properties))
+    while stack:
+        node = stack.pop()
+        if node not in nodes:
+            nodes.add(node)
+            stack.extend(DEPENDENCIES[node])
+    return nodes
+
+
+def property_columns(properties: list = None) -> list:
+    """
+    Output columns of properties (e.g. rho_kg/m3), all for None
+    """
+    return [PROPERTIES[prop] for prop in resolve_properties(properties)]
+
+
+def quantity_name(col: str) -> str:
+    """
+    Quantity of the output column col, e.g. rho for rho_kg/m3
+    """
+    return col.split('_')[0]
+
+
+def quantity_unit(col: str) -> str:
+    """
+    Unit of the output column col, e.g. kg/m3 for rho_kg/m3
+    """
+    return col.split('_', 1)[1]
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import EosParameter, AlphaFunctions
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_all import calc_eos_kernel
+
+# temperatures of the coarse scan: temp_c*(1 + x) for N_SCAN values of x,
+# spaced geometrically in SCAN_RANGE
+SCAN_RANGE = (1e-6, 2.)
+N_SCAN = 64
+
+# step of the finite differences relative to the width of the cp peak
+STENCIL_STEP = 1e-4
+
+
+def calc_pseudo_boiling_temperature(fp: FluidProperties, ed: EosParameter,
+                                    alpha_funcs: AlphaFunctions,
+                                    press: np.ndarray, tol: float = 1e-11,
+                                    max_iter: int = 50):
+    """
+    calc_pseudo_boiling_temperature - locates the maximum of the isobaric
+    heat capacity (pseudo-boiling or Widom line) of the cubic eos
+
+    For each supercritical pressure, cp(T) is evaluated on a coarse scan
+    above the critical temperature (see SCAN_RANGE, N_SCAN), and the first
+    local maximum of the scan brackets the peak. The maximum is refined for
+    all pressures simultaneously by Newton's method on dcp/dT = 0, the first
+    and second derivative are the fourth order central differences of the
+    analytic cp (see calc_cv_cp_sound) with a step of STENCIL_STEP times the
+    width of the peak, sqrt(cp/|d2cp/dT2|). Each point keeps the bracket of
+    the maximum; if the Newton step leaves the bracket or the curvature is
+    not negative, the bracket is bisected instead. Only the points which are
+    not converged yet are evaluated in each iteration.
+
+    The temperature is limited by the rounding errors of cp, a relative
+    accuracy of about 1e-12, compared to about 1e-8 (square root of the
+    machine precision) of the maximum of a dense scan. For pressures below
+    the critical pressure, beyond the end of the pseudo-boiling line (no
+    local maximum of the scan) and for points that did not converge, NaN is
+    returned.
+
+    Parameters
+    -----------
+    fp: FluidProperties
+    ed: EosParameter
+    alpha_funcs: AlphaFunctions
+    press: np.ndarray
+        pressure in Pascal
+    tol: float
+        tolerance of the relative Newton step
+    max_iter: int
+        maximum number of iterations
+
+    Returns
+    ----------
+    temp_pb: np.ndarray
+        pseudo-boiling temperature in Kelvin
+    cp_max: np.ndarray
+        isobaric heat capacity at temp_pb in J/(kg K)
+    """
+    shape = np.shape(press)
+    press_f = np.asarray(press, dtype=float).ravel()
+    temp_pb = np.full(press_f.shape, np.nan)
+    cp_max = np.full(press_f.shape, np.nan)
+
+    def calc_cp(temp, press):
+        with np.errstate(all='ignore'):
+            return calc_eos_kernel(fp, ed, alpha_funcs, temp, press,
+                                   properties=['cp'])[0]
+
+    # coarse scan, first local maximum
+    temp_scan = fp.temp_c*(1 + np.geomspace(*SCAN_RANGE, N_SCAN))
+    idx = np.flatnonzero(press_f > fp.p_c)
+    cp_scan = calc_cp(temp_scan, press_f[idx, None])
+    is_max = ((cp_scan[:, 1:-1] > cp_scan[:, :-2])
+              & (cp_scan[:, 1:-1] >= cp_scan[:, 2:]))
+    found = is_max.any(axis=1)
+    idx = idx[found]
+    i_max = np.argmax(is_max[found], axis=1) + 1
+
+    press = press_f[idx]
+    temp = temp_scan[i_max]
+    temp_lo = temp_scan[i_max - 1]
+    temp_hi = temp_scan[i_max + 1]
+    width = temp_hi - temp_lo
+
+    stencil = np.array([-2, -1, 0, 1, 2])
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+
+        step = STENCIL_STEP*width
+        cp = calc_cp(temp[:, None] + step[:, None]*stencil, press[:, None])
+        d_cp = (cp[:, 0] - 8*cp[:, 1] + 8*cp[:, 3] - cp[:, 4])/(12*step)
+        dd_cp = (-cp[:, 0] + 16*cp[:, 1] - 30*cp[:, 2] + 16*cp[:, 3]
+                 - cp[:, 4])/(12*step**2)
+
+        temp_lo = np.where(d_cp > 0, temp, temp_lo)
+        temp_hi = np.where(d_cp < 0, temp, temp_hi)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            temp_newton = temp - d_cp/dd_cp
+            width = np.where(dd_cp < 0, (cp[:, 2]/np.abs(dd_cp))**0.5, width)
+        use_newton = ((dd_cp < 0) & (temp_newton > temp_lo)
+                      & (temp_newton < temp_hi))
+        temp_new = np.where(use_newton, temp_newton,
+                            0.5*(temp_lo + temp_hi))
+
+        converged = use_newton & (np.abs(temp_new - temp) <= tol*temp)
+        temp_pb[idx[converged]] = temp_new[converged]
+        cp_max[idx[converged]] = cp[converged, 2]
+
+        keep = ~converged
+        idx = idx[keep]
+        press = press[keep]
+        temp = temp_new[keep]
+        temp_lo = temp_lo[keep]
+        temp_hi = temp_hi[keep]
+        width = width[keep]
+
+    return temp_pb.reshape(shape), cp_max.reshape(shape)
+
+
+def pseudo_boiling_temperature(eos: str, fp: FluidProperties,
+                               press: np.ndarray):
+    """
+    Returns the pseudo-boiling temperature and the maximum of cp of the eos
+    for the pressures press, see calc_pseudo_boiling_temperature
+    """
+    return calc_pseudo_boiling_temperature(
+        fp, eos_parameter_from_eos_name(eos, fp),
+        alpha_functions_from_eos_name(eos, fp), press)
+
+
+def calc_pseudo_boiling_curve(eos: str, fp: FluidProperties,
+                              press: np.ndarray) -> pd.DataFrame:
+    """
+    Returns the pseudo-boiling line (maximum of cp) of the eos for all
+    pressures of press where it exists as data frame
+    """
+    temp_pb, cp_max = pseudo_boiling_temperature(eos, fp, press)
+    is_pb = np.isfinite(temp_pb)
+    return pd.DataFrame({
+        'kind': eos,
+        'press_Pa': np.asarray(press)[is_pb],
+        'temp_K': temp_pb[is_pb],
+        'cp_J/(kgK)': cp_max[is_pb]
+    })
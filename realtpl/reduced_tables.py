@@ -0,0 +1,274 @@
+import numpy as np
+import os
+import threading
+import zipfile
+from types import SimpleNamespace
+
+from realtpl.thermophysical_constants import R_UNIV
+from realtpl.eos_data import EosParameter, critical_coefficients
+from realtpl.calc_compressibility import calc_compressibility
+from realtpl.saturation import calc_saturation_pressure
+
+# axes of the reduced tables: ln(A/B) and ln(B) with A = a*alpha*p/(R*T)^2
+# and B = b*p/(R*T) (A/B = a*alpha/(b*R*T) of about 5*alpha/T_r and B of about
+# 0.08*p_r/T_r for the common eos, down to reduced temperatures of about 0.3)
+LN_R_RANGE = (np.log(1e-3), np.log(100.))
+LN_B_RANGE = (np.log(1e-9), np.log(5.))
+TABLE_SHAPE = (1601, 801)
+
+# number of Newton steps on the cubic polishing the interpolated roots and
+# largest relative correction of the last step accepted, larger corrections
+# (cells across a spinodal, where a branch jumps to the other root) are
+# treated as outside the table
+NEWTON_STEPS = 1
+NEWTON_TOL = 1e-4
+
+# band in ln(B) around the tabulated phase boundary where the phase is left
+# to the analytic solver (interpolation error of the boundary)
+SAT_BAND = 1e-5
+# number of nodes of the phase boundary over ln(A/B)
+SAT_NODES = 16001
+
+# directory of the tables on disk, see set_reduced_table_directory
+REDUCED_TABLE_DIR = os.path.join(os.path.expanduser('~'), '.realtpl',
+                                 'reduced_tables')
+
+# tables already loaded or built, see reduced_table
+_TABLES = {}
+_TABLES_LOCK = threading.Lock()
+
+
+class ReducedTable:
+    """
+    Compressibility factor of the generalized cubic eos with parameter d_1
+    over the reduced state (ln(A/B), ln(B))
+
+    The cubic eos depends on the fluid and the eos (critical point, acentric
+    factor, alpha function) only through A and B, so one table per d_1
+    serves all fluids of an eos: SRK and PR (fixed d_1) share one table each,
+    RKPR needs one table per Z_c (which sets d_1). The ratio A/B = a*alpha/(b
+    *R*T) depends only on the temperature, B additionally on the pressure.
+
+    Two tables are kept, as the root of the stable phase jumps at the vapor
+    pressure: the liquid root (or the only root) divided by B and the vapor
+    root (or the only root), each continuous across the vapor pressure. The
+    phase boundary ln(B_sat) over ln(A/B) is tabulated on a finer axis, too.
+    """
+
+    def __init__(self, d_1: float, ln_r: np.ndarray, ln_b: np.ndarray,
+                 z_b_liquid: np.ndarray, z_vapor: np.ndarray,
+                 ln_b_sat: np.ndarray):
+        self.d_1 = d_1
+        self.ln_r = ln_r
+        self.ln_b = ln_b
+        self.z_b_liquid = z_b_liquid
+        self.z_vapor = z_vapor
+        self.ln_b_sat = ln_b_sat
+        self._ln_r_sat = np.linspace(ln_r[0], ln_r[-1], len(ln_b_sat))
+        # below the critical A/B (above the critical temperature) the cubic
+        # eos has a single root
+        a_coeff, b_coeff = critical_coefficients(d_1)
+        self._ln_r_c = np.log(a_coeff/b_coeff)
+        self._values = np.stack([z_b_liquid, z_vapor]).ravel()
+
+    @classmethod
+    def build(cls, d_1: float, shape: tuple = TABLE_SHAPE) -> 'ReducedTable':
+        """
+        Solves the cubic eos on the nodes of the reduced state, the roots of
+        the phases are selected with a vapor pressure of zero (liquid) and
+        of the largest float (vapor)
+        """
+        ln_r = np.linspace(*LN_R_RANGE, shape[0])
+        ln_b = np.linspace(*LN_B_RANGE, shape[1])
+
+        # A = alpha(temp)*B for a = R^2, b = R and temp = 1
+        ed = EosParameter('reduced', d_1, R_UNIV**2, R_UNIV)
+        r = np.exp(ln_r)[:, np.newaxis]
+        b = np.exp(ln_b)
+        z_liquid = calc_compressibility(ed, lambda temp: r, 1., b, 0.)
+        z_vapor = calc_compressibility(ed, lambda temp: r, 1., b,
+                                       np.finfo(float).max)
+
+        # vapor pressure of a pseudo fluid with alpha = 1, where
+        # A/B = a_coeff/(b_coeff*T_r)
+        a_coeff, b_coeff = critical_coefficients(d_1)
+        ed_c = EosParameter('reduced', d_1, a_coeff*R_UNIV**2,
+                            b_coeff*R_UNIV)
+        temp_r = a_coeff/(b_coeff*np.exp(np.linspace(*LN_R_RANGE,
+                                                     SAT_NODES)))
+        fp_c = SimpleNamespace(temp_c=1., p_c=1., omega=0.)
+        p_sat_r = calc_saturation_pressure(fp_c, ed_c, np.ones_like,
+                                           temp_r)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ln_b_sat = np.log(b_coeff*p_sat_r/temp_r)
+
+        return cls(d_1, ln_r, ln_b, z_liquid/b, z_vapor, ln_b_sat)
+
+    def save(self, file: str):
+        # write to a temporary file first, so that processes building the
+        # same table concurrently never leave (or load) an incomplete file
+        tmp_file = file[:-len('.npz')] + f'.{os.getpid()}.tmp.npz'
+        np.savez(tmp_file, d_1=self.d_1, ln_r=self.ln_r, ln_b=self.ln_b,
+                 z_b_liquid=self.z_b_liquid, z_vapor=self.z_vapor,
+                 ln_b_sat=self.ln_b_sat)
+        os.replace(tmp_file, file)
+
+    @classmethod
+    def load(cls, file: str) -> 'ReducedTable':
+        with np.load(file) as data:
+            return cls(float(data['d_1']), data['ln_r'], data['ln_b'],
+                       data['z_b_liquid'], data['z_vapor'],
+                       data['ln_b_sat'])
+
+    def matches(self, shape: tuple = TABLE_SHAPE) -> bool:
+        """
+        True if the table has the current axes
+        """
+        return (self.z_vapor.shape == tuple(shape)
+                and len(self.ln_b_sat) == SAT_NODES
+                and np.isclose(self.ln_r[0], LN_R_RANGE[0])
+                and np.isclose(self.ln_r[-1], LN_R_RANGE[1])
+                and np.isclose(self.ln_b[0], LN_B_RANGE[0])
+                and np.isclose(self.ln_b[-1], LN_B_RANGE[1]))
+
+    def compressibility(self, aa: np.ndarray, bb: np.ndarray,
+                        p_ratio: np.ndarray = None,
+                        newton_steps: int = NEWTON_STEPS) -> np.ndarray:
+        """
+        Bilinear interpolation of the compressibility factor at A = aa and
+        B = bb (arrays of the same shape) inside the table (NaN outside)
+
+        The liquid table is used where the ratio p_ratio of the pressure to
+        the vapor pressure is at least one and, where p_ratio is NaN or not
+        given, above the tabulated vapor pressure; points closer than SAT_BAND
+        to the latter are NaN. The interpolated roots are polished by
+        newton_steps Newton steps on the cubic, points with a relative
+        correction above NEWTON_TOL in the last step or a root of the other
+        branch (cells across a spinodal) are NaN as well.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ln_b = np.log(bb)
+            ln_r = np.log(aa) - ln_b
+            d_ln_b_sat = ln_b - np.interp(ln_r, self._ln_r_sat, self.ln_b_sat)
+            if p_ratio is None:
+                p_ratio = np.full_like(bb, np.nan)
+            unknown = np.isnan(p_ratio)
+            liquid = np.where(unknown, d_ln_b_sat >= 0, p_ratio >= 1)
+            near_sat = unknown & ~(np.abs(d_ln_b_sat) >= SAT_BAND)
+            near_sat &= ~(ln_r < self._ln_r_c)
+
+        n_r, n_b = self.z_vapor.shape
+        x = (ln_r - self.ln_r[0])/(self.ln_r[1] - self.ln_r[0])
+        y = (ln_b - self.ln_b[0])/(self.ln_b[1] - self.ln_b[0])
+        inside = ((x >= 0) & (x <= n_r - 1) & (y >= 0) & (y <= n_b - 1)
+                  & ~near_sat)
+        # indices of the cells, arbitrary outside
+        with np.errstate(invalid='ignore'):
+            i = np.clip(x.astype(int), 0, n_r - 2)
+            j = np.clip(y.astype(int), 0, n_b - 2)
+        wx = x - i
+        wy = y - j
+
+        k = np.where(liquid, 0, n_r*n_b) + i*n_b + j
+        values = self._values
+        z = ((1 - wx)*((1 - wy)*values.take(k) + wy*values.take(k + 1))
+             + wx*((1 - wy)*values.take(k + n_b)
+                   + wy*values.take(k + n_b + 1)))
+        z = np.where(liquid, z*bb, z)
+
+        d_2 = (1 - self.d_1)/(1 + self.d_1)
+        c_2 = bb*(self.d_1 + d_2 - 1) - 1
+        c_1 = aa + bb*(self.d_1*d_2*bb - (self.d_1 + d_2)*(bb + 1))
+        c_0 = -bb*(self.d_1*d_2*(bb**2 + bb) + aa)
+        step = np.zeros_like(z)
+        for _ in range(newton_steps):
+            step = (((z + c_2)*z + c_1)*z + c_0)/((3*z + 2*c_2)*z + c_1)
+            z = z - step
+
+        inside &= np.abs(step) <= NEWTON_TOL*z
+
+        # the root has to be the one of the branch (the smallest root above B
+        # for the liquid, the largest for the vapor), the other roots follow
+        # from the cubic divided by (Z - z)
+        e = c_2 + z
+        disc = e**2 - 4*(c_1 + z*e)
+        with np.errstate(invalid='ignore'):
+            root_1 = (-e - np.sqrt(disc))/2
+            root_2 = (-e + np.sqrt(disc))/2
+            z_lo = z*(1 - NEWTON_TOL)
+            other_liquid = (((root_1 > bb) & (root_1 < z_lo))
+                            | ((root_2 > bb) & (root_2 < z_lo)))
+            inside &= ~np.where(liquid, other_liquid,
+                                root_2 > z*(1 + NEWTON_TOL))
+        return np.where(inside, z, np.nan)
+
+
+def set_reduced_table_directory(path: str):
+    """
+    Sets the directory where the reduced tables are stored
+    """
+    global REDUCED_TABLE_DIR
+    REDUCED_TABLE_DIR = path
+
+
+def reduced_table_directory() -> str:
+    """
+    Returns the directory of the reduced tables, see
+    set_reduced_table_directory
+    """
+    return REDUCED_TABLE_DIR
+
+
+def reduced_table(d_1: float) -> ReducedTable:
+    """
+    Returns the reduced table of d_1, loaded from REDUCED_TABLE_DIR or
+    built and stored there once (also if the stored table cannot be read)
+    """
+    d_1 = float(d_1)
+    file = os.path.join(REDUCED_TABLE_DIR, f'd1_{d_1:.12g}.npz')
+    with _TABLES_LOCK:
+        if file not in _TABLES:
+            try:
+                table = ReducedTable.load(file)
+            except (OSError, EOFError, ValueError, KeyError,
+                    zipfile.BadZipFile):
+                table = None
+            if table is None or not table.matches():
+                table = ReducedTable.build(d_1)
+                os.makedirs(REDUCED_TABLE_DIR, exist_ok=True)
+                table.save(file)
+            _TABLES[file] = table
+        return _TABLES[file]
+
+
+def calc_compressibility_reduced(ed: EosParameter, alpha: callable,
+                                 temp: np.ndarray, press: np.ndarray,
+                                 p_sat: np.ndarray = None) -> np.ndarray:
+    """
+    Compressibility factor interpolated from the reduced table of the eos
+    (see ReducedTable) instead of solving the cubic eos
+
+    The phase is selected with the vapor pressure p_sat where available and
+    with the tabulated phase boundary otherwise. Points outside the table and
+    stacked eos parameters are computed with calc_compressibility.
+    """
+    if np.ndim(ed.d_1) != 0:
+        return calc_compressibility(ed, alpha, temp, press, p_sat)
+
+    aa, bb = np.broadcast_arrays((ed.a*alpha(temp)*press)/(R_UNIV*temp)**2,
+                                 (ed.b*press)/(R_UNIV*temp))
+    p_ratio = None
+    if p_sat is not None:
+        p_ratio = np.broadcast_to(press/np.where(np.isfinite(p_sat), p_sat,
+                                                 np.nan), aa.shape)
+    z = reduced_table(ed.d_1).compressibility(aa, bb, p_ratio)
+
+    outside = np.isnan(z)
+    if np.any(outside):
+        temp_o, press_o, p_sat_o = (
+            np.broadcast_to(x, z.shape)[outside]
+            for x in (temp, press, np.nan if p_sat is None else p_sat))
+        z[outside] = calc_compressibility(
+            ed, lambda t: np.broadcast_to(alpha(temp), z.shape)[outside],
+            temp_o, press_o, p_sat_o)
+    return z
@@ -1,9 +1,29 @@
 import numpy as np
+import os
 import pandas as pd
 import CoolProp as CP
 
+from realtpl.properties import resolve_properties
+from realtpl.properties import property_columns
 
-def ref_data_from_coolprop(name: str, temp: np.ndarray, press: np.ndarray):
+# quantities extracted from CoolProp
+REF_COLUMNS = property_columns()
+
+# methods of the CoolProp state for the quantities of PROPERTIES
+_COOLPROP_GETTERS = {'rho': 'rhomass',
+                     'cp': 'cpmass',
+                     'sound': 'speed_sound',
+                     'visc': 'viscosity',
+                     'cond': 'conductivity'}
+
+# CoolProp backends for the reference data, the tabular backends (bicubic
+# interpolation or tabular Taylor series expansion of tables generated from
+# HEOS) are much faster for large grids
+REFERENCE_BACKENDS = ['HEOS', 'BICUBIC&HEOS', 'TTSE&HEOS']
+
+
+def ref_data_from_coolprop(name: str, temp: np.ndarray, press: np.ndarray,
+                           backend: str = 'HEOS', properties: list = None):
     """
     Imports reference data from CoolProp
 
@@ -14,23 +34,174 @@ def ref_data_from_coolprop(name: str, temp: np.ndarray, press: np.ndarray):
     property library coolprop,” Industrial & engineering chemistry research
     53, 2498–2508 (2014).
     """
-    df = pd.DataFrame(
-        columns=['kind', 'press_Pa', 'temp_K', 'rho_kg/m3', 'cp_J/(kgK)',
-                 'sound_m/s', 'visc_Pas', 'cond_W/(mK)'])
+    values = ref_data_arrays(name, temp, press, backend=backend,
+                             properties=properties)
+
+    df = pd.DataFrame({
+        'kind': 'ref_data',
+        'press_Pa': np.repeat(press, len(temp)),
+        'temp_K': np.tile(temp, len(press))
+    })
+    for col, value in zip(property_columns(properties), values):
+        df[col] = value.ravel()
+
+    return df
+
+
+def ref_data_arrays(name: str, temp: np.ndarray, press: np.ndarray,
+                    out: np.ndarray = None, backend: str = 'HEOS',
+                    properties: list = None) -> np.ndarray:
+    """
+    Evaluates the reference data from CoolProp into an array of shape
+    (len(properties), len(press), len(temp)), optionally provided as out;
+    only the quantities of properties (see PROPERTIES, default: all) are
+    queried from CoolProp
+
+    For tabular backends, points outside of the tables (or where the
+    interpolation fails) are evaluated with HEOS.
+    """
+    state = _ReferenceState(name, backend, properties)
+    if out is None:
+        out = np.empty((len(state.getters), len(press), len(temp)))
 
-    kind = 'ref_data'
-    heos = CP.AbstractState('HEOS', name)
     for j, press_step in enumerate(press):
         for i, temp_step in enumerate(temp):
-            heos.update(CP.PT_INPUTS, press_step, temp_step)
-            location = j*len(temp) + i
-            df.loc[location] = (
-                [kind, press_step, temp_step,
-                 heos.rhomass(),
-                 heos.cpmass(),
-                 heos.speed_sound(),
-                 heos.viscosity(),
-                 heos.conductivity()]
-            )
+            out[:, j, i] = state.evaluate(press_step, temp_step)
 
-    return df
+    return out
+
+
+def ref_data_points(name: str, temp: np.ndarray, press: np.ndarray,
+                    out: np.ndarray = None, backend: str = 'HEOS',
+                    properties: list = None) -> np.ndarray:
+    """
+    Evaluates the reference data from CoolProp for paired temperatures and
+    pressures into an array of shape (len(properties), len(temp)),
+    optionally provided as out; points CoolProp fails for are NaN
+    """
+    state = _ReferenceState(name, backend, properties)
+    if out is None:
+        out = np.empty((len(state.getters), len(temp)))
+
+    for i, (temp_step, press_step) in enumerate(zip(temp, press)):
+        try:
+            out[:, i] = state.evaluate(press_step, temp_step)
+        except ValueError:
+            out[:, i] = np.nan
+
+    return out
+
+
+def ref_data_isochoric(name: str, temp: np.ndarray, rho: np.ndarray,
+                       out: np.ndarray = None, backend: str = 'HEOS',
+                       properties: list = None) -> np.ndarray:
+    """
+    Evaluates the reference data from CoolProp for paired temperatures and
+    densities (isochoric mode) into an array of shape (1 + len(properties
+    without rho), len(temp)) with the pressure first, optionally provided as
+    out; points CoolProp fails for (e.g. two-phase states) are NaN
+    """
+    state = _ReferenceState(name, backend, properties, isochoric=True)
+    if out is None:
+        out = np.empty((len(state.getters), len(temp)))
+
+    for i, (temp_step, rho_step) in enumerate(zip(temp, rho)):
+        try:
+            out[:, i] = state.evaluate(rho_step, temp_step)
+        except ValueError:
+            out[:, i] = np.nan
+
+    return out
+
+
+def set_table_directory(path: str):
+    """
+    Sets the directory in which CoolProp stores (and from which it reloads)
+    the tables of the tabular backends; by default, CoolProp uses
+    ~/.CoolProp/Tables
+    """
+    os.makedirs(path, exist_ok=True)
+    CP.CoolProp.set_config_string(CP.ALTERNATIVE_TABLES_DIRECTORY,
+                                  os.path.join(os.path.abspath(path), ''))
+
+
+def audit_reference_backend(name: str, temp: np.ndarray, press: np.ndarray,
+                            backend: str, n_samples: int = 1000,
+                            seed: int = 0, properties: list = None) -> dict:
+    """
+    Compares the backend with HEOS at n_samples random points of the
+    (press, temp) grid for the quantities of properties (default: all)
+
+    Returns:
+    --------
+    audit: dict
+        backend, number of compared points and for each quantity the
+        maximum and mean relative deviation and the point of the maximum
+    """
+    rng = np.random.default_rng(seed)
+    n_points = len(press)*len(temp)
+    idx = rng.choice(n_points, min(n_samples, n_points), replace=False)
+    press_sample = np.asarray(press, dtype=float)[idx//len(temp)]
+    temp_sample = np.asarray(temp, dtype=float)[idx % len(temp)]
+
+    values = ref_data_points(name, temp_sample, press_sample,
+                             backend=backend, properties=properties)
+    values_heos = ref_data_points(name, temp_sample, press_sample,
+                                  properties=properties)
+    with np.errstate(all='ignore'):
+        dev = np.abs(values/values_heos - 1)
+    is_valid = np.all(np.isfinite(dev), axis=0)
+
+    audit = {'backend': backend, 'n_points': int(np.count_nonzero(is_valid))}
+    for col, dev_col in zip(property_columns(properties), dev[:, is_valid]):
+        if len(dev_col) == 0:
+            continue
+        i = np.argmax(dev_col)
+        audit[col] = {
+            'max_rel_dev': float(dev_col[i]),
+            'mean_rel_dev': float(dev_col.mean()),
+            'press_Pa': float(press_sample[is_valid][i]),
+            'temp_K': float(temp_sample[is_valid][i]),
+        }
+    return audit
+
+
+class _ReferenceState:
+    # CoolProp state of backend with HEOS as fallback for tabular backends,
+    # updated with pressure and temperature or (isochoric) density and
+    # temperature, the latter gives the pressure instead of the density
+
+    def __init__(self, name: str, backend: str, properties: list = None,
+                 isochoric: bool = False):
+        if backend not in REFERENCE_BACKENDS:
+            raise ValueError(f'Unknown reference backend {backend}, choose '
+                             f'from {", ".join(REFERENCE_BACKENDS)}.')
+        self.name = name
+        self.backend = backend
+        self.state = CP.AbstractState(backend, name)
+        self.getters = [_COOLPROP_GETTERS[prop]
+                        for prop in resolve_properties(properties)]
+        self.inputs = CP.PT_INPUTS
+        if isochoric:
+            self.getters = ['p'] + [getter for getter in self.getters
+                                    if getter != 'rhomass']
+            self.inputs = CP.DmassT_INPUTS
+        self._heos = None
+
+    def evaluate(self, value: float, temp: float) -> tuple:
+        # value: pressure or (isochoric) density
+        try:
+            return _evaluate(self.state, self.inputs, value, temp,
+                             self.getters)
+        except ValueError:
+            if self.backend == 'HEOS':
+                raise
+        if self._heos is None:
+            self._heos = CP.AbstractState('HEOS', self.name)
+        return _evaluate(self._heos, self.inputs, value, temp, self.getters)
+
+
+def _evaluate(state, inputs: int, value: float, temp: float,
+              getters: list) -> list:
+    state.update(inputs, value, temp)
+    return [getattr(state, getter)() for getter in getters]
@@ -0,0 +1,161 @@
+from functools import lru_cache
+import glob
+import hashlib
+import numpy as np
+import os
+import pandas as pd
+
+import CoolProp
+
+from realtpl.fluid_properties import FluidProperties
+
+# columns stored in the cache, kind, pressure and temperature are part of key
+CACHE_COLUMNS = ['rho_kg/m3', 'cp_J/(kgK)', 'sound_m/s', 'visc_Pas',
+                 'cond_W/(mK)']
+
+
+class ResultCache:
+    """
+    Content-addressed cache of computed data blocks
+
+    The results of a kind (ref_data, SRK, PR, ...) are cached per pressure
+    level and temperature block. A temperature block consists of block_size
+    consecutive temperatures of the temperature array, starting at its first
+    value. The key of a block is the hash of the fluid data, the kind, the
+    pressure, the temperatures of the block and the code version (source of
+    realtpl and CoolProp version). Thus, for a rerun with, e.g., an extended
+    temperature range, further pressure levels or an additional eos, only the
+    new blocks are computed and the rest is assembled from the cache.
+
+    Each block is stored as npz file in cache_dir.
+    """
+
+    def __init__(self, cache_dir: str, block_size: int = 1000):
+        self.cache_dir = cache_dir
+        self.block_size = int(block_size)
+        self.n_hits = 0
+        self.n_misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def compute(self, kind: str, fp: FluidProperties, temp_array: np.ndarray,
+                pressure_array: np.ndarray, calc: callable,
+                options: dict = None,
+                columns: list = None) -> pd.DataFrame:
+        """
+        Returns the data frame of kind for all pressures and temperatures
+
+        Parameters:
+        -----------
+        kind: str
+        fp: FluidProperties
+        temp_array: numpy array
+        pressure_array: numpy array
+        calc: callable
+            calc(temp, pressure_array) returns the data frame of kind for the
+            temperatures temp and all pressures of pressure_array (ordered
+            by pressure, then temperature)
+        options: dict, optional
+            further options changing the results (e.g. the root solver),
+            part of the key
+        columns: list, optional
+            columns returned by calc, default: CACHE_COLUMNS; part of the key
+            if different
+
+        Returns:
+        --------
+        df: Pandas DataFrame
+        """
+        temp_array = np.asarray(temp_array, dtype=float)
+        pressure_array = np.asarray(pressure_array, dtype=float)
+        n_temp = len(temp_array)
+        if columns is None:
+            columns = CACHE_COLUMNS
+        values = np.empty((len(pressure_array), n_temp, len(columns)))
+
+        hash_fluid = fluid_hash(fp)
+        if options:
+            hash_fluid += repr(sorted(options.items()))
+        if columns != CACHE_COLUMNS:
+            hash_fluid += repr(columns)
+        for start in range(0, n_temp, self.block_size):
+            temp = temp_array[start:start + self.block_size]
+            files = [self._file(kind, hash_fluid, pressure, temp)
+                     for pressure in pressure_array]
+
+            missing = []
+            for j, file in enumerate(files):
+                if os.path.exists(file):
+                    with np.load(file) as data:
+                        values[j, start:start + len(temp)] = data['values']
+                    self.n_hits += 1
+                else:
+                    missing.append(j)
+
+            if not missing:
+                continue
+
+            df = calc(temp, pressure_array[missing])
+            block = df[columns].to_numpy(dtype=float).reshape(
+                len(missing), len(temp), len(columns))
+            for block_j, j in zip(block, missing):
+                values[j, start:start + len(temp)] = block_j
+                _save_atomic(files[j], block_j)
+            self.n_misses += len(missing)
+
+        df = pd.DataFrame({
+            'kind': kind,
+            'press_Pa': np.repeat(pressure_array, n_temp),
+            'temp_K': np.tile(temp_array, len(pressure_array))
+        })
+        for i, col in enumerate(columns):
+            df[col] = values[:, :, i].ravel()
+        return df
+
+    def clear(self):
+        for file in glob.glob(os.path.join(self.cache_dir, '*.npz')):
+            os.remove(file)
+
+    def _file(self, kind: str, hash_fluid: str, pressure: float,
+              temp: np.ndarray) -> str:
+        key = hashlib.sha256()
+        for item in (kind, hash_fluid, repr(float(pressure)), code_version()):
+            key.update(item.encode())
+            key.update(b'\0')
+        key.update(temp.tobytes())
+        return os.path.join(self.cache_dir, key.hexdigest() + '.npz')
+
+
+def fluid_hash(fp: FluidProperties) -> str:
+    """
+    Hash of all fluid data entering the computation
+    """
+    key = hashlib.sha256()
+    for item in (fp.name, fp.mass, fp.omega, fp.p_c, fp.temp_c, fp.rho_c,
+                 fp.association_parameter, fp.dipole_moment):
+        key.update(repr(item).encode())
+        key.update(b'\0')
+    if fp.data_nasa is not None:
+        key.update(np.asarray(fp.data_nasa.temp_bin_edges,
+                              dtype=float).tobytes())
+        key.update(np.asarray(fp.data_nasa.coeff, dtype=float).tobytes())
+    return key.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Hash of the realtpl source code and the CoolProp version
+    """
+    key = hashlib.sha256(CoolProp.__version__.encode())
+    for file in sorted(glob.glob(os.path.join(os.path.dirname(__file__),
+                                              '*.py'))):
+        with open(file, 'rb') as f:
+            key.update(f.read())
+    return key.hexdigest()
+
+
+def _save_atomic(file: str, values: np.ndarray):
+    # write to a temporary file first, so that no incomplete blocks remain
+    tmp_file = file[:-len('.npz')] + f'.{os.getpid()}.tmp.npz'
+    np.savez(tmp_file, values=values)
+    os.replace(tmp_file, file)
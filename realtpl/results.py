@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+from realtpl.grid import index_range
+
+
+class GridResults:
+    """
+    Results of several kinds (ref_data, SRK, PR, ...) on a (press, temp) grid
+
+    Each quantity of a kind is stored as one contiguous array of shape
+    (len(press), len(temp)) with the axes attached, so that regions and
+    deviations are computed on the grid without copying (or reading, for
+    memory-mapped tables) the rest. A long-format data frame (one row per
+    point, as written to the data files) is only built on demand.
+    """
+
+    def __init__(self, temp_array: np.ndarray, pressure_array: np.ndarray):
+        self.temp = np.asarray(temp_array, dtype=float)
+        self.press = np.asarray(pressure_array, dtype=float)
+        self._data = {}
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.press), len(self.temp)
+
+    @property
+    def kinds(self) -> list:
+        return list(self._data)
+
+    def columns(self, kind: str) -> list:
+        return list(self._data[kind])
+
+    def add(self, kind: str, values: dict):
+        """
+        Adds (or replaces) kind with values ({column: array of shape
+        (len(press), len(temp))}), the arrays are not copied
+        """
+        for col, value in values.items():
+            if np.shape(value) != self.shape:
+                raise ValueError(f'{kind} {col} has the shape '
+                                 f'{np.shape(value)}, expected {self.shape}.')
+        self._data[kind] = dict(values)
+
+    def add_arrays(self, kind: str, columns: list, values: np.ndarray):
+        """
+        Adds kind from an array of shape (len(columns), len(press),
+        len(temp)) as returned by the kernels
+        """
+        self.add(kind, dict(zip(columns, values)))
+
+    def add_dataframe(self, df: pd.DataFrame, kind: str = None):
+        """
+        Adds the data frame of one kind in long format (ordered by pressure,
+        then temperature, as returned by calc_eos_data)
+        """
+        if kind is None:
+            kind = df['kind'].iloc[0]
+        self.add(kind, {col: df[col].to_numpy(dtype=float).reshape(self.shape)
+                        for col in df.columns
+                        if col not in ['kind', 'press_Pa', 'temp_K']})
+
+    def add_memmap_table(self, table):
+        """
+        Adds a MemmapTable (see write_memmap_table), its quantities stay
+        memory-mapped (only accessed regions are read)
+        """
+        self.add(table.kind, {data['column']: table[quantity]
+                              for quantity, data
+                              in table.header['quantities'].items()})
+
+    def update(self, other: 'GridResults'):
+        """
+        Adds all kinds of other (on the same grid)
+        """
+        if (not np.array_equal(self.temp, other.temp)
+                or not np.array_equal(self.press, other.press)):
+            raise ValueError('The results are on different grids.')
+        self._data.update(other._data)
+
+    def __getitem__(self, key: tuple) -> np.ndarray:
+        """
+        Array of shape (len(press), len(temp)) of key = (kind, column)
+        """
+        kind, col = key
+        return self._data[kind][col]
+
+    def __contains__(self, kind: str) -> bool:
+        return kind in self._data
+
+    def region(self, kind: str, col: str, press_range: tuple = None,
+               temp_range: tuple = None) -> tuple:
+        """
+        Returns the axes and data of (kind, col) within the (inclusive)
+        pressure and temperature ranges
+        """
+        j = index_range(self.press, press_range)
+        i = index_range(self.temp, temp_range)
+        return self.press[j], self.temp[i], self[kind, col][j, i]
+
+    def deviation(self, kind: str, col: str,
+                  reference: str = 'ref_data') -> np.ndarray:
+        """
+        Relative deviation (value - value_ref)/value_ref of (kind, col) from
+        the reference kind on the grid
+        """
+        ref = np.asarray(self[reference, col])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (np.asarray(self[kind, col]) - ref)/ref
+
+    def to_dataframe(self, kinds: list = None) -> pd.DataFrame:
+        """
+        Long-format data frame (kind, press_Pa, temp_K and the columns) of
+        kinds (default: all, in the order they were added)
+        """
+        kinds = self.kinds if kinds is None else kinds
+        return pd.concat([self._kind_dataframe(kind) for kind in kinds],
+                         ignore_index=True)
+
+    def dataframes(self):
+        """
+        Yields kind and its long-format data frame, one kind at a time
+        """
+        for kind in self.kinds:
+            yield kind, self._kind_dataframe(kind)
+
+    def _kind_dataframe(self, kind: str) -> pd.DataFrame:
+        df = pd.DataFrame({
+            'kind': kind,
+            'press_Pa': np.repeat(self.press, len(self.temp)),
+            'temp_K': np.tile(self.temp, len(self.press))
+        })
+        for col, value in self._data[kind].items():
+            df[col] = np.asarray(value).ravel()
+        return df
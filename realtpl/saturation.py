@@ -0,0 +1,243 @@
+import numpy as np
+import pandas as pd
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import EosParameter
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.thermophysical_constants import R_UNIV
+
+# vapor pressure curves already computed, see saturation_pressure
+_SATURATION_CACHE = {}
+
+
+def calc_saturation_pressure(fp: FluidProperties, ed: EosParameter,
+                             alpha: callable, temp: np.ndarray,
+                             tol: float = 1e-12, max_iter: int = 100):
+    """
+    calc_saturation_pressure - computes the vapor pressure of the cubic eos
+
+    The vapor pressure p_sat(T) is the pressure where the liquid root z_l and
+    the vapor root z_v of the cubic eos have equal fugacity (Maxwell
+    criterion). With the fugacity coefficient of the generalized cubic eos
+
+        ln(phi) = Z - 1 - ln(Z - B) - A/(B*(d_1 - d_2))*ln((Z + d_1*B)
+                                                         /(Z + d_2*B))
+
+    and d(ln(phi_l) - ln(phi_v))/d(ln(p)) = z_l - z_v, the equal-fugacity
+    condition is solved by Newton's method in ln(p) for all temperatures
+    simultaneously. The initial guess is the Lee-Kesler/Edmister correlation.
+    Each point keeps a bracket of the vapor pressure; if the Newton step
+    leaves the bracket or only one real root exists at the current pressure,
+    the bracket is bisected (geometrically) instead. Only the points which are
+    not converged yet are evaluated in each iteration.
+
+    For temperatures above the critical temperature no vapor pressure exists
+    and NaN is returned, as well as for points that did not converge.
+
+    Parameters
+    -----------
+    fp: FluidProperties
+    ed: EosParameter
+    alpha: callable
+        function that returns the temperature dependent alpha values
+    temp: np.ndarray
+        temperature in Kelvin
+    tol: float
+        tolerance of ln(phi_l) - ln(phi_v)
+    max_iter: int
+        maximum number of iterations
+
+    Returns
+    ----------
+    p_sat: np.ndarray
+        vapor pressure in Pascal
+
+    Authors
+    ----------
+    Trummler, Glatzle
+
+    References
+    ----------
+    .. [1] Michelsen & Mollerup (2007), Thermodynamic Models: Fundamentals
+    & Computational Aspects, 87-989961-1-8
+
+    .. [2] Elliot & Lira (2012), Introductory Chemical Engineering
+    Thermodynamics
+    """
+    temp = np.asarray(temp, dtype=float)
+    a_alpha = ed.a*alpha(temp)
+    shape = np.broadcast(a_alpha, temp, ed.b, ed.d_1, fp.temp_c).shape
+
+    # work on flat arrays, only points that are not converged are evaluated
+    temp_f = np.broadcast_to(temp, shape).ravel()
+    a_alpha_f = np.broadcast_to(a_alpha, shape).ravel()
+    b_f = np.broadcast_to(ed.b, shape).ravel()
+    d_1_f = np.broadcast_to(ed.d_1, shape).ravel()
+    d_2_f = np.broadcast_to(ed.d_2, shape).ravel()
+    temp_c = np.broadcast_to(fp.temp_c, shape).ravel()
+    p_c = np.broadcast_to(fp.p_c, shape).ravel()
+    omega = np.broadcast_to(fp.omega, shape).ravel()
+
+    p_sat = np.full(temp_f.shape, np.nan)
+
+    idx = np.flatnonzero(temp_f < temp_c)
+    with np.errstate(over='ignore'):
+        press = p_c[idx]*10**(7/3*(1 + omega[idx])
+                              * (1 - temp_c[idx]/temp_f[idx]))
+    press = np.clip(press, 1e-300, 0.99*p_c[idx])
+    p_lo = np.zeros_like(press)
+    p_hi = p_c[idx].copy()
+
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+
+        r_t = R_UNIV*temp_f[idx]
+        d_1 = d_1_f[idx]
+        d_2 = d_2_f[idx]
+        aa = a_alpha_f[idx]*press/r_t**2
+        bb = b_f[idx]*press/r_t
+
+        z_l, z_v, three_real_roots, vapor_like = _cubic_roots(aa, bb, d_1,
+                                                              d_2)
+
+        # fugacity difference only where a meaningful liquid root exists
+        valid = three_real_roots & (z_l > bb)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g = np.where(valid,
+                         _ln_phi(z_l, aa, bb, d_1, d_2)
+                         - _ln_phi(z_v, aa, bb, d_1, d_2),
+                         0.)
+
+        # g > 0: liquid less stable, i.e., pressure below vapor pressure
+        below = ((~three_real_roots & vapor_like)
+                 | (three_real_roots & ~valid) | (valid & (g > 0)))
+        above = (~three_real_roots & ~vapor_like) | (valid & (g < 0))
+        p_lo = np.where(below, press, p_lo)
+        p_hi = np.where(above, press, p_hi)
+
+        converged = (valid & (np.abs(g) < tol)) | (p_hi - p_lo <= tol*p_hi)
+        p_sat[idx[converged]] = press[converged]
+
+        with np.errstate(invalid='ignore', over='ignore', divide='ignore'):
+            p_newton = press*np.exp(-g/(z_l - z_v))
+        p_bisect = np.where(p_lo > 0, (p_lo*p_hi)**0.5, 0.1*p_hi)
+        use_newton = valid & (p_newton > p_lo) & (p_newton < p_hi)
+        press = np.where(use_newton, p_newton, p_bisect)
+
+        keep = ~converged
+        idx = idx[keep]
+        press = press[keep]
+        p_lo = p_lo[keep]
+        p_hi = p_hi[keep]
+
+    return p_sat.reshape(shape)
+
+
+def saturation_pressure(eos: str, fp: FluidProperties, temp: np.ndarray):
+    """
+    Returns the vapor pressure of the eos for the temperatures temp
+
+    The result is computed once per fluid, eos and temperature array and
+    cached afterwards.
+    """
+    key = (eos, fp.name) + tuple(
+        np.asarray(x, dtype=float).tobytes()
+        for x in (fp.omega, fp.temp_c, fp.p_c, fp.rho_c, temp))
+
+    if key not in _SATURATION_CACHE:
+        ed = eos_parameter_from_eos_name(eos, fp)
+        alpha_funcs = alpha_functions_from_eos_name(eos, fp)
+        p_sat = calc_saturation_pressure(fp, ed, alpha_funcs.alpha, temp)
+        p_sat.flags.writeable = False
+        _SATURATION_CACHE[key] = p_sat
+    return _SATURATION_CACHE[key]
+
+
+def saturation_temperature(eos: str, fp: FluidProperties,
+                           press: np.ndarray, n_iter: int = 3):
+    """
+    Returns the saturation temperature of the eos for the pressures press
+
+    The vapor pressure curve is computed (and cached) between 0.3 and 1 times
+    the critical temperature and inverted by interpolation of ln(p_sat) over
+    the temperature, followed by n_iter Newton steps on ln(p_sat(T)) - ln(p).
+    NaN is returned for pressures outside of the vapor pressure curve
+    (supercritical or below 0.3 times the critical temperature).
+    """
+    temp_curve = np.linspace(0.3, 1, 2001)[:-1]*fp.temp_c
+    p_curve = saturation_pressure(eos, fp, temp_curve)
+    valid = np.isfinite(p_curve)
+    temp_curve = temp_curve[valid]
+    ln_p_curve = np.log(p_curve[valid])
+    d_ln_p_curve = np.gradient(ln_p_curve, temp_curve)
+
+    ln_press = np.log(np.asarray(press, dtype=float))
+    inside = (ln_press >= ln_p_curve[0]) & (ln_press <= ln_p_curve[-1])
+    temp = np.interp(ln_press, ln_p_curve, temp_curve)
+
+    ed = eos_parameter_from_eos_name(eos, fp)
+    alpha_funcs = alpha_functions_from_eos_name(eos, fp)
+    for _ in range(n_iter):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            residual = np.log(calc_saturation_pressure(
+                fp, ed, alpha_funcs.alpha, temp[inside])) - ln_press[inside]
+        step = residual/np.interp(temp[inside], temp_curve, d_ln_p_curve)
+        temp[inside] -= np.where(np.isfinite(step), step, 0)
+
+    return np.where(inside, temp, np.nan)
+
+
+def calc_saturation_curve(eos: str, fp: FluidProperties,
+                          temp: np.ndarray) -> pd.DataFrame:
+    """
+    Returns the two-phase boundary (vapor pressure curve) of the eos for all
+    subcritical temperatures of temp as data frame
+    """
+    p_sat = saturation_pressure(eos, fp, temp)
+    is_sat = np.isfinite(p_sat)
+    return pd.DataFrame({
+        'kind': eos,
+        'temp_K': np.asarray(temp)[is_sat],
+        'p_sat_Pa': p_sat[is_sat]
+    })
+
+
+def _cubic_roots(aa, bb, d_1, d_2):
+    # minimum and maximum root of the cubic eos, see calc_compressibility
+    d_1_p_d_2 = d_1 + d_2
+    d_1_t_d_2 = d_1*d_2
+
+    c_2 = bb*(d_1_p_d_2 - 1) - 1
+    c_1 = aa + bb*(d_1_t_d_2*bb - d_1_p_d_2*(bb + 1))
+    c_0 = -bb*(d_1_t_d_2*(bb**2 + bb) + aa)
+
+    qq = (c_2**2 - 3*c_1)/9
+    rr = (2*c_2**3 - 9*c_2*c_1 + 27*c_0)/54
+    dd = rr**2 - qq**3
+    three_real_roots = (dd < 0)
+
+    # one real root: vapor-like if it lies above the inflection point
+    sqrt_dd = np.abs(dd)**0.5
+    ee = -np.sign(rr)*(abs(rr) + sqrt_dd)**(1/3)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_one_real = ee + qq/ee - c_2/3
+    vapor_like = z_one_real > -c_2/3
+
+    sqrt_qq = np.abs(qq)**0.5
+    with np.errstate(invalid='ignore', divide='ignore'):
+        phi = np.arccos(np.clip(rr/(sqrt_qq*qq), -1, 1))
+    x1 = -2*sqrt_qq*np.cos(phi/3) - c_2/3
+    x2 = -2*sqrt_qq*np.cos((phi + 2*np.pi)/3) - c_2/3
+    x3 = -2*sqrt_qq*np.cos((phi - 2*np.pi)/3) - c_2/3
+    z_l = np.minimum(np.minimum(x1, x2), x3)
+    z_v = np.maximum(np.maximum(x1, x2), x3)
+
+    return z_l, z_v, three_real_roots, vapor_like
+
+
+def _ln_phi(z, aa, bb, d_1, d_2):
+    # fugacity coefficient of the generalized cubic eos
+    return (z - 1 - np.log(z - bb)
+            - aa/(bb*(d_1 - d_2))*np.log((z + d_1*bb)/(z + d_2*bb)))
@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import json
+import numpy as np
+import socket
+import time
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_all import calc_eos_kernel
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+
+# names of the returned quantities
+RESULT_COLUMNS = ['rho_kg/m3', 'cp_J/(kgK)', 'sound_m/s', 'visc_Pas',
+                  'cond_W/(mK)']
+
+# maximum length of a request line in bytes (about 10 million points)
+REQUEST_LIMIT = 2**28
+
+
+class ServerMetrics:
+    """
+    Latency and throughput metrics of the PropertyServer
+    """
+
+    def __init__(self, window: int = 10000):
+        self.time_start = time.perf_counter()
+        self.n_requests = 0
+        self.n_points = 0
+        self.n_batches = 0
+        self.time_kernel = 0.
+        self.latencies = deque(maxlen=window)
+
+    def add_batch(self, n_requests: int, n_points: int, time_kernel: float):
+        self.n_requests += n_requests
+        self.n_points += n_points
+        self.n_batches += 1
+        self.time_kernel += time_kernel
+
+    def as_dict(self) -> dict:
+        time_up = time.perf_counter() - self.time_start
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            'uptime_s': time_up,
+            'n_requests': self.n_requests,
+            'n_points': self.n_points,
+            'n_batches': self.n_batches,
+            'mean_requests_per_batch':
+                self.n_requests/max(self.n_batches, 1),
+            'mean_points_per_batch': self.n_points/max(self.n_batches, 1),
+            'throughput_points_per_s': self.n_points/time_up,
+            'kernel_points_per_s': self.n_points/max(self.time_kernel, 1e-300),
+            'latency_mean_s': float(latencies.mean()),
+            'latency_p50_s': float(np.percentile(latencies, 50)),
+            'latency_p99_s': float(np.percentile(latencies, 99)),
+        }
+
+
+class PropertyServer:
+    """
+    Local property-query server with request micro-batching
+
+    The server keeps the fluid properties (including the NASA data), the eos
+    parameters and alpha functions of all requested fluids and eos loaded.
+    Queries for (fluid, eos, temp[], press[]) are collected for batch_window
+    seconds (or until max_batch_size points are pending) and then evaluated
+    by a single call of the vectorized kernel chain calc_eos_kernel. The
+    kernel runs in a worker thread, so that further requests are accepted and
+    coalesced into the next batch in the meantime.
+
+    Protocol (unix socket or localhost tcp): one json object per line,
+        {"fluid": "nHexane", "eos": "PR", "temp": [...], "press": [...]}
+    is answered by one json object per line with the quantities
+    RESULT_COLUMNS as lists, {"cmd": "metrics"} returns the metrics and
+    failures are reported as {"error": "..."}. Request lines longer than
+    request_limit bytes are discarded and answered with an error.
+    """
+
+    def __init__(self, n_nasa_coeff: int = 7, batch_window: float = 0.002,
+                 max_batch_size: int = 1000000,
+                 request_limit: int = REQUEST_LIMIT):
+        self.n_nasa_coeff = n_nasa_coeff
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.request_limit = request_limit
+        self.metrics = ServerMetrics()
+        self._fluids = {}
+        self._transport = {}
+        self._models = {}
+        self._pending = {}
+        self._flush_handles = {}
+        self._executor = ThreadPoolExecutor(1)
+
+    def fluid_properties(self, fluid: str):
+        if fluid not in self._fluids:
+            data_nasa = nasa.NasaCoefficients.from_name_and_coeff(
+                fluid, self.n_nasa_coeff)
+            fp = fluid_properties_from_coolprop_and_data_base(fluid, data_nasa)
+            self._fluids[fluid] = fp
+            self._transport[fluid] = ChungTransportModel(fp)
+        return self._fluids[fluid]
+
+    def model(self, fluid: str, eos: str):
+        if (fluid, eos) not in self._models:
+            fp = self.fluid_properties(fluid)
+            self._models[fluid, eos] = (fp,
+                                        eos_parameter_from_eos_name(eos, fp),
+                                        alpha_functions_from_eos_name(eos, fp),
+                                        self._transport[fluid])
+        return self._models[fluid, eos]
+
+    async def query(self, fluid: str, eos: str, temp, press) -> dict:
+        """
+        Evaluates the eos for the paired temperatures and pressures
+        """
+        time_start = time.perf_counter()
+        model = self.model(fluid, eos)
+        temp, press = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(temp, dtype=float)),
+            np.atleast_1d(np.asarray(press, dtype=float)))
+        if temp.ndim != 1:
+            raise ValueError('temp and press have to be one-dimensional.')
+
+        key = (fluid, eos)
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((temp, press, future))
+
+        n_pending = sum(len(x[0]) for x in pending)
+        if n_pending >= self.max_batch_size:
+            self._schedule_flush(key, model, 0.)
+        elif key not in self._flush_handles:
+            self._schedule_flush(key, model, self.batch_window)
+
+        result = await future
+        self.metrics.latencies.append(time.perf_counter() - time_start)
+        return result
+
+    async def serve(self, path: str = None, host: str = '127.0.0.1',
+                    port: int = 0):
+        """
+        Starts the server on the unix socket path or on host:port
+        """
+        if path is not None:
+            server = await asyncio.start_unix_server(
+                self._handle, path=path, limit=self.request_limit)
+        else:
+            server = await asyncio.start_server(
+                self._handle, host, port, limit=self.request_limit)
+        return server
+
+    def _schedule_flush(self, key, model, delay):
+        handle = self._flush_handles.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        loop = asyncio.get_running_loop()
+        if delay > 0:
+            self._flush_handles[key] = loop.call_later(
+                delay, lambda: loop.create_task(self._flush(key, model)))
+        else:
+            loop.create_task(self._flush(key, model))
+
+    async def _flush(self, key, model):
+        self._flush_handles.pop(key, None)
+        batch = self._pending.pop(key, [])
+        if not batch:
+            return
+
+        temp = np.concatenate([x[0] for x in batch])
+        press = np.concatenate([x[1] for x in batch])
+        fp, ed, alpha_funcs, transport = model
+
+        time_start = time.perf_counter()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, calc_eos_kernel, fp, ed, alpha_funcs, temp,
+                press, None, 'analytic', transport)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.metrics.add_batch(len(batch), len(temp),
+                               time.perf_counter() - time_start)
+
+        start = 0
+        for temp_request, _, future in batch:
+            end = start + len(temp_request)
+            if not future.done():
+                future.set_result({col: values[start:end]
+                                   for col, values in zip(RESULT_COLUMNS,
+                                                          results)})
+            start = end
+
+    async def _handle(self, reader, writer):
+        while True:
+            try:
+                line = await _read_line(reader)
+            except ValueError as e:
+                writer.write(json.dumps(
+                    {'error': f'{type(e).__name__}: {e}'}).encode() + b'\n')
+                await writer.drain()
+                continue
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                if request.get('cmd') == 'metrics':
+                    response = self.metrics.as_dict()
+                else:
+                    result = await self.query(request['fluid'],
+                                              request['eos'],
+                                              request['temp'],
+                                              request['press'])
+                    response = {col: values.tolist()
+                                for col, values in result.items()}
+            except Exception as e:
+                response = {'error': f'{type(e).__name__}: {e}'}
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+        writer.close()
+
+
+async def _read_line(reader) -> bytes:
+    # next line of the stream (b'' at the end), lines longer than the limit
+    # of the reader are discarded up to their end and raise a ValueError
+    try:
+        return await reader.readuntil(b'\n')
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError:
+        pass
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            break
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(max(e.consumed, 1))
+        except asyncio.IncompleteReadError:
+            break
+    raise ValueError('Request line longer than the request limit of the '
+                     'server.')
+
+
+def query(fluid: str, eos: str, temp, press, path: str = None,
+          host: str = '127.0.0.1', port: int = None) -> dict:
+    """
+    Client function: queries the PropertyServer running on the unix socket
+    path or on host:port and returns the quantities as numpy arrays
+    """
+    request = {'fluid': fluid, 'eos': eos,
+               'temp': np.atleast_1d(temp).tolist(),
+               'press': np.atleast_1d(press).tolist()}
+    response = _request(request, path, host, port)
+    return {col: np.array(values) for col, values in response.items()}
+
+
+def metrics(path: str = None, host: str = '127.0.0.1',
+            port: int = None) -> dict:
+    """
+    Client function: returns the metrics of the PropertyServer
+    """
+    return _request({'cmd': 'metrics'}, path, host, port)
+
+
+def _request(request: dict, path: str, host: str, port: int) -> dict:
+    if path is not None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(path)
+    else:
+        sock = socket.create_connection((host, port))
+    with sock, sock.makefile('rwb') as f:
+        f.write(json.dumps(request).encode() + b'\n')
+        f.flush()
+        response = json.loads(f.readline())
+    if 'error' in response:
+        raise RuntimeError(response['error'])
+    return response
+
+
+_parser = argparse.ArgumentParser(
+    'Local server for eos property queries with request micro-batching.')
+_parser.add_argument('--socket', help='Path of the unix socket.')
+_parser.add_argument('--host', default='127.0.0.1',
+                     help='Host, if no unix socket is used.')
+_parser.add_argument('--port', type=int, default=8750,
+                     help='Port, if no unix socket is used.')
+_parser.add_argument('--n-nasa-coeff', type=int, default=7,
+                     help='Number of NASA coefficients (7 or 9).')
+_parser.add_argument('--batch-window-ms', type=float, default=2.,
+                     help='Time to collect requests for one batch.')
+
+
+def main():
+    args = _parser.parse_args()
+    property_server = PropertyServer(args.n_nasa_coeff,
+                                     args.batch_window_ms*1e-3)
+
+    async def run():
+        server = await property_server.serve(args.socket, args.host,
+                                             args.port)
+        print('realtpl server listening on '
+              + (args.socket or f'{args.host}:{args.port}'))
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,130 @@
+import numpy as np
+from numpy.polynomial import chebyshev
+
+# polynomial degree of the pieces and maximum relative error of the
+# surrogates (relative to the maximum magnitude of the function on a piece)
+SURROGATE_DEGREE = 5
+SURROGATE_TOL = 1e-13
+
+# number of pieces of the first fit, doubled until the error is below tol
+_MIN_PIECES = 16
+_MAX_PIECES = 2**16
+
+# check points per piece and degree for the error bound
+_CHECK_POINTS = 8
+
+
+class ChebyshevSurrogate:
+    """
+    Piecewise Chebyshev approximation of one or more functions of the
+    temperature on temp_range
+
+    The range is split into n uniform pieces. On each piece, the functions
+    are interpolated at the degree + 1 Chebyshev points (of the first kind)
+    and the interpolants are stored as polynomials in the local coordinate
+    x in [-1, 1]. Starting with _MIN_PIECES, the number of pieces is doubled
+    until the maximum error on _CHECK_POINTS*degree + 1 equidistant points
+    per piece, relative to the maximum magnitude of the function on the
+    piece, is below tol; this error is kept as error_bound. Thus, the
+    functions should not change sign on temp_range.
+
+    Evaluating the surrogate costs the lookup of the piece (uniform pieces,
+    no search) and degree multiply-adds per function and point, the index and
+    the local coordinate are shared by all functions. Temperatures outside
+    of temp_range are evaluated with the functions themselves.
+
+    Parameters:
+    -----------
+    func: callable
+        func(temp) returns an array of the shape of temp or a tuple of such
+        arrays
+    temp_range: tuple
+        (min, max) temperature in Kelvin
+    degree: int
+    tol: float
+    """
+
+    def __init__(self, func: callable, temp_range: tuple,
+                 degree: int = SURROGATE_DEGREE, tol: float = SURROGATE_TOL):
+        self.func = func
+        self.degree = degree
+        self.temp_min, self.temp_max = (float(x) for x in temp_range)
+        if not self.temp_max > self.temp_min:
+            raise ValueError(f'Empty temperature range {temp_range} of the '
+                             f'surrogate.')
+
+        x_fit = chebyshev.chebpts1(degree + 1)
+        x_check = np.linspace(-1, 1, _CHECK_POINTS*degree + 1)
+        # interpolant in the power basis, well conditioned at the Chebyshev
+        # points for low degrees
+        fit_inverse = np.linalg.inv(np.vander(x_fit, degree + 1,
+                                              increasing=True))
+
+        n_pieces = _MIN_PIECES
+        while True:
+            step = (self.temp_max - self.temp_min)/n_pieces
+            center = self.temp_min + step*(np.arange(n_pieces) + 0.5)
+
+            # (function, piece, point)
+            values = self._values(center[:, None] + 0.5*step*x_fit)
+            coeff = values @ fit_inverse.T
+
+            values = self._values(center[:, None] + 0.5*step*x_check)
+            error = np.abs(_horner(coeff[..., None], x_check) - values)
+            scale = np.max(np.abs(values), axis=2, keepdims=True)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self.error_bound = float(np.max(np.where(
+                    error > 0, error/scale, 0.)))
+            if self.error_bound <= tol:
+                break
+            if n_pieces >= _MAX_PIECES:
+                raise ValueError(f'Surrogate error {self.error_bound:.3g} '
+                                 f'above {tol:g} with {n_pieces} pieces.')
+            n_pieces *= 2
+
+        self.n_pieces = n_pieces
+        self._scale = 2/step
+        # (function, power, piece), contiguous per power for the lookup
+        self._coeff = np.ascontiguousarray(np.moveaxis(coeff, 2, 1))
+
+    def __call__(self, temp: np.ndarray) -> np.ndarray:
+        """
+        Returns the approximated functions, an array of shape
+        (n_functions,) + temp.shape
+        """
+        shape = np.shape(temp)
+        temp = np.asarray(temp, dtype=float).ravel()
+        s = (temp - self.temp_min)*self._scale
+        index = np.clip((0.5*s).astype(np.intp), 0, self.n_pieces - 1)
+        x = s - (2*index + 1)
+
+        result = np.empty((len(self._coeff), len(temp)))
+        for coeff, out in zip(self._coeff, result):
+            out[:] = coeff[-1][index]
+            for power in coeff[-2::-1]:
+                out *= x
+                out += power[index]
+
+        outside = ~((temp >= self.temp_min) & (temp <= self.temp_max))
+        if np.any(outside):
+            result[:, outside] = self._values(temp[outside])
+        return result.reshape((len(self._coeff),) + shape)
+
+    def _values(self, temp: np.ndarray) -> np.ndarray:
+        values = self.func(temp)
+        if isinstance(values, tuple):
+            values = np.stack(values)
+        else:
+            values = np.asarray(values)[np.newaxis]
+        if values.shape[1:] != temp.shape:
+            raise ValueError('The surrogate functions have to return arrays '
+                             'of the shape of the temperature.')
+        return values
+
+
+def _horner(coeff: np.ndarray, x: np.ndarray) -> np.ndarray:
+    # polynomial with the power coefficients along axis -2
+    result = coeff[..., -1, :]
+    for k in range(coeff.shape[-2] - 2, -1, -1):
+        result = result*x + coeff[..., k, :]
+    return result
@@ -0,0 +1,40 @@
+import numpy as np
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_grid, calc_eos_grid_stacked
+
+
+class TestBlocks(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        self.temp = np.linspace(250, 650, 401)
+        self.press = np.array([1e5, 2e6, 3e6, 5e6])
+
+    def test_blocks_equal_rows(self):
+        # blocks of full, partial and single rows, one and several threads
+        for eos in ['SRK', 'RKPR']:
+            ref = calc_eos_grid(eos, self.fp, self.temp, self.press)
+            for n_threads, block_size in [(1, 64), (3, None), (4, 37),
+                                          (2, 1000)]:
+                results = calc_eos_grid(eos, self.fp, self.temp, self.press,
+                                        n_threads=n_threads,
+                                        block_size=block_size)
+                for col in ref.columns(eos):
+                    np.testing.assert_array_equal(results[eos, col],
+                                                  ref[eos, col])
+
+    def test_stacked_blocks(self):
+        eos_list = ['SRK', 'PR', 'RKPR']
+        ref = calc_eos_grid_stacked(eos_list, self.fp, self.temp, self.press)
+        results = calc_eos_grid_stacked(eos_list, self.fp, self.temp,
+                                        self.press, n_threads=2,
+                                        block_size=100)
+        for eos in eos_list:
+            for col in ref.columns(eos):
+                np.testing.assert_array_equal(results[eos, col],
+                                              ref[eos, col])
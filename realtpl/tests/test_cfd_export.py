@@ -0,0 +1,95 @@
+import numpy as np
+import os
+import tempfile
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_compressibility import calc_compressibility
+from realtpl.thermophysical_constants import R_UNIV
+from realtpl.saturation import saturation_temperature
+from realtpl.calc_all import calc_eos_grid
+from realtpl.results import GridResults
+from realtpl.cfd_export import write_cfd_tables, calc_cfd_quantities
+from realtpl.cfd_export import _saturation_states, CFD_QUANTITIES
+
+
+class TestCfdExport(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        self.temp = np.linspace(300, 600, 7)
+        self.press = np.array([1e6, 2e6, 4e6])
+
+    def test_enthalpy_entropy(self):
+        # dh = cp dT and T ds = cp dT at constant pressure
+        for eos in ['SRK', 'PR', 'RKPR']:
+            ed = eos_parameter_from_eos_name(eos, self.fp)
+            alpha_funcs = alpha_functions_from_eos_name(eos, self.fp)
+
+            def calc(temp):
+                vol = (calc_compressibility(ed, alpha_funcs.alpha, temp, 5e6)
+                       * R_UNIV*temp/5e6)
+                return calc_cfd_quantities(self.fp, ed, alpha_funcs, temp,
+                                           5e6, vol)
+
+            values, lo, hi = [calc(self.temp + d) for d in [0, -1e-3, 1e-3]]
+            np.testing.assert_allclose((hi['h'] - lo['h'])/2e-3,
+                                       values['cp'], rtol=1e-8)
+            np.testing.assert_allclose(self.temp*(hi['s'] - lo['s'])/2e-3,
+                                       values['cp'], rtol=1e-8)
+
+            # equal Gibbs energy of saturated liquid and vapor
+            temp_sat = saturation_temperature(eos, self.fp, self.press)
+            sat = _saturation_states(self.fp, ed, alpha_funcs, self.press,
+                                     temp_sat, None)
+            g_l = sat['liquid']['h'] - temp_sat*sat['liquid']['s']
+            g_v = sat['vapor']['h'] - temp_sat*sat['vapor']['s']
+            np.testing.assert_allclose(g_l[:2], g_v[:2], rtol=1e-9)
+            self.assertTrue(np.all(sat['liquid']['vol'][:2]
+                                   < sat['vapor']['vol'][:2]))
+            self.assertTrue(np.isnan(temp_sat[2]))
+
+    def test_tables(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file, path = write_cfd_tables('PR', self.fp, self.temp,
+                                          self.press, tmp,
+                                          ['rgp', 'openfoam'])
+            # no temporary files left
+            self.assertEqual(sorted(os.listdir(os.path.dirname(file))),
+                             ['PR.rgp', 'openfoam'])
+            with open(file) as f:
+                text = f.read()
+            self.assertEqual(text.count('$TABLE_'), len(CFD_QUANTITIES))
+            table = text.split('$TABLE_1\n')[1].split('$TABLE_2')[0]
+            values = np.array(table.split()[3:], dtype=float)
+            # axes, values and saturation temperature and value per level
+            self.assertEqual(len(values), 7 + 3 + 7*3 + 2*3)
+            np.testing.assert_array_equal(values[:7], self.temp)
+
+            with open(os.path.join(path, 'phase')) as f:
+                phase = [int(line.split()[1].rstrip(')'))
+                         for line in f if line.startswith('        (')]
+            self.assertEqual(phase[:7], [0, 0, 0, 1, 1, 1, 1])
+            self.assertEqual(phase[-7:], [0, 0, 0, 0, 0, 2, 2])
+            self.assertEqual(len(os.listdir(path)), len(CFD_QUANTITIES) + 3)
+
+    def test_results(self):
+        # the other outputs are filled from the same pass as the tables
+        results = GridResults(self.temp, self.press)
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_cfd_tables('PR', self.fp, self.temp, self.press,
+                                     tmp, ['rgp'], results=results,
+                                     properties=['rho', 'cp', 'visc'])
+        self.assertEqual(len(paths), 1)
+        expected = calc_eos_grid('PR', self.fp, self.temp, self.press,
+                                 use_saturation_curve=True)
+        self.assertEqual(results.columns('PR'),
+                         ['rho_kg/m3', 'cp_J/(kgK)', 'visc_Pas'])
+        for col in results.columns('PR'):
+            np.testing.assert_allclose(results['PR', col],
+                                       expected['PR', col], rtol=1e-10)
@@ -0,0 +1,68 @@
+import numpy as np
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.checkpoint import Checkpoint, checkpoint_settings
+
+
+class TestCheckpoint(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'checkpoint')
+        fp = FluidProperties('test', mass=10., omega=0.1, p_c=3e6,
+                             temp_c=500., rho_c=2., data_nasa=None)
+        self.temp = np.arange(300., 310.)
+        self.press = np.arange(1e6, 8e6, 1e6)
+        self.cfg = {'temp_array': self.temp, 'pressure_array': self.press,
+                    'include_ref_data': True, 'eos_list': ['PR'],
+                    'properties': ['rho', 'cp'], 'root_solver': 'analytic',
+                    'reference_backend': 'HEOS', 'checkpoint_block_size': 3}
+        self.settings = checkpoint_settings(self.cfg, fp)
+        self.n_calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _calc(self, press):
+        self.n_calls += len(press)
+        return np.stack(np.meshgrid(press, self.temp, indexing='ij'))
+
+    def _calc_interrupted(self, press):
+        if press[0] >= 4e6:
+            raise KeyboardInterrupt
+        return self._calc(press)
+
+    def test_resume(self):
+        checkpoint = Checkpoint(self.path, self.settings)
+        with self.assertRaises(KeyboardInterrupt):
+            checkpoint.compute('PR', self.press, self._calc_interrupted)
+        self.assertEqual(self.n_calls, 3)
+
+        # only the blocks not completed are computed
+        self.n_calls = 0
+        checkpoint = Checkpoint(self.path, self.settings, resume=True)
+        values = checkpoint.compute('PR', self.press, self._calc)
+        np.testing.assert_array_equal(values, self._calc(self.press))
+        self.assertEqual(self.n_calls, 4 + 7)
+        self.assertEqual((checkpoint.n_reused, checkpoint.n_computed), (1, 2))
+
+        # without resume, the checkpoint is started over
+        self.n_calls = 0
+        checkpoint = Checkpoint(self.path, self.settings)
+        checkpoint.compute('PR', self.press, self._calc)
+        self.assertEqual(self.n_calls, 7)
+
+    def test_validation(self):
+        with self.assertRaises(RuntimeError):
+            Checkpoint(self.path, self.settings, resume=True)
+
+        Checkpoint(self.path, self.settings).compute('PR', self.press,
+                                                     self._calc)
+        settings = dict(self.settings, root_solver='newton',
+                        pressures=self.settings['temperatures'])
+        with self.assertRaisesRegex(RuntimeError, 'pressures, root_solver'):
+            Checkpoint(self.path, settings, resume=True)
@@ -0,0 +1,46 @@
+import numpy as np
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_points
+from realtpl.eos_data import RKPR_COEFFICIENTS
+from realtpl.fitting import RkprFit
+
+
+class TestFitting(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        self.temp = np.linspace(300, 600, 31)
+        self.press = np.array([1e6, 4e6, 1e7])
+
+    def test_objective(self):
+        fit = RkprFit(self.fp, self.temp, self.press,
+                      weights={'rho_kg/m3': 1., 'sound_m/s': 0.5})
+        self.assertEqual(fit.properties, ['rho', 'sound'])
+        values = calc_eos_points('RKPR', self.fp, fit.temp, fit.press)
+        obj_ref = (np.mean((values[0]/fit.ref[0] - 1)**2)
+                   + 0.5*np.mean((values[2]/fit.ref[1] - 1)**2))
+
+        # batched candidates: default, invalid (nan) and default again
+        coeff = {key: np.full(3, value)
+                 for key, value in RKPR_COEFFICIENTS.items()}
+        coeff['d3'][1] = 0.
+        obj = fit.objective(coeff)
+        np.testing.assert_allclose(obj[[0, 2]], obj_ref, rtol=1e-10)
+        self.assertEqual(obj[1], np.inf)
+
+    def test_run(self):
+        fit = RkprFit(self.fp, self.temp, self.press, params=['c_z', 'c0'],
+                      max_batch_size=1000)
+        result = fit.run(n_population=20, n_iter=5)
+        self.assertLessEqual(result.objective, result.objective_default)
+        self.assertEqual(len(result.history), 5)
+        self.assertEqual(set(result.coeff), set(RKPR_COEFFICIENTS))
+        self.assertEqual(result.coeff['d1'], RKPR_COEFFICIENTS['d1'])
+        coeff = {key: np.array([value])
+                 for key, value in result.coeff.items()}
+        self.assertAlmostEqual(fit.objective(coeff)[0], result.objective)
@@ -0,0 +1,81 @@
+import numpy as np
+import os
+import tempfile
+import yaml
+from unittest import TestCase
+
+from realtpl import config
+from realtpl.grid import clustered_axis, geometric_axis, axis_from_file
+
+
+class TestGrid(TestCase):
+
+    def test_clustered_axis(self):
+        axis = clustered_axis(300., 700., 81, 507.82, 5.)
+        self.assertEqual(axis[0], 300.)
+        self.assertEqual(axis[-1], 700.)
+        steps = np.diff(axis)
+        self.assertTrue(np.all(steps > 0))
+        # smallest step next to the center, much smaller than equidistant
+        i = np.argmin(steps)
+        self.assertTrue(axis[i] <= 507.82 + steps[i]
+                        and axis[i + 1] >= 507.82 - steps[i])
+        self.assertLess(steps.min(), 0.5*400/80)
+
+    def test_geometric_axis(self):
+        axis = geometric_axis(1e4, 1e7, 7)
+        np.testing.assert_allclose(axis[1:]/axis[:-1], 10**0.5)
+
+    def test_axis_from_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'press.txt')
+            with open(file, 'w') as f:
+                f.write('# pressure in Pa\n1e5\n5e5\n2e6\n')
+            np.testing.assert_array_equal(axis_from_file(file),
+                                          [1e5, 5e5, 2e6])
+            np.save(os.path.join(tmp, 'temp.npy'), np.array([300., 290.]))
+            with self.assertRaises(ValueError):
+                axis_from_file(os.path.join(tmp, 'temp.npy'))
+
+    def test_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'config.yaml')
+            np.save(os.path.join(tmp, 'temp.npy'),
+                    np.array([300., 400., 450., 475.]))
+            with open(file, 'w') as f:
+                yaml.safe_dump({
+                    'fluid_name': 'nHexane',
+                    'temperature_file': os.path.join(tmp, 'temp.npy'),
+                    'pressure_start_Pa': 1e4,
+                    'pressure_end_Pa': 1e6,
+                    'pressure_spacing': 'geometric',
+                    'pressure_n_points': 3,
+                    'show_plots': False}, f)
+            cfg = config.load_config({'config_file': file})
+
+        np.testing.assert_array_equal(cfg['temp_array'],
+                                      [300., 400., 450., 475.])
+        np.testing.assert_allclose(cfg['pressure_array'], [1e4, 1e5, 1e6])
+        self.assertEqual(cfg['grid']['temp']['spacing'], 'file')
+        self.assertEqual(cfg['grid']['press']['spacing'], 'geometric')
+        self.assertEqual(cfg['grid']['press']['size'], 3)
+
+    def test_cluster_strength(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'config.yaml')
+            # grid and isochoric mode
+            for strength, axis in [(0., {'pressure_start_Pa': 1e6}),
+                                   (-2., {'pressure_start_Pa': 1e6}),
+                                   (0., {'density_start_kgm3': 100.})]:
+                with open(file, 'w') as f:
+                    yaml.safe_dump(dict({
+                        'fluid_name': 'nHexane',
+                        'temperature_start_K': 300.,
+                        'temperature_end_K': 700.,
+                        'temperature_spacing': 'clustered',
+                        'temperature_n_points': 11,
+                        'temperature_cluster_strength': strength,
+                        'show_plots': False}, **axis), f)
+                with self.assertRaisesRegex(RuntimeError,
+                                            'temperature_cluster_strength'):
+                    config.load_config({'config_file': file})
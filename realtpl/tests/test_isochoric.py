@@ -0,0 +1,100 @@
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+from unittest import TestCase
+import yaml
+
+from realtpl import config
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_points
+from realtpl.isochoric import calc_isochoric_points, calc_isochoric_grid
+from realtpl.isochoric import isochoric_dataframe
+from realtpl.point_cloud import evaluate_point_cloud_isochoric
+from realtpl.write_data_to_files import write_isochoric_data
+
+
+class TestIsochoric(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        rng = np.random.default_rng(0)
+        self.temp = rng.uniform(250, 700, 1001)
+        self.press = rng.uniform(1e5, 1e7, 1001)
+
+    def test_inverse_of_pressure_mode(self):
+        # the density of the (T, p) mode gives back p and the same properties
+        for eos in ['SRK', 'PR', 'RKPR']:
+            rho, *values_p = calc_eos_points(eos, self.fp, self.temp,
+                                             self.press)
+            press, *values_rho = calc_isochoric_points(eos, self.fp,
+                                                       self.temp, rho)
+            np.testing.assert_allclose(press, self.press, rtol=1e-8)
+            for value, value_ref in zip(values_rho, values_p):
+                np.testing.assert_allclose(value, value_ref, rtol=1e-10)
+
+        # ref data
+        values = calc_isochoric_points('ref_data', self.fp, self.temp[:20],
+                                       rho[:20], properties=['rho', 'cp'])
+        self.assertEqual(values.shape, (2, 20))
+
+    def test_unstable_states(self):
+        # inside the spinodal at 300 K, metastable vapor at 10 kg/m3
+        values = calc_isochoric_points('PR', self.fp, 300.,
+                                       np.array([10., 300., 2000.]))
+        self.assertTrue(np.all(np.isfinite(values[:, 0])))
+        self.assertTrue(np.all(np.isnan(values[:, 1:])))
+
+    def test_grid_and_point_cloud(self):
+        temp = np.linspace(300, 600, 7)
+        rho = np.array([5., 50., 400., 600.])
+        values = calc_isochoric_grid('RKPR', self.fp, temp, rho)
+        with tempfile.TemporaryDirectory() as tmp:
+            np.save(os.path.join(tmp, 'temp.npy'), np.tile(temp, len(rho)))
+            np.save(os.path.join(tmp, 'rho.npy'), np.repeat(rho, len(temp)))
+            path = evaluate_point_cloud_isochoric(
+                'RKPR', self.fp, os.path.join(tmp, 'temp.npy'),
+                os.path.join(tmp, 'rho.npy'), tmp, chunk_size=5)
+            points = [np.load(os.path.join(path, q + '.npy'))
+                      for q in ['press', 'cp', 'sound', 'visc', 'cond']]
+            np.testing.assert_array_equal(points, values.reshape(5, -1))
+
+            df = isochoric_dataframe('RKPR', temp, rho, values)
+            write_isochoric_data(df, self.fp, tmp)
+            df_read = pd.read_csv(os.path.join(tmp, 'nHexane', 'isochoric',
+                                               'RKPR.csv'), sep='\t',
+                                  float_precision='round_trip')
+        np.testing.assert_array_equal(df_read['press_Pa'], values[0].ravel())
+        self.assertEqual(list(df_read.columns),
+                         ['kind', 'rho_kg/m3', 'temp_K', 'press_Pa',
+                          'cp_J/(kgK)', 'sound_m/s', 'visc_Pas',
+                          'cond_W/(mK)'])
+
+    def test_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'config.yaml')
+            base = {'fluid_name': 'nHexane',
+                    'temperature_start_K': 300.,
+                    'temperature_end_K': 700.,
+                    'density_start_kgm3': 100.,
+                    'density_end_kgm3': 500.}
+            with open(file, 'w') as f:
+                yaml.safe_dump(base, f)
+            cfg = config.load_config({'config_file': file})
+            self.assertFalse(cfg['show_plots'])
+
+            for option in [{'n_workers': 2}, {'use_cache': True},
+                           {'save_memmap_tables': True}, {'checkpoint': True},
+                           {'stack_eos': True}, {'cfd_export': ['rgp']},
+                           {'uncertainty_rel_std': {'omega': 0.01}},
+                           {'show_plots': True}, {'save_plots': True},
+                           {'save_saturation_curve': True}]:
+                with open(file, 'w') as f:
+                    yaml.safe_dump(dict(base, **option), f)
+                with self.assertRaisesRegex(RuntimeError,
+                                            f'isochoric mode does not work '
+                                            f'with {list(option)[0]}'):
+                    config.load_config({'config_file': file})
@@ -0,0 +1,64 @@
+import numpy as np
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+import yaml
+
+from realtpl import config
+from realtpl.fluid_properties import FluidProperties
+from realtpl.calc_all import calc_eos_data
+from realtpl.nasa import NasaCoefficients
+from realtpl.memmap_table import write_memmap_table, open_memmap_table
+
+
+class TestMemmapTable(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fp = FluidProperties(
+            'nHexane', mass=86.17536, omega=0.299, p_c=3.034e6,
+            temp_c=507.82, rho_c=2.7066,
+            data_nasa=NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        self.temp = np.arange(250., 600., 5.)
+        self.press = np.linspace(1e5, 6e6, 7)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_write_and_open(self):
+        path = write_memmap_table('RKPR', self.fp, self.temp, self.press,
+                                  self.tmpdir)
+        table = open_memmap_table(path)
+        self.assertIs(table, open_memmap_table(path))
+        self.assertIsInstance(table['rho'], np.memmap)
+
+        df = calc_eos_data('RKPR', self.fp, self.temp, self.press)
+        np.testing.assert_array_equal(
+            table.to_dataframe().drop(columns='kind').to_numpy(dtype=float),
+            df.drop(columns='kind').to_numpy(dtype=float))
+
+        press, temp, cp = table.region('cp', (1e6, 4e6), (300, 400))
+        self.assertTrue(np.all((press >= 1e6) & (press <= 4e6)))
+        np.testing.assert_array_equal(temp, np.arange(300., 405., 5.))
+        self.assertEqual(cp.shape, (len(press), len(temp)))
+
+        with self.assertRaises(KeyError):
+            table['enthalpy']
+        return
+
+    def test_config(self):
+        # options the memory-mapped tables do not support are rejected
+        file = os.path.join(self.tmpdir, 'config.yaml')
+        for option in [{'n_workers': 2}, {'n_threads': 2},
+                       {'use_cache': True}]:
+            with open(file, 'w') as f:
+                yaml.safe_dump(dict({
+                    'fluid_name': 'nHexane',
+                    'temperature_start_K': 300.,
+                    'temperature_end_K': 700.,
+                    'pressure_start_Pa': 1e6,
+                    'save_memmap_tables': True,
+                    'show_plots': False}, **option), f)
+            with self.assertRaisesRegex(RuntimeError, 'save_memmap_tables'):
+                config.load_config({'config_file': file})
@@ -0,0 +1,47 @@
+import numpy as np
+from unittest import TestCase
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.calc_all import calc_eos_data
+from realtpl.nasa import NasaCoefficients
+from realtpl.parallel import calc_parallel, SharedResult
+from realtpl.results import GridResults
+
+
+class TestParallel(TestCase):
+
+    def setUp(self):
+        self.fp = FluidProperties(
+            'nHexane', mass=86.17536, omega=0.299, p_c=3.034e6,
+            temp_c=507.82, rho_c=2.7066,
+            data_nasa=NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        self.temp = np.arange(250., 600., 5.)
+        self.press = np.linspace(1e5, 6e6, 7)
+
+    def test_eos(self):
+        df = calc_parallel('PR', self.fp, self.temp, self.press, 2)
+        df_ref = calc_eos_data('PR', self.fp, self.temp, self.press)
+        np.testing.assert_array_equal(
+            df.drop(columns='kind').to_numpy(dtype=float),
+            df_ref.drop(columns='kind').to_numpy(dtype=float))
+        self.assertTrue(np.all(df['kind'] == 'PR'))
+        return
+
+    def test_zero_copy(self):
+        with SharedResult(self.temp, self.press) as result:
+            calc_parallel('SRK', self.fp, self.temp, self.press, 2, result)
+            df = result.to_dataframe('SRK')
+            self.assertTrue(np.shares_memory(df['rho_kg/m3'].to_numpy(),
+                                             result.array))
+            np.testing.assert_array_equal(df['press_Pa'],
+                                          np.repeat(self.press,
+                                                    len(self.temp)))
+            del df
+
+            # the grid results of the command line use the shared block
+            results = GridResults(self.temp, self.press)
+            results.add_arrays('SRK', result.columns[2:], result.array[2:])
+            self.assertTrue(np.shares_memory(results['SRK', 'cp_J/(kgK)'],
+                                             result.array))
+            del results
+        return
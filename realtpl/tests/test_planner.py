@@ -0,0 +1,66 @@
+import numpy as np
+import os
+import tempfile
+import yaml
+from unittest import TestCase
+
+from realtpl import config
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.planner import plan_run, _CHUNK_SIZES
+
+
+class TestPlanner(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+
+    def _load_config(self, tmp, cfg_user):
+        file = os.path.join(tmp, 'config.yaml')
+        with open(file, 'w') as f:
+            yaml.safe_dump(dict({'fluid_name': 'nHexane',
+                                 'eos_list': ['SRK', 'PR'],
+                                 'temperature_start_K': 250.05,
+                                 'temperature_end_K': 700.05,
+                                 'show_plots': False}, **cfg_user), f)
+        return config.load_config({'config_file': file})
+
+    def test_grid(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = self._load_config(tmp, {'pressure_start_Pa': 1e6,
+                                          'pressure_end_Pa': 4e6,
+                                          'pressure_step_Pa': 1e6,
+                                          'save_data_to_csv': True,
+                                          'n_workers': 'auto'})
+        plan = plan_run(cfg, self.fp)
+        self.assertEqual(plan.n_points, 4*451)
+        self.assertEqual(plan.kinds, ['ref_data', 'SRK', 'PR'])
+        for step in ['ref_data', 'SRK', 'PR', 'saturation', 'write']:
+            self.assertGreater(plan.time[step], 0)
+        self.assertIsInstance(plan.n_workers, int)
+        self.assertTrue(1 <= plan.n_workers <= 4)
+        self.assertGreater(plan.memory_peak, 0)
+
+        # too little memory for the results
+        cfg['memory_limit_GB'] = 1e-6
+        plan = plan_run(cfg, self.fp)
+        self.assertEqual(plan.n_workers, 1)
+        self.assertFalse(plan.fits_memory)
+        self.assertTrue(any('exceeds' in note for note in plan.notes))
+
+    def test_point_cloud_chunk_size(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rng = np.random.default_rng(0)
+            np.save(os.path.join(tmp, 'temp.npy'), rng.uniform(300, 600, 1000))
+            np.save(os.path.join(tmp, 'press.npy'),
+                    rng.uniform(1e5, 5e6, 1000))
+            cfg = self._load_config(tmp, {
+                'include_ref_data': False,
+                'point_cloud_temp_file': os.path.join(tmp, 'temp.npy'),
+                'point_cloud_press_file': os.path.join(tmp, 'press.npy'),
+                'point_cloud_chunk_size': 'auto'})
+            plan = plan_run(cfg, self.fp)
+        self.assertEqual(plan.n_points, 1000)
+        self.assertIn(plan.point_cloud_chunk_size, _CHUNK_SIZES)
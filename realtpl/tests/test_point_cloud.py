@@ -0,0 +1,56 @@
+import numpy as np
+import os
+import tempfile
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_points
+from realtpl.ref_data_from_coolprop import ref_data_arrays
+from realtpl.point_cloud import evaluate_point_cloud
+
+
+class TestPointCloud(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        rng = np.random.default_rng(0)
+        self.temp = rng.uniform(250, 700, 1001)
+        self.press = rng.uniform(1e5, 1e7, 1001)
+
+    def test_eos_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            np.save(os.path.join(tmp, 'temp.npy'), self.temp)
+            self.press.tofile(os.path.join(tmp, 'press.raw'))
+            path = evaluate_point_cloud('PR', self.fp,
+                                        os.path.join(tmp, 'temp.npy'),
+                                        os.path.join(tmp, 'press.raw'), tmp,
+                                        chunk_size=300)
+            values = [np.load(os.path.join(path, q + '.npy'))
+                      for q in ['rho', 'cp', 'sound', 'visc', 'cond']]
+            self.assertTrue(os.path.exists(os.path.join(path,
+                                                        'header.yaml')))
+
+        for value, value_ref in zip(values, calc_eos_points(
+                'PR', self.fp, self.temp, self.press)):
+            np.testing.assert_array_equal(value, value_ref)
+
+    def test_ref_data(self):
+        temp = np.append(self.temp[:20], 10.)  # below the CoolProp range
+        press = np.append(self.press[:20], 1e5)
+        with tempfile.TemporaryDirectory() as tmp:
+            temp.astype(np.float32).tofile(os.path.join(tmp, 'temp.f32'))
+            press.astype(np.float32).tofile(os.path.join(tmp, 'press.f32'))
+            path = evaluate_point_cloud('ref_data', self.fp,
+                                        os.path.join(tmp, 'temp.f32'),
+                                        os.path.join(tmp, 'press.f32'), tmp,
+                                        dtype='float32', chunk_size=8)
+            rho = np.load(os.path.join(path, 'rho.npy'))
+
+        self.assertTrue(np.isnan(rho[-1]))
+        temp = temp.astype(np.float32).astype(float)
+        press = press.astype(np.float32).astype(float)
+        self.assertEqual(rho[3], ref_data_arrays('nHexane', temp[3:4],
+                                                 press[3:4])[0, 0, 0])
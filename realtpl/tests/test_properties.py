@@ -0,0 +1,50 @@
+import numpy as np
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_data, calc_eos_points
+from realtpl.ref_data_from_coolprop import ref_data_arrays
+from realtpl.properties import required_nodes, resolve_properties
+
+
+class TestProperties(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        self.temp = np.linspace(250, 700, 91)
+        self.press = np.array([1e6, 4e6])
+
+    def test_dependency_graph(self):
+        self.assertEqual(required_nodes(['rho']), {'rho', 'vol', 'z'})
+        self.assertEqual(required_nodes(['visc']),
+                         {'visc', 'rho', 'vol', 'z'})
+        self.assertIn('caloric', required_nodes(['cond']))
+        self.assertEqual(resolve_properties(['cond', 'rho']), ['rho', 'cond'])
+        with self.assertRaises(ValueError):
+            resolve_properties(['enthalpy'])
+
+    def test_subsets(self):
+        values = calc_eos_points('PR', self.fp, self.temp, 4e6)
+        for properties, idx in [(['rho'], [0]), (['visc'], [3]),
+                                (['cond'], [4]), (['cp', 'visc'], [1, 3])]:
+            values_sub = calc_eos_points('PR', self.fp, self.temp, 4e6,
+                                         properties)
+            self.assertEqual(len(values_sub), len(idx))
+            for value, i in zip(values_sub, idx):
+                np.testing.assert_array_equal(value, values[i])
+
+    def test_columns(self):
+        df = calc_eos_data('SRK', self.fp, self.temp, self.press,
+                           properties=['rho', 'sound'])
+        self.assertEqual(list(df.columns),
+                         ['kind', 'press_Pa', 'temp_K', 'rho_kg/m3',
+                          'sound_m/s'])
+
+        ref = ref_data_arrays('nHexane', self.temp, self.press,
+                              properties=['visc'])
+        self.assertEqual(ref.shape, (1, 2, 91))
+        np.testing.assert_array_equal(
+            ref[0], ref_data_arrays('nHexane', self.temp, self.press)[3])
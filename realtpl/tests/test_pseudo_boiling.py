@@ -0,0 +1,80 @@
+import numpy as np
+import os
+import tempfile
+import yaml
+from unittest import TestCase
+
+from realtpl import config
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_points
+from realtpl.pseudo_boiling import pseudo_boiling_temperature
+from realtpl.pseudo_boiling import calc_pseudo_boiling_curve
+
+
+class TestPseudoBoiling(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+
+    def test_cp_maximum(self):
+        press = np.array([[0.5, 1.01], [1.5, 3.]])*self.fp.p_c
+        for eos in ['SRK', 'PR', 'RKPR']:
+            temp_pb, cp_max = pseudo_boiling_temperature(eos, self.fp, press)
+            self.assertEqual(temp_pb.shape, (2, 2))
+            self.assertTrue(np.isnan(temp_pb[0, 0]))
+
+            for temp, cp, p in zip(temp_pb.ravel()[1:], cp_max.ravel()[1:],
+                                   press.ravel()[1:]):
+                # maximum of a dense scan, within its spacing
+                temp_scan = np.linspace(temp - 1, temp + 1, 20001)
+                cp_scan = calc_eos_points(eos, self.fp, temp_scan, p,
+                                          properties=['cp'])[0]
+                self.assertLessEqual(abs(temp_scan[np.argmax(cp_scan)]
+                                         - temp), 1e-4)
+                np.testing.assert_allclose(cp, cp_scan.max(), rtol=1e-10)
+
+        # increases with the pressure
+        df = calc_pseudo_boiling_curve('PR', self.fp,
+                                       np.linspace(0.5, 3, 11)*self.fp.p_c)
+        self.assertEqual(len(df), 8)
+        self.assertTrue(np.all(np.diff(df['temp_K']) > 0))
+
+    def test_clustered_axis(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file = os.path.join(tmp, 'config.yaml')
+            with open(file, 'w') as f:
+                yaml.safe_dump({
+                    'fluid_name': 'nHexane',
+                    'eos_list': ['RKPR'],
+                    'temperature_start_K': 400.,
+                    'temperature_end_K': 700.,
+                    'temperature_spacing': 'clustered',
+                    'temperature_n_points': 51,
+                    'temperature_cluster_K': 'pseudo_boiling',
+                    'pressure_start_Pa': 1e6,
+                    'pressure_end_Pa': 9e6,
+                    'pressure_step_Pa': 1e6,
+                    'show_plots': False}, f)
+            cfg = config.load_config({'config_file': file})
+
+            # pressure range below the critical pressure
+            with open(file) as f:
+                cfg_yaml = yaml.safe_load(f)
+            cfg_yaml['pressure_end_Pa'] = 3e6
+            with open(file, 'w') as f:
+                yaml.safe_dump(cfg_yaml, f)
+            with self.assertRaisesRegex(RuntimeError, 'critical pressure'):
+                config.load_config({'config_file': file})
+
+        grid = cfg['grid']['temp']
+        press = 0.5*(self.fp.p_c + 9e6)
+        self.assertEqual(grid['center_pressure'], press)
+        self.assertEqual(grid['center'], pseudo_boiling_temperature(
+            'RKPR', self.fp, press)[0])
+        steps = np.diff(cfg['temp_array'])
+        i = np.argmin(steps)
+        self.assertTrue(cfg['temp_array'][i] - steps[i] <= grid['center']
+                        <= cfg['temp_array'][i + 1] + steps[i])
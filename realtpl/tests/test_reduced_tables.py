@@ -0,0 +1,74 @@
+import numpy as np
+import os
+import tempfile
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl import reduced_tables
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_compressibility import calc_compressibility
+from realtpl.saturation import saturation_pressure
+from realtpl.calc_all import calc_eos_grid
+
+
+class TestReducedTables(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.table_dir = reduced_tables.REDUCED_TABLE_DIR
+        reduced_tables.set_reduced_table_directory(self.tmp.name)
+        reduced_tables._TABLES.clear()
+
+    def tearDown(self):
+        reduced_tables.set_reduced_table_directory(self.table_dir)
+        reduced_tables._TABLES.clear()
+        self.tmp.cleanup()
+
+    def test_compressibility(self):
+        temp = np.linspace(0.45, 2.5, 1001)*self.fp.temp_c
+        for eos in ['SRK', 'PR', 'RKPR']:
+            ed = eos_parameter_from_eos_name(eos, self.fp)
+            alpha = alpha_functions_from_eos_name(eos, self.fp).alpha
+            p_sat = saturation_pressure(eos, self.fp, temp)
+            for press in np.geomspace(1e-3, 10, 15)*self.fp.p_c:
+                for p in [p_sat, None]:
+                    np.testing.assert_allclose(
+                        reduced_tables.calc_compressibility_reduced(
+                            ed, alpha, temp, press, p),
+                        calc_compressibility(ed, alpha, temp, press, p),
+                        rtol=1e-6)
+            # phase selection just below and above the vapor pressure
+            for factor in [1 - 1e-5, 1 + 1e-5]:
+                np.testing.assert_allclose(
+                    reduced_tables.calc_compressibility_reduced(
+                        ed, alpha, temp, p_sat*factor),
+                    calc_compressibility(ed, alpha, temp, p_sat*factor),
+                    rtol=1e-6)
+        # one table per d_1 (RKPR of nHexane), stored and reused
+        self.assertEqual(len(os.listdir(self.tmp.name)), 3)
+        reduced_tables._TABLES.clear()
+        table = reduced_tables.reduced_table(1.)
+        self.assertTrue(table.matches())
+        # an incomplete file is rebuilt
+        file = os.path.join(self.tmp.name, 'd1_1.npz')
+        with open(file, 'r+b') as f:
+            f.truncate(1000)
+        reduced_tables._TABLES.clear()
+        table = reduced_tables.reduced_table(1.)
+        self.assertTrue(table.matches())
+        self.assertEqual(len(os.listdir(self.tmp.name)), 3)
+
+    def test_root_solver(self):
+        temp = np.linspace(250, 650, 201)
+        press = np.array([1e5, 2e6, 3e6, 5e6])
+        ref = calc_eos_grid('PR', self.fp, temp, press)
+        results = calc_eos_grid('PR', self.fp, temp, press,
+                                root_solver='reduced_table')
+        for col in ref.columns('PR'):
+            np.testing.assert_allclose(results['PR', col], ref['PR', col],
+                                       rtol=1e-6)
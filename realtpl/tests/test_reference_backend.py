@@ -0,0 +1,33 @@
+import numpy as np
+from unittest import TestCase
+
+from realtpl.ref_data_from_coolprop import ref_data_arrays, REF_COLUMNS
+from realtpl.ref_data_from_coolprop import audit_reference_backend
+
+
+class TestReferenceBackend(TestCase):
+
+    def setUp(self):
+        # supercritical and liquid states away from the saturation curve
+        self.temp = np.arange(300., 600., 10.)
+        self.press = np.array([5e6, 1e7])
+
+    def test_tabular_backend(self):
+        values_heos = ref_data_arrays('nHexane', self.temp, self.press)
+        values = ref_data_arrays('nHexane', self.temp, self.press,
+                                 backend='TTSE&HEOS')
+        self.assertEqual(values.shape, values_heos.shape)
+        np.testing.assert_allclose(values, values_heos, rtol=1e-2)
+
+    def test_audit(self):
+        audit = audit_reference_backend('nHexane', self.temp, self.press,
+                                        'TTSE&HEOS', n_samples=20)
+        self.assertEqual(audit['n_points'], 20)
+        for col in REF_COLUMNS:
+            self.assertLess(audit[col]['max_rel_dev'], 1e-2)
+            self.assertIn(audit[col]['temp_K'], self.temp)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            ref_data_arrays('nHexane', self.temp, self.press,
+                            backend='REFPROP')
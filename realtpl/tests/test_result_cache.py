@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import shutil
+import tempfile
+from unittest import TestCase
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.result_cache import ResultCache, CACHE_COLUMNS
+
+
+class TestResultCache(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fp = FluidProperties('test', mass=10., omega=0.1, p_c=3e6,
+                                  temp_c=500., rho_c=2., data_nasa=None)
+        self.n_calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _calc(self, temp, pressure_array):
+        self.n_calls += len(temp)*len(pressure_array)
+        press, temp = np.meshgrid(pressure_array, temp, indexing='ij')
+        df = pd.DataFrame({'kind': 'test',
+                           'press_Pa': press.ravel(),
+                           'temp_K': temp.ravel()})
+        for i, col in enumerate(CACHE_COLUMNS):
+            df[col] = press.ravel()*1e-6 + temp.ravel()*i
+        return df
+
+    def test_incremental(self):
+        cache = ResultCache(self.tmpdir, block_size=4)
+        temp = np.arange(300., 310.)
+        press = np.array([1e6, 2e6])
+
+        df = cache.compute('test', self.fp, temp, press, self._calc)
+        self.assertEqual(self.n_calls, 2*10)
+        pd.testing.assert_frame_equal(df, self._calc(temp, press))
+
+        # extended temperature range and additional pressure
+        self.n_calls = 0
+        temp = np.arange(300., 314.)
+        press = np.array([1e6, 2e6, 3e6])
+        df = cache.compute('test', self.fp, temp, press, self._calc)
+        # new: last (partial) block and following blocks, third pressure
+        self.assertEqual(self.n_calls, 2*6 + 14)
+        self.assertEqual(cache.n_hits, 2*2)
+        pd.testing.assert_frame_equal(df, self._calc(temp, press))
+
+        # different kind is not reused
+        self.n_calls = 0
+        cache.compute('other', self.fp, temp, press, self._calc)
+        self.assertEqual(self.n_calls, 3*14)
+        return
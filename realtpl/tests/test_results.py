@@ -0,0 +1,55 @@
+import numpy as np
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_data, calc_eos_grid
+from realtpl.calc_all import calc_eos_grid_stacked
+from realtpl.results import GridResults
+
+
+class TestGridResults(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        self.temp = np.linspace(250, 700, 46)
+        self.press = np.array([1e6, 2e6, 4e6])
+
+    def test_grid_and_dataframe(self):
+        results = calc_eos_grid('PR', self.fp, self.temp, self.press)
+        self.assertEqual(results.kinds, ['PR'])
+        rho = results['PR', 'rho_kg/m3']
+        self.assertEqual(rho.shape, (3, 46))
+        self.assertTrue(rho.flags['C_CONTIGUOUS'])
+
+        df = calc_eos_data('PR', self.fp, self.temp, self.press)
+        np.testing.assert_array_equal(df['rho_kg/m3'], rho.ravel())
+        np.testing.assert_array_equal(df.index, np.arange(len(df)))
+        self.assertEqual(df['cp_J/(kgK)'].dtype, float)
+
+        # round trip
+        results_df = GridResults(self.temp, self.press)
+        results_df.add_dataframe(df)
+        np.testing.assert_array_equal(results_df['PR', 'visc_Pas'],
+                                      results['PR', 'visc_Pas'])
+
+    def test_region_and_deviation(self):
+        results = calc_eos_grid_stacked(['SRK', 'PR'], self.fp, self.temp,
+                                        self.press)
+        press, temp, cp = results.region('PR', 'cp_J/(kgK)',
+                                         press_range=(2e6, 4e6),
+                                         temp_range=(300, 400))
+        np.testing.assert_array_equal(press, [2e6, 4e6])
+        np.testing.assert_array_equal(temp, self.temp[5:16])
+        np.testing.assert_array_equal(
+            cp, results['PR', 'cp_J/(kgK)'][1:, 5:16])
+
+        dev = results.deviation('SRK', 'rho_kg/m3', reference='PR')
+        np.testing.assert_allclose(
+            dev, results['SRK', 'rho_kg/m3']/results['PR', 'rho_kg/m3'] - 1,
+            rtol=1e-12, atol=1e-15)
+
+        with self.assertRaises(ValueError):
+            results.add('RKPR', {'rho_kg/m3': np.zeros(3)})
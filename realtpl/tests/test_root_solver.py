@@ -0,0 +1,67 @@
+import numpy as np
+from unittest import TestCase
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_compressibility import calc_compressibility
+from realtpl.calc_compressibility import calc_compressibility_continuation
+from realtpl.saturation import calc_saturation_pressure
+
+
+class TestRootSolver(TestCase):
+
+    def setUp(self):
+        # nHexane
+        self.fp = FluidProperties('nHexane', mass=86.17536, omega=0.299,
+                                  p_c=3.034e6, temp_c=507.82, rho_c=2.7066,
+                                  data_nasa=None)
+        self.temp = np.linspace(200, 900, 7001)
+
+    def test_continuation_equals_analytic(self):
+        for eos in ['SRK', 'PR', 'RKPR']:
+            ed = eos_parameter_from_eos_name(eos, self.fp)
+            alpha = alpha_functions_from_eos_name(eos, self.fp).alpha
+            p_sat = calc_saturation_pressure(self.fp, ed, alpha, self.temp)
+            # sub-, near- and supercritical pressure levels
+            for press in [1e4, 1e6, 3e6, 3.1e6, 1e7]:
+                z_ref = calc_compressibility(ed, alpha, self.temp, press,
+                                             p_sat)
+                z = calc_compressibility_continuation(ed, alpha, self.temp,
+                                                      press, p_sat)
+                # the analytic liquid roots at low pressure have absolute
+                # rounding errors of about 1e-15 (small z)
+                np.testing.assert_allclose(z, z_ref, rtol=1e-12, atol=1e-14)
+        return
+
+    def test_fallback(self):
+        ed = eos_parameter_from_eos_name('PR', self.fp)
+        alpha = alpha_functions_from_eos_name('PR', self.fp).alpha
+        # unsorted temperatures and pressure arrays use the analytic solution
+        temp = self.temp[::-1]
+        np.testing.assert_array_equal(
+            calc_compressibility_continuation(ed, alpha, temp, 1e6),
+            calc_compressibility(ed, alpha, temp, 1e6))
+        press = np.full_like(self.temp, 1e6)
+        np.testing.assert_array_equal(
+            calc_compressibility_continuation(ed, alpha, self.temp, press),
+            calc_compressibility(ed, alpha, self.temp, press))
+        return
+
+    def test_branch_compaction(self):
+        # mixed one/three root points, with and without vapor pressure: each
+        # point is independent of the other points of its array
+        ed = eos_parameter_from_eos_name('SRK', self.fp)
+        alpha = alpha_functions_from_eos_name('SRK', self.fp).alpha
+        temp = self.temp[::50]
+        press = np.geomspace(1e4, 1e7, len(temp))[::-1]
+        p_sat = calc_saturation_pressure(self.fp, ed, alpha, temp)
+        for p_sat_ in [None, p_sat]:
+            z = calc_compressibility(ed, alpha, temp, press, p_sat_)
+            z_points = [calc_compressibility(
+                ed, alpha, temp[i:i + 1], press[i:i + 1],
+                None if p_sat_ is None else p_sat_[i:i + 1])[0]
+                for i in range(len(temp))]
+            np.testing.assert_array_equal(z, z_points)
+            self.assertTrue(np.all(np.isfinite(z)))
+        return
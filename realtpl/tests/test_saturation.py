@@ -0,0 +1,56 @@
+import numpy as np
+from unittest import TestCase
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_compressibility import calc_compressibility
+from realtpl.saturation import calc_saturation_pressure
+from realtpl.saturation import _cubic_roots, _ln_phi
+from realtpl.thermophysical_constants import R_UNIV
+
+
+class TestSaturation(TestCase):
+
+    def setUp(self):
+        # nHexane
+        self.fp = FluidProperties('nHexane', mass=86.17536, omega=0.299,
+                                  p_c=3.034e6, temp_c=507.82, rho_c=2.7066,
+                                  data_nasa=None)
+        self.temp = np.linspace(200, 550, 351)
+
+    def test_equal_fugacity(self):
+        for eos in ['SRK', 'PR', 'RKPR']:
+            ed = eos_parameter_from_eos_name(eos, self.fp)
+            alpha = alpha_functions_from_eos_name(eos, self.fp).alpha
+            p_sat = calc_saturation_pressure(self.fp, ed, alpha, self.temp)
+
+            sub = self.temp < self.fp.temp_c
+            self.assertTrue(np.all(np.isfinite(p_sat[sub])))
+            self.assertTrue(np.all(np.isnan(p_sat[~sub])))
+            self.assertTrue(np.all(np.diff(p_sat[sub]) > 0))
+
+            temp = self.temp[sub]
+            press = p_sat[sub]
+            aa = ed.a*alpha(temp)*press/(R_UNIV*temp)**2
+            bb = ed.b*press/(R_UNIV*temp)
+            z_l, z_v, three_real_roots, _ = _cubic_roots(aa, bb, ed.d_1,
+                                                         ed.d_2)
+            # away from the critical point both phases exist
+            far = temp < 0.98*self.fp.temp_c
+            self.assertTrue(np.all(three_real_roots[far]))
+            np.testing.assert_allclose(
+                _ln_phi(z_l, aa, bb, ed.d_1, ed.d_2)[far],
+                _ln_phi(z_v, aa, bb, ed.d_1, ed.d_2)[far], atol=1e-10)
+        return
+
+    def test_root_selection(self):
+        for eos in ['SRK', 'PR', 'RKPR']:
+            ed = eos_parameter_from_eos_name(eos, self.fp)
+            alpha = alpha_functions_from_eos_name(eos, self.fp).alpha
+            p_sat = calc_saturation_pressure(self.fp, ed, alpha, self.temp)
+            for press in [1e4, 1e5, 1e6, 2e6, 4e6]:
+                np.testing.assert_array_equal(
+                    calc_compressibility(ed, alpha, self.temp, press, p_sat),
+                    calc_compressibility(ed, alpha, self.temp, press))
+        return
@@ -0,0 +1,98 @@
+import asyncio
+import numpy as np
+from unittest import TestCase
+
+from realtpl.calc_all import calc_eos_points
+from realtpl.server import PropertyServer, RESULT_COLUMNS
+from realtpl.server import query, metrics
+
+
+class TestServer(TestCase):
+
+    def setUp(self):
+        self.temp = np.linspace(250, 700, 50)
+        self.press = np.linspace(1e5, 8e6, 50)
+
+    def _expected(self, fp, eos, temp, press):
+        return dict(zip(RESULT_COLUMNS, calc_eos_points(eos, fp, temp,
+                                                        press)))
+
+    def test_micro_batching(self):
+        property_server = PropertyServer(batch_window=0.05)
+
+        async def run():
+            return await asyncio.gather(*[
+                property_server.query('nHexane', 'PR', self.temp[i::10],
+                                      self.press[i::10])
+                for i in range(10)
+            ])
+
+        results = asyncio.run(run())
+        fp = property_server.fluid_properties('nHexane')
+        for i, result in enumerate(results):
+            expected = self._expected(fp, 'PR', self.temp[i::10],
+                                      self.press[i::10])
+            for col in RESULT_COLUMNS:
+                np.testing.assert_allclose(result[col], expected[col],
+                                           rtol=1e-12)
+
+        # all concurrent requests coalesced into one kernel call
+        self.assertEqual(property_server.metrics.n_batches, 1)
+        self.assertEqual(property_server.metrics.n_requests, 10)
+        self.assertEqual(property_server.metrics.n_points, 50)
+        return
+
+    def test_tcp(self):
+        property_server = PropertyServer()
+
+        async def run():
+            server = await property_server.serve(port=0)
+            port = server.sockets[0].getsockname()[1]
+            loop = asyncio.get_running_loop()
+            async with server:
+                result = await loop.run_in_executor(
+                    None, lambda: query('nHexane', 'SRK', self.temp, 6e6,
+                                        port=port))
+                with self.assertRaises(RuntimeError):
+                    await loop.run_in_executor(
+                        None, lambda: query('nHexane', 'XYZ', self.temp, 6e6,
+                                            port=port))
+                server_metrics = await loop.run_in_executor(
+                    None, lambda: metrics(port=port))
+            return result, server_metrics
+
+        result, server_metrics = asyncio.run(run())
+        expected = self._expected(property_server.fluid_properties('nHexane'),
+                                  'SRK', self.temp, 6e6)
+        for col in RESULT_COLUMNS:
+            np.testing.assert_allclose(result[col], expected[col], rtol=1e-12)
+        self.assertEqual(server_metrics['n_requests'], 1)
+        return
+
+    def test_large_request(self):
+        # requests beyond the default stream limit of asyncio (64 KiB) and
+        # beyond the request limit of the server
+        property_server = PropertyServer(request_limit=2**20)
+        temp = np.linspace(250, 700, 5000)
+
+        async def run():
+            server = await property_server.serve(port=0)
+            port = server.sockets[0].getsockname()[1]
+            loop = asyncio.get_running_loop()
+            async with server:
+                result = await loop.run_in_executor(
+                    None, lambda: query('nHexane', 'PR', temp, 6e6,
+                                        port=port))
+                with self.assertRaisesRegex(RuntimeError, 'request limit'):
+                    await loop.run_in_executor(
+                        None, lambda: query('nHexane', 'PR',
+                                            np.tile(temp, 20), 6e6,
+                                            port=port))
+            return result
+
+        result = asyncio.run(run())
+        expected = self._expected(property_server.fluid_properties('nHexane'),
+                                  'PR', temp, 6e6)
+        for col in RESULT_COLUMNS:
+            np.testing.assert_allclose(result[col], expected[col], rtol=1e-12)
+        return
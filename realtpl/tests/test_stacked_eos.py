@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_data, calc_eos_data_stacked
+
+
+class TestStackedEos(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        self.temp = np.linspace(250, 650, 201)
+
+    def test_stacked_equals_separate(self):
+        eos_list = ['SRK', 'PR', 'RKPR']
+        for press in [np.array([1e6]), np.array([1e5, 2e6, 3e6, 5e6])]:
+            df = calc_eos_data_stacked(eos_list, self.fp, self.temp, press)
+            df_ref = pd.concat([calc_eos_data(eos, self.fp, self.temp, press)
+                                for eos in eos_list])
+            self.assertEqual(list(df.columns), list(df_ref.columns))
+            self.assertEqual(list(df['kind']), list(df_ref['kind']))
+            np.testing.assert_array_equal(
+                df.drop(columns='kind').to_numpy(dtype=float),
+                df_ref.drop(columns='kind').to_numpy(dtype=float))
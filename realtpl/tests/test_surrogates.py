@@ -0,0 +1,67 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_points
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.calc_visc_cond_chung import set_surrogate_range
+from realtpl.surrogates import ChebyshevSurrogate, SURROGATE_TOL
+
+
+class TestSurrogates(TestCase):
+
+    def setUp(self):
+        self.fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        rng = np.random.default_rng(0)
+        self.temp = rng.uniform(250, 700, 10001)
+        self.press = rng.uniform(1e5, 1e7, 10001)
+
+    def tearDown(self):
+        set_surrogate_range(None)
+
+    def test_error_bound(self):
+        def func(temp):
+            return (temp/300)**0.3, np.exp(-temp/100)*(2 + np.sin(temp/10))
+
+        surrogate = ChebyshevSurrogate(func, (250, 700))
+        self.assertLessEqual(surrogate.error_bound, SURROGATE_TOL)
+        values = surrogate(self.temp.reshape(-1, 1))
+        self.assertEqual(values.shape, (2, 10001, 1))
+        for value, value_ref in zip(values, func(self.temp.reshape(-1, 1))):
+            np.testing.assert_allclose(value, value_ref, rtol=0,
+                                       atol=1e-13*np.max(np.abs(value_ref)))
+
+        # exact outside of the range
+        temp = np.array([200., 800.])
+        np.testing.assert_array_equal(surrogate(temp), np.stack(func(temp)))
+
+        with self.assertRaises(ValueError):
+            ChebyshevSurrogate(func, (300, 300))
+
+    def test_transport_model(self):
+        ref = calc_eos_points('PR', self.fp, self.temp, self.press)
+        set_surrogate_range((250, 700))
+        self.assertIsNotNone(ChungTransportModel(self.fp)._surrogate)
+        values = calc_eos_points('PR', self.fp, self.temp, self.press)
+        for value, value_ref in zip(values, ref):
+            np.testing.assert_allclose(value, value_ref, rtol=1e-13)
+
+    def test_shared_surrogate(self):
+        # fitted once for concurrent models
+        set_surrogate_range((260, 700))
+        with ThreadPoolExecutor(4) as executor:
+            models = list(executor.map(lambda _: ChungTransportModel(self.fp),
+                                       range(4)))
+        self.assertIsNotNone(models[0]._surrogate)
+        for model in models[1:]:
+            self.assertIs(model._surrogate, models[0]._surrogate)
+
+        # tolerance not reached: exact evaluation
+        set_surrogate_range((10, 6000))
+        with self.assertWarns(UserWarning):
+            model = ChungTransportModel(self.fp)
+        self.assertIsNone(model._surrogate)
@@ -0,0 +1,47 @@
+import numpy as np
+from dataclasses import replace
+from unittest import TestCase
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.calc_visc_cond_chung import calc_visc_cond_chung
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+
+
+class TestChungTransportModel(TestCase):
+
+    def setUp(self):
+        # Methanol (polar, associating: extended calculation)
+        self.fp = FluidProperties('Methanol', mass=32.04216, omega=0.5625,
+                                  p_c=8.2158e6, temp_c=512.5, rho_c=8.6,
+                                  data_nasa=None, association_parameter=0.215,
+                                  dipole_moment=1.7)
+        self.temp = np.linspace(300, 700, 401)
+        self.rho = np.linspace(800, 50, 401)
+        self.cv = np.full_like(self.temp, 6e4)
+
+    def test_model_equals_function(self):
+        model = ChungTransportModel(self.fp)
+        for rho in [self.rho, 0.5*self.rho]:
+            visc, cond = model.evaluate(self.temp, rho, self.cv)
+            visc_ref, cond_ref = calc_visc_cond_chung(self.fp, self.temp, rho,
+                                                      self.cv)
+            np.testing.assert_array_equal(visc, visc_ref)
+            np.testing.assert_array_equal(cond, cond_ref)
+
+    def test_temperature_terms(self):
+        model = ChungTransportModel(self.fp)
+        terms = model.temperature_terms(self.temp)
+        self.assertIs(model.temperature_terms(self.temp.copy()), terms)
+        self.assertIsNot(model.temperature_terms(self.temp + 1), terms)
+
+    def test_array_omega(self):
+        omega = np.array([0.5, 0.5625, 0.6])
+        fp = replace(self.fp, omega=omega[:, np.newaxis])
+        visc, cond = ChungTransportModel(fp).evaluate(self.temp, self.rho,
+                                                      self.cv)
+        self.assertEqual(visc.shape, (3, len(self.temp)))
+        for i, omega_i in enumerate(omega):
+            visc_i, cond_i = calc_visc_cond_chung(
+                replace(self.fp, omega=omega_i), self.temp, self.rho, self.cv)
+            np.testing.assert_allclose(visc[i], visc_i, rtol=1e-14)
+            np.testing.assert_allclose(cond[i], cond_i, rtol=1e-14)
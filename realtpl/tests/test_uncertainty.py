@@ -0,0 +1,71 @@
+import numpy as np
+from unittest import TestCase
+
+from realtpl import nasa
+from realtpl.fluid_properties \
+    import fluid_properties_from_coolprop_and_data_base
+from realtpl.calc_all import calc_eos_data
+from realtpl.uncertainty import StreamingStatistics, propagate_uncertainty
+
+
+class TestStreamingStatistics(TestCase):
+
+    def test_batches(self):
+        rng = np.random.default_rng(0)
+        samples = rng.normal(3., 2., size=(20000, 2, 3))
+        stats = StreamingStatistics()
+        for batch in np.array_split(samples, 17):
+            stats.update(batch)
+
+        self.assertEqual(stats.n, len(samples))
+        np.testing.assert_allclose(stats.mean, samples.mean(axis=0),
+                                   rtol=1e-12)
+        np.testing.assert_allclose(stats.variance,
+                                   samples.var(axis=0, ddof=1), rtol=1e-12)
+        for q in [0.025, 0.5, 0.975]:
+            np.testing.assert_allclose(stats.quantile(q),
+                                       np.quantile(samples, q, axis=0),
+                                       atol=0.05)
+
+    def test_nan(self):
+        # NaN samples give NaN quantiles, the other values are unaffected
+        samples = np.arange(8.).reshape(4, 2)
+        samples[2, 1] = np.nan
+        stats = StreamingStatistics()
+        stats.update(samples)
+        value = stats.quantile(0.5)
+        self.assertTrue(np.isnan(value[1]))
+        self.assertTrue(2. <= value[0] <= 4.)
+
+
+class TestUncertainty(TestCase):
+
+    def setUp(self):
+        self.temp = np.linspace(300, 600, 31)
+        self.press = np.array([1e6, 4e6])
+
+    def test_no_uncertainty(self):
+        fp = fluid_properties_from_coolprop_and_data_base(
+            'nHexane', nasa.NasaCoefficients.from_name_and_coeff('nHexane', 7))
+        df = propagate_uncertainty('PR', fp, self.temp, self.press,
+                                   {'p_c': 0.}, n_samples=10, batch_size=4)
+        df_ref = calc_eos_data('PR', fp, self.temp, self.press,
+                               use_saturation_curve=False)
+        for col in ['rho_kg/m3', 'cp_J/(kgK)', 'cond_W/(mK)']:
+            ref = df_ref[col].to_numpy(dtype=float)
+            np.testing.assert_allclose(df[col + '_mean'], ref, rtol=1e-12)
+            np.testing.assert_allclose(df[col + '_q0.5'], ref, rtol=1e-10)
+            self.assertTrue(np.all(df[col + '_std'] <= 1e-9*ref))
+
+    def test_polar_fluid(self):
+        fp = fluid_properties_from_coolprop_and_data_base(
+            'Methanol',
+            nasa.NasaCoefficients.from_name_and_coeff('Methanol', 7))
+        df = propagate_uncertainty(
+            'RKPR', fp, self.temp, self.press,
+            {'temp_c': 0.01, 'omega': 0.02, 'dipole_moment': 0.05},
+            n_samples=200, batch_size=64)
+        for col in ['rho_kg/m3', 'visc_Pas']:
+            self.assertTrue(np.all(df[col + '_std'] > 0))
+            self.assertTrue(np.all(df[col + '_q0.025'] <= df[col + '_q0.5']))
+            self.assertTrue(np.all(df[col + '_q0.5'] <= df[col + '_q0.975']))
@@ -0,0 +1,67 @@
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+
+from realtpl import write_data_to_files
+
+
+class TestWriteData(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fp = SimpleNamespace(name='test')
+        rng = np.random.default_rng(1)
+        temp = np.linspace(300, 600, 7)
+        frames = []
+        for kind in ['PR', 'SRK', 'ref_data']:
+            frames.append(pd.DataFrame({
+                'kind': kind,
+                'press_Pa': 6e6,
+                'temp_K': temp,
+                'rho_kg/m3': rng.random(len(temp))*1e3,
+                'cp_J/(kgK)': rng.random(len(temp))*1e4,
+            }))
+        # object columns as produced by concatenation onto an empty frame
+        self.df = pd.concat(frames, ignore_index=True).astype(object)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _round_trip(self, fmt, compression=None):
+        output_dir = os.path.join(self.tmpdir, f'{fmt}_{compression}')
+        write_data_to_files.write_data(self.df, self.fp, output_dir, fmt,
+                                       compression, chunk_size=3)
+        df = write_data_to_files.read_data(output_dir, 'test', fmt)
+        pd.testing.assert_frame_equal(
+            df, write_data_to_files._as_float(self.df), check_dtype=False,
+            check_exact=True)
+        return
+
+    def test_csv(self):
+        self._round_trip('csv')
+        self._round_trip('csv', 'gzip')
+        return
+
+    def test_npz(self):
+        self._round_trip('npz')
+        self._round_trip('npz', 'zip')
+        return
+
+    def test_parquet_and_feather(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest('pyarrow not installed')
+        self._round_trip('parquet')
+        self._round_trip('feather', 'zstd')
+        return
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            write_data_to_files.write_data(self.df, self.fp, self.tmpdir,
+                                           'xlsx')
+        return
@@ -0,0 +1,194 @@
+from dataclasses import replace
+import numpy as np
+import pandas as pd
+
+from realtpl.fluid_properties import FluidProperties
+from realtpl.eos_data import eos_parameter_from_eos_name
+from realtpl.eos_data import alpha_functions_from_eos_name
+from realtpl.calc_all import calc_eos_kernel
+from realtpl.calc_visc_cond_chung import ChungTransportModel
+from realtpl.properties import property_columns
+
+# fluid data that can be sampled
+UNCERTAIN_INPUTS = ['p_c', 'temp_c', 'omega', 'rho_c', 'dipole_moment',
+                    'association_parameter']
+
+
+class StreamingStatistics:
+    """
+    Streaming mean, variance and quantiles over the leading (sample) axis
+
+    Samples are added in batches of shape (n_batch,) + shape. Mean and
+    variance are merged batch-wise (Welford/Chan), the quantiles are
+    estimated from histograms with n_bins int32 bins per value, which are
+    filled for all samples of a batch at once. The bin range is set from
+    the first batch and widened by margin times its range on both sides;
+    values outside are counted in an under- and overflow bin (their
+    quantiles are clipped to the bin range). Thus, the memory is n_bins + 2
+    counters per value, independent of the number of samples. Values with
+    NaN samples have NaN quantiles.
+    """
+
+    def __init__(self, n_bins: int = 128, margin: float = 0.5):
+        self.n_bins = n_bins
+        self.margin = margin
+        self.n = 0
+        self.mean = None
+        self._m2 = None
+        self._lower = None
+        self._width = None
+        self._counts = None
+        self._is_nan = None
+
+    @property
+    def variance(self) -> np.ndarray:
+        return self._m2/max(self.n - 1, 1)
+
+    @property
+    def std(self) -> np.ndarray:
+        return self.variance**0.5
+
+    def update(self, samples: np.ndarray):
+        samples = np.asarray(samples, dtype=float)
+        n_batch = len(samples)
+        if n_batch == 0:
+            return
+        mean_batch = samples.mean(axis=0)
+        m2_batch = ((samples - mean_batch)**2).sum(axis=0)
+
+        if self.n == 0:
+            self.mean = mean_batch
+            self._m2 = m2_batch
+            with np.errstate(invalid='ignore'):
+                lower = np.nanmin(samples, axis=0)
+                upper = np.nanmax(samples, axis=0)
+                margin = self.margin*(upper - lower)
+                # constant values: some finite width
+                margin = np.where(margin > 0, margin,
+                                  1e-12*np.abs(lower) + 1e-300)
+            self._lower = lower - margin
+            self._width = (upper - lower + 2*margin)/self.n_bins
+            self._counts = np.zeros(samples.shape[1:] + (self.n_bins + 2,),
+                                    dtype=np.int32)
+            self._is_nan = np.zeros(samples.shape[1:], dtype=bool)
+        else:
+            n = self.n + n_batch
+            delta = mean_batch - self.mean
+            self.mean = self.mean + delta*n_batch/n
+            self._m2 = self._m2 + m2_batch + delta**2*self.n*n_batch/n
+        self.n += n_batch
+        self._is_nan |= np.isnan(samples).any(axis=0)
+
+        # histogram: bin 0 underflow, bins 1..n_bins, bin n_bins + 1 overflow,
+        # counted in place
+        with np.errstate(invalid='ignore'):
+            idx = np.floor((samples - self._lower)/self._width)
+        idx = np.clip(np.nan_to_num(idx, nan=-1), -1, self.n_bins) + 1
+        offset = (np.arange(self._is_nan.size).reshape(self._is_nan.shape)
+                  * (self.n_bins + 2))
+        np.add.at(self._counts.reshape(-1),
+                  (offset + idx.astype(np.intp)).ravel(), 1)
+
+    def quantile(self, q: float) -> np.ndarray:
+        """
+        Estimated quantile q (0 < q < 1), linear within the bins
+        """
+        cum = np.cumsum(self._counts, axis=-1)
+        target = q*cum[..., -1:]
+        i = np.argmax(cum >= target, axis=-1)[..., np.newaxis]
+        count = np.take_along_axis(self._counts, i, axis=-1)
+        below = np.take_along_axis(cum, i, axis=-1) - count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frac = np.where(count > 0, (target - below)/count, 0.)
+        # position within the regular bins (i - 1), clipped to the range
+        pos = np.clip(i - 1 + frac, 0, self.n_bins)[..., 0]
+        return np.where(self._is_nan, np.nan, self._lower + pos*self._width)
+
+
+def sample_fluid_properties(fp: FluidProperties, rel_std: dict,
+                            n_samples: int,
+                            rng: np.random.Generator) -> FluidProperties:
+    """
+    Returns one FluidProperties with the inputs of rel_std (see
+    UNCERTAIN_INPUTS) sampled from normal distributions with the relative
+    standard deviations of rel_std as arrays of shape (n_samples, 1)
+    """
+    changes = {}
+    for key, value in rel_std.items():
+        if key not in UNCERTAIN_INPUTS:
+            raise ValueError(f'Unknown uncertain input {key}, choose from '
+                             f'{", ".join(UNCERTAIN_INPUTS)}.')
+        mean = getattr(fp, key)
+        changes[key] = (mean*(1 + value*rng.standard_normal(n_samples))
+                        )[:, np.newaxis]
+    return replace(fp, **changes)
+
+
+def propagate_uncertainty(eos: str, fp: FluidProperties,
+                          temp_array: np.ndarray, pressure_array: np.ndarray,
+                          rel_std: dict, n_samples: int = 1000,
+                          batch_size: int = 100,
+                          quantiles: tuple = (0.025, 0.5, 0.975),
+                          seed: int = 0,
+                          properties: list = None) -> pd.DataFrame:
+    """
+    Monte Carlo propagation of the uncertainty of the fluid data rel_std
+    (relative standard deviations, e.g. {'p_c': 0.01, 'omega': 0.02}) to all
+    quantities of the eos
+
+    The samples are evaluated in batches: the sampled fluid data are arrays
+    of shape (batch_size, 1), so that eos parameters, alpha functions and
+    transport model are evaluated for all samples of a batch in one pass
+    (root selection by the Gibbs energy). The pressure levels are evaluated
+    one after the other, the statistics of a pressure level are accumulated
+    with StreamingStatistics, so that the memory neither grows with
+    n_samples nor with the number of pressure levels. Only the quantities
+    of properties (default: all) are evaluated.
+
+    Returns:
+    --------
+    df: Pandas DataFrame
+        kind, press_Pa, temp_K and for each quantity its mean, standard
+        deviation and quantiles, e.g. rho_kg/m3_mean, rho_kg/m3_std,
+        rho_kg/m3_q0.025
+    """
+    temp_array = np.asarray(temp_array, dtype=float)
+    pressure_array = np.asarray(pressure_array, dtype=float)
+    columns = property_columns(properties)
+
+    # (statistic, quantity, press, temp)
+    n_stats = 2 + len(quantiles)
+    statistics = np.empty((n_stats, len(columns), len(pressure_array),
+                           len(temp_array)))
+    for j, pressure in enumerate(pressure_array):
+        stats = StreamingStatistics()
+        for i_batch, start in enumerate(range(0, n_samples, batch_size)):
+            # the same samples for all pressure levels
+            rng = np.random.default_rng([seed, i_batch])
+            fp_batch = sample_fluid_properties(
+                fp, rel_std, min(batch_size, n_samples - start), rng)
+            with np.errstate(all='ignore'):
+                result = calc_eos_kernel(
+                    fp_batch, eos_parameter_from_eos_name(eos, fp_batch),
+                    alpha_functions_from_eos_name(eos, fp_batch),
+                    temp_array, pressure,
+                    transport=ChungTransportModel(fp_batch),
+                    properties=properties)
+            # (sample, quantity, temp)
+            stats.update(np.stack(np.broadcast_arrays(*result), axis=1))
+        statistics[0, :, j] = stats.mean
+        statistics[1, :, j] = stats.std
+        for i, q in enumerate(quantiles):
+            statistics[2 + i, :, j] = stats.quantile(q)
+
+    df = pd.DataFrame({
+        'kind': eos,
+        'press_Pa': np.repeat(pressure_array, len(temp_array)),
+        'temp_K': np.tile(temp_array, len(pressure_array))
+    })
+    for k, col in enumerate(columns):
+        df[col + '_mean'] = statistics[0, k].ravel()
+        df[col + '_std'] = statistics[1, k].ravel()
+        for i, q in enumerate(quantiles):
+            df[f'{col}_q{q:g}'] = statistics[2 + i, k].ravel()
+    return df
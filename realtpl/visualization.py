@@ -1,10 +1,13 @@
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
 import os
 
+from realtpl.results import GridResults
+
 # color cycle for plots
 plt.rcParams['axes.prop_cycle'] = plt.cycler(color=['r', 'g', 'b', 'k'])
 
@@ -18,6 +21,8 @@ def vis_data(df: pd.DataFrame, fp: dataclass, save_fig: bool, show_fig: bool,
 
     for item in ['rho_kg/m3', 'cp_J/(kgK)', 'sound_m/s', 'visc_Pas',
                  'cond_W/(mK)']:
+        if item not in df:
+            continue
         fig, ax = plt.subplots(figsize=(8, 5))
 
         for kind, dff in df.groupby('kind'):
@@ -40,21 +45,25 @@ def vis_data(df: pd.DataFrame, fp: dataclass, save_fig: bool, show_fig: bool,
         plt.show()
 
 
-def vis_deviation(df: pd.DataFrame, output_dir: str, name: str,
+def vis_deviation(results: GridResults, output_dir: str, name: str,
                   flag_show: bool, flag_save: bool):
-    ref = df[df['kind'] == 'ref_data']
+    # deviations are computed on the grid, points are matched by pressure
+    # and temperature
+    temp = np.tile(results.temp, len(results.press))
 
     for item in ['rho_kg/m3', 'cp_J/(kgK)', 'sound_m/s', 'visc_Pas',
                  'cond_W/(mK)']:
+        if item not in results.columns('ref_data'):
+            continue
         fig, ax = plt.subplots(figsize=(8, 5))
 
-        for kind, dff in df.groupby('kind'):
-            ax.plot(dff['temp_K'], (dff[item] - ref[item]) / ref[item] * 100,
+        for kind in sorted(results.kinds):
+            ax.plot(temp, results.deviation(kind, item).ravel() * 100,
                     label=kind)
         plt.legend()
         plt.xlabel('temperature [K]')
         plt.ylabel('deviation ' + str(item.split("_")[0]) + ' [%]')
-        plt.xlim([df['temp_K'].min(), df['temp_K'].max()])
+        plt.xlim([results.temp.min(), results.temp.max()])
         plt.grid(True)
         if flag_save:
             path_graphics = os.path.join(output_dir, name, 'graphics')
@@ -1,12 +1,219 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import glob
+import numpy as np
 import pandas as pd
 import os
+import yaml
+
+from realtpl.grid import write_grid
+from realtpl.results import GridResults
+
+# file extension of the supported output formats
+OUTPUT_FORMATS = {'csv': '.csv',
+                  'parquet': '.parquet',
+                  'feather': '.feather',
+                  'npz': '.npz'}
+
+# number of rows per chunk/row group for large data frames
+_CHUNK_SIZE = 1000000
 
 
 def write_csv(df: pd.DataFrame, fp: dataclass, output_dir: str):
-    path = (os.path.join(output_dir, fp.name, 'data'))
+    write_data(df, fp, output_dir, 'csv')
+
+
+def write_data(df: pd.DataFrame, fp: dataclass, output_dir: str,
+               fmt: str = 'csv', compression: str = None,
+               chunk_size: int = _CHUNK_SIZE, n_workers: int = None,
+               grid: dict = None):
+    """
+    Writes the data of each kind (ref_data, SRK, PR, ...) to a separate file
+
+    The files of the different kinds are written in parallel. Text (csv) and
+    the binary columnar formats parquet and feather are written in chunks of
+    chunk_size rows. All binary formats store the float values bit-exact, csv
+    uses the shortest round-trip representation of the floats.
+
+    Parameters:
+    -----------
+    df: Pandas DataFrame or GridResults
+        data frame with a 'kind' column or results on a grid (the data
+        frames are built per kind)
+    fp: FluidProperties
+    output_dir: str
+    fmt: str
+        output format: csv, parquet, feather or npz
+    compression: str
+        optional compression, e.g. gzip (csv), snappy/zstd (parquet), lz4/zstd
+        (feather); npz files are zip-compressed for any non-empty value
+    chunk_size: int
+        number of rows written at once
+    n_workers: int
+        number of threads, default: one per kind (limited by the executor)
+    grid: dict, optional
+        metadata of the temperature and pressure axes (spacing, size, range
+        and the values of non-uniform axes, see grid.py), written to
+        grid.yaml next to the data files
+    """
+    groups = (df.dataframes() if isinstance(df, GridResults)
+              else df.groupby('kind'))
+    _write_per_kind(groups, os.path.join(output_dir, fp.name, 'data'), fmt,
+                    compression, chunk_size, n_workers, grid)
+
+
+def write_isochoric_data(df: pd.DataFrame, fp: dataclass, output_dir: str,
+                         fmt: str = 'csv', compression: str = None,
+                         chunk_size: int = _CHUNK_SIZE, grid: dict = None):
+    """
+    Writes the data of the isochoric mode (see isochoric_dataframe, columns
+    kind, rho_kg/m3, temp_K, press_Pa, ...) of each kind to
+    <output_dir>/<fluid>/isochoric/<kind>.<ext> in the formats of write_data,
+    with the metadata of the temperature and density axes in grid.yaml
+    """
+    _write_per_kind(df.groupby('kind'),
+                    os.path.join(output_dir, fp.name, 'isochoric'), fmt,
+                    compression, chunk_size, None, grid)
+
+
+def _write_per_kind(groups, path: str, fmt: str, compression: str,
+                    chunk_size: int, n_workers: int, grid: dict):
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f'Unknown output format: {fmt}')
+
     os.makedirs(path, exist_ok=True)
+    if grid is not None:
+        write_grid(grid, path)
+
+    writer = _WRITERS[fmt]
+    ext = OUTPUT_FORMATS[fmt]
+    with ThreadPoolExecutor(n_workers) as executor:
+        futures = [
+            executor.submit(writer, _as_float(dff),
+                            os.path.join(path, str(kind) + ext),
+                            compression, chunk_size)
+            for kind, dff in groups
+        ]
+        for future in futures:
+            future.result()
+
+
+def write_saturation_curve(df: pd.DataFrame, fp: dataclass,
+                           output_dir: str):
+    """
+    Writes the vapor pressure curve (two-phase boundary) of each eos to
+    <output_dir>/<fluid>/saturation/<eos>.csv
+    """
+    _write_csv_per_kind(df, os.path.join(output_dir, fp.name, 'saturation'))
+
+
+def write_pseudo_boiling_curve(df: pd.DataFrame, fp: dataclass,
+                               output_dir: str):
+    """
+    Writes the pseudo-boiling line (maximum of cp) of each eos to
+    <output_dir>/<fluid>/pseudo_boiling/<eos>.csv
+    """
+    _write_csv_per_kind(df, os.path.join(output_dir, fp.name,
+                                         'pseudo_boiling'))
+
+
+def write_uncertainty(df: pd.DataFrame, fp: dataclass, output_dir: str):
+    """
+    Writes the statistics of the uncertainty propagation of each eos to
+    <output_dir>/<fluid>/uncertainty/<eos>.csv
+    """
+    _write_csv_per_kind(df, os.path.join(output_dir, fp.name, 'uncertainty'))
+
+
+def write_reference_audit(audit: dict, fp: dataclass, output_dir: str):
+    """
+    Writes the audit of the reference backend (see audit_reference_backend)
+    to <output_dir>/<fluid>/reference_audit.yaml
+    """
+    path = os.path.join(output_dir, fp.name)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, 'reference_audit.yaml'), 'w') as f:
+        yaml.safe_dump(audit, f, sort_keys=False)
+
 
+def _write_csv_per_kind(df: pd.DataFrame, path: str):
+    os.makedirs(path, exist_ok=True)
     for kind, dff in df.groupby('kind'):
-        dff.to_csv(os.path.join(path, str(kind) + '.csv'),
-                   sep='\t', index=False)
+        dff.to_csv(os.path.join(path, str(kind) + '.csv'), sep='\t',
+                   index=False)
+
+
+def read_data(output_dir: str, name: str, fmt: str = 'csv') -> pd.DataFrame:
+    """
+    Reads the files written by write_data back into one data frame with the
+    same layout (columns and kinds sorted by name)
+    """
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f'Unknown output format: {fmt}')
+
+    files = sorted(glob.glob(os.path.join(output_dir, name, 'data',
+                                          '*' + OUTPUT_FORMATS[fmt] + '*')))
+    if not files:
+        raise FileNotFoundError(f'No {fmt} data found for {name} in '
+                                f'{output_dir}.')
+
+    return pd.concat([_READERS[fmt](file) for file in files],
+                     ignore_index=True)
+
+
+def _as_float(df: pd.DataFrame) -> pd.DataFrame:
+    # columns are of type object if the data frame was built by concatenation
+    return df.astype({col: float for col in df.columns if col != 'kind'})
+
+
+def _write_csv(df: pd.DataFrame, file: str, compression: str,
+               chunk_size: int):
+    if compression:
+        file += {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz', 'zstd': '.zst',
+                 'zip': '.zip'}.get(compression, '')
+    df.to_csv(file, sep='\t', index=False, compression=compression,
+              chunksize=chunk_size)
+
+
+def _write_parquet(df: pd.DataFrame, file: str, compression: str,
+                   chunk_size: int):
+    df.to_parquet(file, index=False, compression=compression,
+                  row_group_size=chunk_size)
+
+
+def _write_feather(df: pd.DataFrame, file: str, compression: str,
+                   chunk_size: int):
+    df.reset_index(drop=True).to_feather(
+        file, compression=compression or 'uncompressed', chunksize=chunk_size)
+
+
+def _write_npz(df: pd.DataFrame, file: str, compression: str,
+               chunk_size: int):
+    columns = [col for col in df.columns if col != 'kind']
+    save = np.savez_compressed if compression else np.savez
+    save(file,
+         kind=np.array(df['kind'].iloc[0] if len(df) else ''),
+         columns=np.array(columns),
+         values=df[columns].to_numpy())
+
+
+def _read_csv(file: str) -> pd.DataFrame:
+    return pd.read_csv(file, sep='\t', float_precision='round_trip')
+
+
+def _read_npz(file: str) -> pd.DataFrame:
+    with np.load(file) as data:
+        df = pd.DataFrame(data['values'], columns=list(data['columns']))
+        df.insert(0, 'kind', str(data['kind']))
+    return df
+
+
+_WRITERS = {'csv': _write_csv,
+            'parquet': _write_parquet,
+            'feather': _write_feather,
+            'npz': _write_npz}
+
+_READERS = {'csv': _read_csv,
+            'parquet': pd.read_parquet,
+            'feather': pd.read_feather,
+            'npz': _read_npz}